@@ -1,10 +1,31 @@
-from fastapi import FastAPI, Query
+import asyncio
+import time
+
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import redis.asyncio as redis
-import sys
 
 from eng_universe.config import Settings
-from eng_universe.search.search import load_doc_cache, search as run_search
+from eng_universe.index.versions import doc_prefix, get_live_version
+from eng_universe.search.doc_store import (
+    adopt_doc_snapshot,
+    change_feed_gap,
+    compact_doc_cache,
+    load_live_doc_cache,
+    refresh_doc_cache,
+)
+from eng_universe.search.cursors import MAX_EF_RUNTIME, SEARCH_MODES, decode_cursor
+from eng_universe.search.facets import FACET_FIELDS
+from eng_universe.search.filters import SearchFilters, published_epoch
+from eng_universe.search.pylate_backend import close_query_batchers
+from eng_universe.search.search import (
+    available_search_modes,
+    search_facets,
+    search_page,
+)
+from eng_universe.search.suggest import suggest as run_suggest
+from eng_universe.search.timings import search_timings, timed_stage
 from eng_universe.monitoring.logging_utils import get_event_logger
 
 
@@ -18,15 +39,80 @@ app.add_middleware(
 log_event = get_event_logger("api")
 
 
+async def _load_live_doc_cache(redis_client: redis.Redis) -> None:
+    version = await get_live_version(redis_client)
+    prefix = doc_prefix(version)
+    doc_cache = await load_live_doc_cache(redis_client, doc_prefix=prefix)
+    # Swap both together so requests never mix versions.
+    app.state.doc_cache = doc_cache
+    app.state.doc_prefix = prefix
+    app.state.index_version = version
+
+
+async def _watch_index_version(redis_client: redis.Redis) -> None:
+    """Reloads the doc cache in the background after an alias switch."""
+    while True:
+        await asyncio.sleep(Settings.index_version_poll_s)
+        try:
+            version = await get_live_version(redis_client)
+            if version == app.state.index_version:
+                continue
+            await _load_live_doc_cache(redis_client)
+            log_event(
+                "doc_cache",
+                reason="index_version",
+                version=version,
+                num_docs=len(app.state.doc_cache),
+            )
+        except redis.RedisError as exc:
+            log_event("doc_cache", reason="watch_failed", error=type(exc).__name__)
+
+
+async def _follow_doc_changes(redis_client: redis.Redis) -> None:
+    """Applies indexer writes to the live doc cache as they happen."""
+    check_gap = True
+    while True:
+        try:
+            doc_cache = app.state.doc_cache
+            if check_gap and await change_feed_gap(redis_client, doc_cache):
+                await _load_live_doc_cache(redis_client)
+                log_event(
+                    "doc_cache",
+                    reason="change_feed_gap",
+                    num_docs=len(app.state.doc_cache),
+                )
+                continue
+            consumed = await refresh_doc_cache(redis_client, doc_cache)
+            check_gap = consumed >= Settings.doc_cache_refresh_batch_size
+            if doc_cache.compaction_due():
+                # One worker writes the shared snapshot; the others map it.
+                compacted = await adopt_doc_snapshot(
+                    redis_client, doc_cache
+                ) or await compact_doc_cache(doc_cache)
+                # The version watcher may have swapped in a new cache meanwhile.
+                if compacted is not None and app.state.doc_cache is doc_cache:
+                    app.state.doc_cache = compacted
+        except redis.RedisError as exc:
+            log_event("doc_cache", reason="refresh_failed", error=type(exc).__name__)
+            check_gap = True
+            await asyncio.sleep(1.0)
+
+
 @app.on_event("startup")
 async def startup() -> None:
     redis_client = redis.from_url(Settings.redis_url)
     app.state.redis_client = redis_client
-    app.state.doc_cache = await load_doc_cache(redis_client)
+    await _load_live_doc_cache(redis_client)
+    app.state.version_watcher = asyncio.create_task(
+        _watch_index_version(redis_client)
+    )
+    app.state.change_follower = asyncio.create_task(
+        _follow_doc_changes(redis_client)
+    )
 
-    # Measure cache size
+    # Mapped snapshot size; the pages are shared by every worker.
     num_docs = len(app.state.doc_cache)
-    cache_size_bytes = sys.getsizeof(app.state.doc_cache)
+    cache_size_bytes = app.state.doc_cache.nbytes
     log_event(
         "doc_cache",
         num_docs=num_docs,
@@ -37,6 +123,11 @@ async def startup() -> None:
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
+    for name in ("version_watcher", "change_follower"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    close_query_batchers()
     redis_client = getattr(app.state, "redis_client", None)
     if redis_client is not None:
         await redis_client.close()
@@ -44,25 +135,121 @@ async def shutdown() -> None:
 
 @app.get("/health")
 async def health() -> dict:
-    return {"status": "ok"}
+    return {"status": "ok", "modes": available_search_modes()}
 
 
 @app.get("/search")
 async def search(
-    q: str = Query("", min_length=1),
-    mode: str = Query("hybrid", pattern="^(keyword|hybrid|semantic)$"),
+    q: str = Query(""),
+    mode: str = Query("hybrid", pattern=f"^({'|'.join(SEARCH_MODES)})$"),
     limit: int = Query(10, ge=1, le=50),
-) -> dict:
-    redis_client = app.state.redis_client
-    doc_cache = app.state.doc_cache
-    results, query_latency_ms = await run_search(
-        redis_client, "idx:blogs", q, mode=mode, limit=limit, doc_cache=doc_cache
+    ef_runtime: int | None = Query(None, ge=1, le=MAX_EF_RUNTIME),
+    company: list[str] = Query([]),
+    topic: list[str] = Query([]),
+    author: list[str] = Query([]),
+    lang: list[str] = Query([]),
+    source: list[str] = Query([]),
+    published_after: str | None = Query(None),
+    published_before: str | None = Query(None),
+    facets: list[str] = Query([]),
+    facet_limit: int = Query(10, ge=1, le=50),
+    cursor: str | None = Query(None),
+) -> JSONResponse:
+    page_cursor = None
+    if cursor:
+        try:
+            page_cursor = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        if page_cursor.limit > 50:
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+        q, mode, limit = page_cursor.query, page_cursor.mode, page_cursor.limit
+    elif not q:
+        raise HTTPException(status_code=422, detail="q is required")
+    if mode not in available_search_modes():
+        raise HTTPException(
+            status_code=422, detail=f"{mode} mode is not enabled on this server"
+        )
+    bounds = {"published_after": published_after, "published_before": published_before}
+    for name, value in bounds.items():
+        if value and published_epoch(value) is None:
+            raise HTTPException(status_code=422, detail=f"Invalid date for {name}")
+    unknown = sorted(set(facets) - set(FACET_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown facets: {', '.join(unknown)}"
+        )
+    filters = SearchFilters(
+        company=company,
+        topics=topic,
+        authors=author,
+        lang=lang,
+        source=source,
+        published_after=published_epoch(published_after),
+        published_before=published_epoch(published_before),
     )
-    duration_ms = round(query_latency_ms, 1)
+    if page_cursor is not None:
+        # Later pages keep the first page's filters and skip facets.
+        filters = SearchFilters(**page_cursor.filters)  # type: ignore[arg-type]
+        facets = []
+    redis_client = app.state.redis_client
+    with search_timings(mode) as timings:
+        page, facet_counts = await asyncio.gather(
+            search_page(
+                redis_client,
+                Settings.search_index_name,
+                q,
+                mode=mode,
+                limit=limit,
+                doc_cache=app.state.doc_cache,
+                doc_prefix=app.state.doc_prefix,
+                ef_runtime=ef_runtime,
+                filters=filters,
+                cursor=page_cursor,
+            ),
+            search_facets(
+                redis_client,
+                Settings.search_index_name,
+                q,
+                facets,
+                limit=facet_limit,
+                filters=filters,
+            ),
+        )
+        duration_ms = round(page.query_latency_ms, 1)
+        with timed_stage("serialize"):
+            response = JSONResponse(
+                {
+                    "query": q,
+                    "mode": mode,
+                    "filters": filters.cache_key(),
+                    "count": len(page.results),
+                    "duration_ms": duration_ms,
+                    "results": [result.__dict__ for result in page.results],
+                    "next_cursor": page.next_cursor,
+                    "facets": {
+                        field: [item.__dict__ for item in items]
+                        for field, items in facet_counts.items()
+                    },
+                }
+            )
+    # `duration_ms` stays the query time; the header breaks down the rest.
+    response.headers["Server-Timing"] = timings.server_timing()
+    response.headers["Timing-Allow-Origin"] = "*"
+    return response
+
+
+@app.get("/suggest")
+async def suggest(
+    q: str = Query("", min_length=1, max_length=100),
+    limit: int = Query(5, ge=1, le=20),
+    fuzzy: bool = Query(False),
+) -> dict:
+    start = time.perf_counter()
+    suggestions = await run_suggest(app.state.redis_client, q, limit, fuzzy=fuzzy)
     return {
         "query": q,
-        "mode": mode,
-        "count": len(results),
-        "duration_ms": duration_ms,
-        "results": [result.__dict__ for result in results],
+        "count": len(suggestions),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        "suggestions": [suggestion.__dict__ for suggestion in suggestions],
     }
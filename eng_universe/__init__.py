@@ -32,39 +32,160 @@ from eng_universe.ingest.robots import (
 from eng_universe.index.entities import extract_topics
 from eng_universe.index.indexer import (
     IndexRecord,
+    PassageRecord,
     create_search_index,
+    embed_for_index,
+    embed_parsed_documents,
+    embed_parsed_passages,
     index_document,
+    publish_doc_changes,
+    index_version,
     vector_to_bytes,
+    write_content_hashes,
+    write_documents,
+)
+from eng_universe.index.pipeline import (
+    build_index_version,
+    delete_orphan_documents,
+    index_worker,
+    requeue_crawl_docs,
+)
+from eng_universe.index.versions import (
+    bump_index_generation,
+    doc_prefix,
+    drop_version,
+    get_live_doc_prefix,
+    get_live_version,
+    physical_index_name,
+    promote_version,
+    rollback_version,
 )
-from eng_universe.index.pipeline import index_worker
 
 # Search
+from eng_universe.search.cursors import (
+    PageCursor,
+    decode_cursor,
+    encode_cursor,
+    get_candidate_cache,
+)
+from eng_universe.search.doc_store import (
+    DocStore,
+    LiveDocCache,
+    adopt_doc_snapshot,
+    compact_doc_cache,
+    load_doc_store,
+    load_live_doc_cache,
+    refresh_doc_cache,
+)
+from eng_universe.search.embedding_cache import (
+    EmbeddingCache,
+    embed_documents,
+    get_embedding_cache,
+)
 from eng_universe.search.embeddings import (
     EmbeddingProvider,
     EmbeddingResult,
     get_embedding_provider,
     normalize_embedding,
 )
+from eng_universe.search.facets import FACET_FIELDS, FacetCount, facet_counts
+from eng_universe.search.filters import (
+    SearchFilters,
+    filter_clause,
+    parse_inline_filters,
+    published_epoch,
+)
+from eng_universe.search.passages import Passage, chunk_passages
 from eng_universe.search.pylate_backend import (
+    PlaidWriteBuffer,
+    QueryBatcher,
     add_documents,
+    close_query_batchers,
     create_plaid_index,
     encode_documents,
     encode_queries,
+    flush_plaid_buffer,
     get_colbert_model,
     get_colbert_retriever,
     get_colbert_stack,
     get_plaid_index,
+    get_plaid_write_buffer,
+    remove_documents,
     retrieve,
+    retrieve_async,
+    retrieve_batch,
+)
+from eng_universe.search.query_cache import SingleFlight, TTLCache, embed_query
+from eng_universe.search.result_cache import SearchResultCache, get_search_result_cache
+from eng_universe.search.search import (
+    SearchPage,
+    SearchResult,
+    available_search_modes,
+    search,
+    search_facets,
+    search_page,
+)
+from eng_universe.search.snippets import (
+    best_window_start,
+    build_snippet_index,
+    query_term_hashes,
+)
+from eng_universe.search.suggest import (
+    SUGGEST_KINDS,
+    Suggestion,
+    queue_suggestions,
+    suggest,
+    update_suggestion_weights,
+)
+from eng_universe.search.timings import (
+    StageTimings,
+    search_timings,
+    timed_stage,
+)
+from eng_universe.search.token_store import (
+    TokenStore,
+    TokenStoreWriter,
+    compact_token_store,
+    get_token_store,
+    maxsim_scores,
+    store_document_tokens,
+)
+from eng_universe.search.vectors import (
+    bytes_to_array,
+    dequantize_int8,
+    quantize_int8,
 )
-from eng_universe.search.search import SearchResult, search
 
 # Monitoring
 from eng_universe.monitoring.metrics import (
     CRAWL_PAGES,
+    DOC_CACHE_REFRESH_LAG_MS,
+    DOC_CACHE_UPDATES,
+    EMBEDDING_CACHE_LOOKUPS,
     INDEX_DOCS,
+    PLAID_FLUSH_DOCS,
+    PLAID_FLUSH_LATENCY_MS,
+    PYLATE_QUERY_BATCH_LATENCY_MS,
+    PYLATE_QUERY_BATCH_SIZE,
+    QUERY_EMBEDDING_CACHE_LOOKUPS,
+    SEARCH_EARLY_EXITS,
     SEARCH_LATENCY_MS,
+    SEARCH_LEG_LATENCY_MS,
+    SEARCH_RESULT_CACHE_LOOKUPS,
+    SEARCH_SINGLE_FLIGHT,
+    SEARCH_STAGE_LATENCY_MS,
     record_crawl,
+    record_doc_cache_refresh,
+    record_embedding_cache,
     record_index,
+    record_plaid_flush,
+    record_pylate_query_batch,
+    record_query_embedding_cache,
+    record_search_cache,
+    record_search_early_exit,
+    record_search_leg,
+    record_search_single_flight,
+    record_search_stages,
 )
 from eng_universe.monitoring.metrics_server import run_metrics_server
 
@@ -97,35 +218,151 @@ __all__ = [
     "extract_topics",
     # Index - indexer
     "IndexRecord",
+    "PassageRecord",
     "create_search_index",
+    "embed_for_index",
+    "embed_parsed_documents",
+    "embed_parsed_passages",
     "index_document",
+    "publish_doc_changes",
+    "index_version",
     "vector_to_bytes",
+    "write_content_hashes",
+    "write_documents",
     # Index - pipeline
+    "build_index_version",
+    "delete_orphan_documents",
     "index_worker",
+    "requeue_crawl_docs",
+    # Index - versions
+    "bump_index_generation",
+    "doc_prefix",
+    "drop_version",
+    "get_live_doc_prefix",
+    "get_live_version",
+    "physical_index_name",
+    "promote_version",
+    "rollback_version",
+    # Search - cursors
+    "PageCursor",
+    "decode_cursor",
+    "encode_cursor",
+    "get_candidate_cache",
+    # Search - doc store
+    "DocStore",
+    "LiveDocCache",
+    "adopt_doc_snapshot",
+    "compact_doc_cache",
+    "load_doc_store",
+    "load_live_doc_cache",
+    "refresh_doc_cache",
+    # Search - embedding cache
+    "EmbeddingCache",
+    "embed_documents",
+    "get_embedding_cache",
     # Search - embeddings
     "EmbeddingProvider",
     "EmbeddingResult",
     "get_embedding_provider",
     "normalize_embedding",
+    # Search - facets
+    "FACET_FIELDS",
+    "FacetCount",
+    "facet_counts",
+    # Search - filters
+    "SearchFilters",
+    "filter_clause",
+    "parse_inline_filters",
+    "published_epoch",
+    # Search - passages
+    "Passage",
+    "chunk_passages",
     # Search - pylate
+    "PlaidWriteBuffer",
+    "QueryBatcher",
     "add_documents",
+    "close_query_batchers",
     "create_plaid_index",
     "encode_documents",
     "encode_queries",
+    "flush_plaid_buffer",
     "get_colbert_model",
     "get_colbert_retriever",
     "get_colbert_stack",
     "get_plaid_index",
+    "get_plaid_write_buffer",
+    "remove_documents",
     "retrieve",
+    "retrieve_async",
+    "retrieve_batch",
+    # Search - query cache
+    "SingleFlight",
+    "TTLCache",
+    "embed_query",
+    # Search - result cache
+    "SearchResultCache",
+    "get_search_result_cache",
     # Search - search
+    "SearchPage",
     "SearchResult",
+    "available_search_modes",
     "search",
+    "search_facets",
+    "search_page",
+    # Search - snippets
+    "best_window_start",
+    "build_snippet_index",
+    "query_term_hashes",
+    # Search - suggest
+    "SUGGEST_KINDS",
+    "Suggestion",
+    "queue_suggestions",
+    "suggest",
+    "update_suggestion_weights",
+    # Search - timings
+    "StageTimings",
+    "search_timings",
+    "timed_stage",
+    # Search - token store
+    "TokenStore",
+    "TokenStoreWriter",
+    "compact_token_store",
+    "get_token_store",
+    "maxsim_scores",
+    "store_document_tokens",
+    # Search - vectors
+    "bytes_to_array",
+    "dequantize_int8",
+    "quantize_int8",
     # Monitoring - metrics
     "CRAWL_PAGES",
+    "DOC_CACHE_REFRESH_LAG_MS",
+    "DOC_CACHE_UPDATES",
+    "EMBEDDING_CACHE_LOOKUPS",
     "INDEX_DOCS",
+    "PLAID_FLUSH_DOCS",
+    "PLAID_FLUSH_LATENCY_MS",
+    "PYLATE_QUERY_BATCH_LATENCY_MS",
+    "PYLATE_QUERY_BATCH_SIZE",
+    "QUERY_EMBEDDING_CACHE_LOOKUPS",
+    "SEARCH_EARLY_EXITS",
     "SEARCH_LATENCY_MS",
+    "SEARCH_LEG_LATENCY_MS",
+    "SEARCH_RESULT_CACHE_LOOKUPS",
+    "SEARCH_SINGLE_FLIGHT",
+    "SEARCH_STAGE_LATENCY_MS",
     "record_crawl",
+    "record_doc_cache_refresh",
+    "record_embedding_cache",
     "record_index",
+    "record_plaid_flush",
+    "record_pylate_query_batch",
+    "record_query_embedding_cache",
+    "record_search_cache",
+    "record_search_early_exit",
+    "record_search_leg",
+    "record_search_single_flight",
+    "record_search_stages",
     # Monitoring - server
     "run_metrics_server",
 ]
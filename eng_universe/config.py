@@ -50,6 +50,41 @@ class Settings:
     crawl_queue_key = os.getenv("CRAWL_QUEUE_KEY", "crawl:queue")
     crawl_delay_key = os.getenv("CRAWL_DELAY_KEY", "crawl:delay")
     raw_queue_key = os.getenv("RAW_QUEUE_KEY", "raw:queue")
+    search_index_name = os.getenv("SEARCH_INDEX_NAME", "idx:blogs")
+    index_version_seq_key = os.getenv("INDEX_VERSION_SEQ_KEY", "index:version_seq")
+    index_live_version_key = os.getenv("INDEX_LIVE_VERSION_KEY", "index:live_version")
+    index_previous_version_key = os.getenv(
+        "INDEX_PREVIOUS_VERSION_KEY", "index:previous_version"
+    )
+    index_version_poll_s = float(os.getenv("INDEX_VERSION_POLL_S", "5"))
+    index_generation_key = os.getenv("INDEX_GENERATION_KEY", "index:generation")
+    doc_store_path = os.getenv("DOC_STORE_PATH", "data/doc-store.bin")
+    doc_change_stream_key = os.getenv("DOC_CHANGE_STREAM_KEY", "index:changes")
+    doc_change_stream_maxlen = int(os.getenv("DOC_CHANGE_STREAM_MAXLEN", 100000))
+    doc_cache_refresh_block_ms = int(os.getenv("DOC_CACHE_REFRESH_BLOCK_MS", 1000))
+    doc_cache_refresh_batch_size = int(
+        os.getenv("DOC_CACHE_REFRESH_BATCH_SIZE", 500)
+    )
+    doc_cache_overlay_max_docs = int(os.getenv("DOC_CACHE_OVERLAY_MAX_DOCS", 20000))
+    doc_cache_overlay_max_age_s = float(
+        os.getenv("DOC_CACHE_OVERLAY_MAX_AGE_S", "3600")
+    )
+    search_cache_backend = os.getenv("SEARCH_CACHE_BACKEND", "memory").lower()
+    search_cache_size = int(os.getenv("SEARCH_CACHE_SIZE", 2048))
+    search_cache_ttl_s = float(os.getenv("SEARCH_CACHE_TTL_S", "300"))
+    search_cache_key_prefix = os.getenv("SEARCH_CACHE_KEY_PREFIX", "searchcache:")
+    search_cache_generation_poll_s = float(
+        os.getenv("SEARCH_CACHE_GENERATION_POLL_S", "1")
+    )
+    search_cursor_pages = int(os.getenv("SEARCH_CURSOR_PAGES", 5))
+    search_cursor_max_depth = int(os.getenv("SEARCH_CURSOR_MAX_DEPTH", 1000))
+    search_cursor_cache_size = int(os.getenv("SEARCH_CURSOR_CACHE_SIZE", 512))
+    search_cursor_ttl_s = float(os.getenv("SEARCH_CURSOR_TTL_S", "120"))
+    search_cursor_key_prefix = os.getenv(
+        "SEARCH_CURSOR_KEY_PREFIX", "searchcursor:"
+    )
+    search_single_flight = env_bool("SEARCH_SINGLE_FLIGHT", "true")
+    suggest_key_prefix = os.getenv("SUGGEST_KEY_PREFIX", "suggest:")
     robots_key_prefix = os.getenv("ROBOTS_KEY_PREFIX", "robots:")
     robots_next_allowed_prefix = os.getenv(
         "ROBOTS_NEXT_ALLOWED_PREFIX", "robots:next_allowed:"
@@ -76,6 +111,35 @@ class Settings:
     crawl_delay_default_s = int(os.getenv("CRAWL_DELAY_DEFAULT_S", 5))
     embeddings_provider = os.getenv("EMBEDDINGS_PROVIDER", "dummy")
     embeddings_dim = int(os.getenv("EMBEDDINGS_DIM", 384))
+    embeddings_vector_type = os.getenv("EMBEDDINGS_VECTOR_TYPE", "FLOAT32").upper()
+    embeddings_int8 = env_bool("EMBEDDINGS_INT8", "false")
+    hnsw_m = int(os.getenv("HNSW_M", 16))
+    hnsw_ef_construction = int(os.getenv("HNSW_EF_CONSTRUCTION", 200))
+    hnsw_ef_runtime = int(os.getenv("HNSW_EF_RUNTIME", 10))
+    hybrid_fusion = os.getenv("HYBRID_FUSION", "rrf").lower()
+    hybrid_rrf_k = int(os.getenv("HYBRID_RRF_K", 60))
+    hybrid_bm25_weight = float(os.getenv("HYBRID_BM25_WEIGHT", "1.0"))
+    hybrid_vector_weight = float(os.getenv("HYBRID_VECTOR_WEIGHT", "1.0"))
+    embeddings_batch_size = int(os.getenv("EMBEDDINGS_BATCH_SIZE", 32))
+    passage_chunking = env_bool("PASSAGE_CHUNKING", "false")
+    passage_size_words = int(os.getenv("PASSAGE_SIZE_WORDS", 160))
+    passage_overlap_words = int(os.getenv("PASSAGE_OVERLAP_WORDS", 32))
+    passage_knn_fanout = int(os.getenv("PASSAGE_KNN_FANOUT", 4))
+    embeddings_concurrency = int(os.getenv("EMBEDDINGS_CONCURRENCY", 4))
+    embedding_cache_backend = os.getenv("EMBEDDING_CACHE_BACKEND", "disk")
+    embedding_cache_path = os.path.expanduser(
+        os.getenv(
+            "EMBEDDING_CACHE_PATH", "~/.cache/eng-universe/embedding-cache.sqlite"
+        )
+    )
+    embedding_cache_key_prefix = os.getenv("EMBEDDING_CACHE_KEY_PREFIX", "embcache:")
+    embedding_cache_max_bytes = int(
+        os.getenv("EMBEDDING_CACHE_MAX_BYTES", 2 * 1024**3)
+    )
+    query_embedding_cache_size = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 4096))
+    query_embedding_cache_ttl_s = float(
+        os.getenv("QUERY_EMBEDDING_CACHE_TTL_S", "3600")
+    )
     keyword_only = env_bool("KEYWORD_ONLY", "false")
     keyword_fields = KEYWORD_FIELDS
     huggingface_api_key = os.getenv("HUGGINGFACE_API_KEY", "")
@@ -94,9 +158,34 @@ class Settings:
     pylate_batch_size = int(os.getenv("PYLATE_BATCH_SIZE", 32))
     pylate_device = os.getenv("PYLATE_DEVICE", "")
     pylate_show_progress = env_bool("PYLATE_SHOW_PROGRESS", "false")
+    pylate_flush_size = int(os.getenv("PYLATE_FLUSH_SIZE", 256))
+    pylate_flush_interval_s = float(os.getenv("PYLATE_FLUSH_INTERVAL_S", "30"))
+    pylate_query_batch_size = int(os.getenv("PYLATE_QUERY_BATCH_SIZE", 32))
+    pylate_query_batch_wait_ms = float(os.getenv("PYLATE_QUERY_BATCH_WAIT_MS", "5"))
+    pylate_query_queue_size = int(os.getenv("PYLATE_QUERY_QUEUE_SIZE", 256))
+    pylate_hybrid_early_exit_score = float(
+        os.getenv("PYLATE_HYBRID_EARLY_EXIT_SCORE", "0")
+    )
+    colbert_token_store = env_bool("COLBERT_TOKEN_STORE", "false")
+    colbert_token_store_path = os.getenv(
+        "COLBERT_TOKEN_STORE_PATH", "data/colbert-tokens.bin"
+    )
+    rerank_candidates = int(os.getenv("RERANK_CANDIDATES", 50))
+    snippet_window_bytes = int(os.getenv("SNIPPET_WINDOW_BYTES", 600))
     debug_search = env_bool("DEBUG_SEARCH", "false")
     indexer_exit_on_idle = env_bool("INDEXER_EXIT_ON_IDLE", "true")
     indexer_idle_grace_s = float(os.getenv("INDEXER_IDLE_GRACE_S", "2"))
+    indexer_incremental = env_bool("INDEXER_INCREMENTAL", "false")
+    indexer_fetch_batch_size = int(os.getenv("INDEXER_FETCH_BATCH_SIZE", 64))
+    indexer_queue_size = int(os.getenv("INDEXER_QUEUE_SIZE", 256))
+    indexer_io_concurrency = int(os.getenv("INDEXER_IO_CONCURRENCY", 16))
+    indexer_parse_workers = int(
+        os.getenv("INDEXER_PARSE_WORKERS") or os.cpu_count() or 1
+    )
+    indexer_embed_concurrency = int(os.getenv("INDEXER_EMBED_CONCURRENCY", 2))
+    indexer_write_batch_size = int(os.getenv("INDEXER_WRITE_BATCH_SIZE", 64))
+    indexer_batch_linger_s = float(os.getenv("INDEXER_BATCH_LINGER_S", "0.05"))
+    indexer_stats_interval_s = float(os.getenv("INDEXER_STATS_INTERVAL_S", "10"))
     metrics_port = int(os.getenv("METRICS_PORT", 9100))
     api_port = int(os.getenv("API_PORT", 8080))
     r2_upload = env_bool("R2_UPLOAD", "false")
@@ -3,20 +3,63 @@
 from eng_universe.index.entities import extract_topics
 from eng_universe.index.indexer import (
     IndexRecord,
+    PassageRecord,
     create_search_index,
+    embed_for_index,
+    embed_parsed_documents,
+    embed_parsed_passages,
     index_document,
+    publish_doc_changes,
+    index_version,
     vector_to_bytes,
+    write_content_hashes,
+    write_documents,
+)
+from eng_universe.index.pipeline import (
+    build_index_version,
+    delete_orphan_documents,
+    index_worker,
+    requeue_crawl_docs,
+)
+from eng_universe.index.versions import (
+    bump_index_generation,
+    doc_prefix,
+    drop_version,
+    get_live_doc_prefix,
+    get_live_version,
+    physical_index_name,
+    promote_version,
+    rollback_version,
 )
-from eng_universe.index.pipeline import index_worker
 
 __all__ = [
     # entities
     "extract_topics",
     # indexer
     "IndexRecord",
+    "PassageRecord",
     "create_search_index",
+    "embed_for_index",
+    "embed_parsed_documents",
+    "embed_parsed_passages",
     "index_document",
+    "publish_doc_changes",
+    "index_version",
     "vector_to_bytes",
+    "write_content_hashes",
+    "write_documents",
     # pipeline
+    "build_index_version",
+    "delete_orphan_documents",
     "index_worker",
+    "requeue_crawl_docs",
+    # versions
+    "bump_index_generation",
+    "doc_prefix",
+    "drop_version",
+    "get_live_doc_prefix",
+    "get_live_version",
+    "physical_index_name",
+    "promote_version",
+    "rollback_version",
 ]
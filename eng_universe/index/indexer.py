@@ -1,18 +1,35 @@
-import struct
 from dataclasses import dataclass
+from typing import Sequence
 
+import numpy as np
 import redis.asyncio as redis
 
 from eng_universe.config import KeywordFieldConfig, Settings
-from eng_universe.search.embeddings import get_embedding_provider, normalize_embedding
+from eng_universe.search.embedding_cache import embed_documents
 from eng_universe.index.entities import extract_topics
+from eng_universe.index.versions import LEGACY_DOC_PREFIX
 from eng_universe.ingest.etl import ParsedDocument
 from eng_universe.monitoring.logging_utils import get_event_logger
 from eng_universe.monitoring.metrics import record_index
-from eng_universe.search.pylate_backend import add_documents as pylate_add_documents
+from eng_universe.search.filters import published_epoch
+from eng_universe.search.passages import chunk_passages, passage_id, passage_prefix
+from eng_universe.search.pylate_backend import get_plaid_write_buffer
+from eng_universe.search.snippets import build_snippet_index
+from eng_universe.search.suggest import queue_suggestions, update_suggestion_weights
+from eng_universe.search.token_store import store_document_tokens, token_store_enabled
+from eng_universe.search.vectors import (
+    bytes_to_array,
+    quantize_int8,
+    vector_to_bytes,
+    vector_type,
+)
 
 log_event = get_event_logger("indexer")
 
+# Bump when the doc:* hash layout or RediSearch schema changes so incremental
+# reindexing re-processes every document.
+INDEX_SCHEMA_VERSION = 4
+
 
 @dataclass
 class IndexRecord:
@@ -29,8 +46,12 @@ class IndexRecord:
     embedding: bytes | None
 
 
-def vector_to_bytes(vector: list[float]) -> bytes:
-    return struct.pack(f"{len(vector)}f", *vector)
+@dataclass
+class PassageRecord:
+    index: int
+    start: int
+    snippet: str
+    embedding: bytes | None
 
 
 def _schema_for_field(field: KeywordFieldConfig) -> list[object]:
@@ -47,34 +68,152 @@ def _schema_for_field(field: KeywordFieldConfig) -> list[object]:
     return parts
 
 
-async def index_document(
-    redis_client: redis.Redis, doc: ParsedDocument, source: str
-) -> None:
-    log_event("index", url=doc.url, title=doc.title, source=source)
-    embedding_bytes: bytes | None = None
+def index_version() -> str:
+    """Schema + embedding model fingerprint stored with every `doc:*` hash."""
     provider_name = Settings.embeddings_provider.lower()
-    if not Settings.keyword_only:
-        if provider_name in {"pylate", "colbert"}:
-            pylate_add_documents([doc.url], [f"{doc.title}\n{doc.content}"])
-        else:
-            provider = get_embedding_provider()
-            embedding = provider.embed(f"{doc.title}\n{doc.content}")
-            vector = normalize_embedding(embedding.vector, Settings.embeddings_dim)
-            embedding_bytes = vector_to_bytes(vector)
-    record = IndexRecord(
-        doc_id=doc.url,
-        title=doc.title,
-        content=doc.content,
-        topics=extract_topics(doc.content),
-        source=source,
-        company=doc.company,
-        authors=doc.authors,
-        published_at=doc.published_at,
-        url=doc.canonical_url or doc.url,
-        lang=doc.language,
-        embedding=embedding_bytes,
-    )
-    mapping = {
+    if Settings.keyword_only:
+        model = "keyword"
+    elif provider_name in {"pylate", "colbert"}:
+        model = f"pylate:{Settings.pylate_model_name}"
+    elif provider_name in {"huggingface", "hf"}:
+        model = f"huggingface:{Settings.huggingface_embedding_model}"
+    else:
+        model = provider_name
+    vectors = vector_type() + (":i8" if Settings.embeddings_int8 else "")
+    if Settings.passage_chunking:
+        vectors += (
+            f":p{Settings.passage_size_words}/{Settings.passage_overlap_words}"
+        )
+    return f"v{INDEX_SCHEMA_VERSION}:{model}:{Settings.embeddings_dim}:{vectors}"
+
+
+def _document_text(doc: ParsedDocument) -> str:
+    return f"{doc.title}\n{doc.content}"
+
+
+def embed_parsed_documents(
+    docs: Sequence[ParsedDocument], *, in_plaid: Sequence[bool] | None = None
+) -> list[bytes | None]:
+    """
+    Embeds a batch of documents for the configured provider. PyLate docs are
+    handed to the PLAID write buffer, so no per-doc vector is returned; docs
+    flagged in `in_plaid` are already there (and in the token store) and are
+    skipped. ColBERT token embeddings for `rerank` mode are stored alongside
+    when `token_store_enabled()`.
+    """
+    if Settings.keyword_only or not docs:
+        return [None] * len(docs)
+    provider_name = Settings.embeddings_provider.lower()
+    if provider_name in {"pylate", "colbert"}:
+        fresh = _not_in_plaid(docs, in_plaid)
+        _store_rerank_tokens(fresh)
+        buffer = get_plaid_write_buffer()
+        for doc in fresh:
+            buffer.add(doc.url, _document_text(doc))
+        return [None] * len(docs)
+    _store_rerank_tokens(docs)
+    vectors = embed_documents([_document_text(doc) for doc in docs])
+    return [vector_to_bytes(vector) for vector in vectors]
+
+
+def _not_in_plaid(
+    docs: Sequence[ParsedDocument], in_plaid: Sequence[bool] | None
+) -> list[ParsedDocument]:
+    if in_plaid is None:
+        return list(docs)
+    return [doc for doc, present in zip(docs, in_plaid) if not present]
+
+
+def _store_rerank_tokens(docs: Sequence[ParsedDocument]) -> None:
+    if docs and token_store_enabled():
+        store_document_tokens(
+            [doc.url for doc in docs], [_document_text(doc) for doc in docs]
+        )
+
+
+def embed_parsed_passages(
+    docs: Sequence[ParsedDocument], *, in_plaid: Sequence[bool] | None = None
+) -> tuple[list[bytes | None], list[list[PassageRecord]]]:
+    """
+    Passage-chunked counterpart of `embed_parsed_documents`: every passage of
+    the batch (prefixed with its doc title) is embedded in one call, and the
+    doc vector is the normalized mean of its passage vectors, so whole
+    articles are never sent to the provider. PyLate passages go to the PLAID
+    write buffer as `{doc_id}#p{n}` and carry no vector.
+    """
+    if Settings.keyword_only or not docs:
+        return [None] * len(docs), [[] for _ in docs]
+    provider_name = Settings.embeddings_provider.lower()
+    plaid = provider_name in {"pylate", "colbert"}
+    _store_rerank_tokens(_not_in_plaid(docs, in_plaid) if plaid else docs)
+    chunks = [
+        chunk_passages(
+            doc.content,
+            size_words=Settings.passage_size_words,
+            overlap_words=Settings.passage_overlap_words,
+        )
+        for doc in docs
+    ]
+    texts = [
+        f"{doc.title}\n{passage.text}"
+        for doc, passages in zip(docs, chunks)
+        for passage in passages
+    ]
+    if plaid:
+        buffer = get_plaid_write_buffer()
+        skip = in_plaid if in_plaid is not None else [False] * len(docs)
+        ids = [
+            (passage_id(doc.url, passage.index), present)
+            for doc, passages, present in zip(docs, chunks, skip)
+            for passage in passages
+        ]
+        for (document_id, present), text in zip(ids, texts):
+            if not present:
+                buffer.add(document_id, text)
+        vectors: list[list[float] | None] = [None] * len(texts)
+    else:
+        vectors = list(embed_documents(texts))
+    embeddings: list[bytes | None] = []
+    records: list[list[PassageRecord]] = []
+    position = 0
+    for passages in chunks:
+        doc_vectors = vectors[position : position + len(passages)]
+        position += len(passages)
+        records.append(
+            [
+                PassageRecord(
+                    index=passage.index,
+                    start=passage.start,
+                    snippet=passage.snippet,
+                    embedding=vector_to_bytes(vector) if vector is not None else None,
+                )
+                for passage, vector in zip(passages, doc_vectors)
+            ]
+        )
+        present = [vector for vector in doc_vectors if vector is not None]
+        if not present:
+            embeddings.append(None)
+            continue
+        mean = np.mean(np.asarray(present, dtype=np.float32), axis=0)
+        norm = float(np.linalg.norm(mean))
+        embeddings.append(vector_to_bytes(mean / norm if norm > 0 else mean))
+    return embeddings, records
+
+
+def embed_for_index(
+    docs: Sequence[ParsedDocument], *, in_plaid: Sequence[bool] | None = None
+) -> tuple[list[bytes | None], list[list[PassageRecord]] | None]:
+    """
+    Doc vectors plus passages (None unless `PASSAGE_CHUNKING` is on). Docs
+    flagged in `in_plaid` are not re-added to the (unversioned) PLAID index.
+    """
+    if Settings.passage_chunking:
+        return embed_parsed_passages(docs, in_plaid=in_plaid)
+    return embed_parsed_documents(docs, in_plaid=in_plaid), None
+
+
+def _record_mapping(record: IndexRecord) -> dict[str, object]:
+    mapping: dict[str, object] = {
         "doc_id": record.doc_id,
         "title": record.title,
         "content": record.content,
@@ -85,12 +224,96 @@ async def index_document(
         "published_at": record.published_at or "",
         "url": record.url,
         "lang": record.lang or "",
+        "snippet_index": build_snippet_index(record.content),
     }
-    keyword_field_names = [field.name for field in Settings.keyword_fields]
-    if keyword_field_names:
-        existing_values = await redis_client.hmget(
-            f"doc:{record.doc_id}", keyword_field_names
+    published_ts = published_epoch(record.published_at)
+    if published_ts is not None:
+        mapping["published_ts"] = published_ts
+    if record.embedding is not None:
+        mapping["embedding"] = record.embedding
+        if Settings.embeddings_int8:
+            codes, scale = quantize_int8(bytes_to_array(record.embedding))
+            mapping["embedding_i8"] = codes
+            mapping["embedding_scale"] = repr(scale)
+    return mapping
+
+
+def publish_doc_changes(
+    pipe: redis.client.Pipeline, keys: Sequence[str], *, op: str
+) -> None:
+    """
+    Queues change-feed entries (`op` is "set" or "del") on `pipe`, so readers
+    such as the API doc cache see exactly the writes that were applied.
+    """
+    for key in keys:
+        pipe.xadd(
+            Settings.doc_change_stream_key,
+            {"key": key, "op": op},
+            maxlen=Settings.doc_change_stream_maxlen,
+            approximate=True,
+        )
+
+
+async def write_documents(
+    redis_client: redis.Redis,
+    items: Sequence[tuple[ParsedDocument, str, bytes | None]],
+    *,
+    content_hashes: Sequence[str | None] | None = None,
+    passages: Sequence[Sequence[PassageRecord]] | None = None,
+    doc_prefix: str = LEGACY_DOC_PREFIX,
+    live: bool = True,
+) -> None:
+    """
+    Writes (doc, source, embedding) items to `{doc_prefix}*` hashes in two
+    round trips. Only `live` writes bump `index:generation` and go to the
+    change feed; a background build's prefix is not searched until promotion,
+    which bumps the generation once and makes the API reload its doc cache.
+    `content_hashes` (parallel to `items`) are stored with the current
+    `index_version()` so incremental reindexing can skip unchanged docs.
+    `passages` (parallel to `items`) are written as `passage_prefix()` hashes
+    in the same pipeline; passages left over from a longer previous version
+    of a doc are deleted (and discarded from PLAID). Titles, companies and
+    topics are added to the typeahead suggestion dictionaries in the same
+    pipeline.
+    """
+    if not items:
+        return
+    if content_hashes is None:
+        content_hashes = [None] * len(items)
+    version = index_version()
+    mappings: list[tuple[str, dict[str, object]]] = []
+    for (doc, source, embedding_bytes), content_hash in zip(items, content_hashes):
+        log_event("index", url=doc.url, title=doc.title, source=source)
+        record = IndexRecord(
+            doc_id=doc.url,
+            title=doc.title,
+            content=doc.content,
+            topics=extract_topics(doc.content),
+            source=source,
+            company=doc.company,
+            authors=doc.authors,
+            published_at=doc.published_at,
+            url=doc.canonical_url or doc.url,
+            lang=doc.language,
+            embedding=embedding_bytes,
         )
+        mapping = _record_mapping(record)
+        if content_hash:
+            mapping["content_hash"] = content_hash
+            mapping["index_version"] = version
+        mappings.append((f"{doc_prefix}{record.doc_id}", mapping))
+    keyword_field_names = [field.name for field in Settings.keyword_fields]
+    previous_passages = [0] * len(mappings)
+    pipe = redis_client.pipeline(transaction=False)
+    for key, _ in mappings:
+        pipe.hmget(key, [*keyword_field_names, "passage_count"])
+    existing_rows = await pipe.execute()
+    for row, ((_, mapping), existing_values) in enumerate(
+        zip(mappings, existing_rows)
+    ):
+        *existing_values, passage_count = existing_values
+        if passage_count is not None:
+            previous_passages[row] = int(passage_count)
         for name, value in zip(keyword_field_names, existing_values):
             if mapping.get(name):
                 continue
@@ -102,13 +325,108 @@ async def index_document(
                 decoded = str(value)
             if decoded:
                 mapping[name] = decoded
-    if record.embedding is not None:
-        mapping["embedding"] = record.embedding
-    await redis_client.hset(f"doc:{record.doc_id}", mapping=mapping)
-    record_index()
+    if passages is not None:
+        for (_, mapping), records in zip(mappings, passages):
+            mapping["passage_count"] = len(records)
+    pipe = redis_client.pipeline(transaction=False)
+    for key, mapping in mappings:
+        pipe.hset(key, mapping=mapping)
+    if passages is not None:
+        _queue_passages(pipe, mappings, passages, previous_passages, doc_prefix)
+    queue_suggestions(pipe, [mapping for _, mapping in mappings])
+    if live:
+        publish_doc_changes(pipe, [key for key, _ in mappings], op="set")
+        pipe.incr(Settings.index_generation_key)
+    await pipe.execute()
+    await update_suggestion_weights(
+        redis_client, {key[len(doc_prefix) :]: mapping for key, mapping in mappings}
+    )
+    record_index(len(mappings))
 
 
-async def create_search_index(redis_client: redis.Redis, index_name: str) -> None:
+def plaid_document_ids(
+    doc: ParsedDocument, passages: Sequence[PassageRecord] | None
+) -> list[str]:
+    """PLAID ids `embed_for_index` buffered for `doc`."""
+    if passages is None:
+        return [doc.url]
+    return [passage_id(doc.url, record.index) for record in passages]
+
+
+async def write_content_hashes(
+    redis_client: redis.Redis, items: Sequence[tuple[str, str]]
+) -> None:
+    """
+    Stores (doc key, content hash) pairs with the current `index_version()`.
+    PyLate docs get them only once their PLAID write has landed, so an
+    incremental reindex re-embeds any doc whose flush was lost. Keys deleted
+    meanwhile are skipped.
+    """
+    if not items:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    for key, _ in items:
+        pipe.exists(key)
+    exists = await pipe.execute()
+    version = index_version()
+    pipe = redis_client.pipeline(transaction=False)
+    for (key, content_hash), present in zip(items, exists):
+        if present:
+            pipe.hset(
+                key, mapping={"content_hash": content_hash, "index_version": version}
+            )
+    await pipe.execute()
+
+
+def _queue_passages(
+    pipe: redis.client.Pipeline,
+    mappings: Sequence[tuple[str, dict[str, object]]],
+    passages: Sequence[Sequence[PassageRecord]],
+    previous_counts: Sequence[int],
+    doc_prefix: str,
+) -> None:
+    prefix = passage_prefix(doc_prefix)
+    for (key, _), records, previous in zip(mappings, passages, previous_counts):
+        doc_id = key[len(doc_prefix) :]
+        for record in records:
+            passage: dict[str, object] = {
+                "parent": key,
+                "start": record.start,
+                "snippet": record.snippet,
+            }
+            if record.embedding is not None:
+                passage["passage_embedding"] = record.embedding
+            pipe.hset(f"{prefix}{passage_id(doc_id, record.index)}", mapping=passage)
+        stale = [passage_id(doc_id, index) for index in range(len(records), previous)]
+        if stale:
+            pipe.delete(*(f"{prefix}{pid}" for pid in stale))
+            if Settings.embeddings_provider.lower() in {"pylate", "colbert"}:
+                get_plaid_write_buffer().discard(stale)
+
+
+async def index_document(
+    redis_client: redis.Redis,
+    doc: ParsedDocument,
+    source: str,
+    *,
+    doc_prefix: str = LEGACY_DOC_PREFIX,
+) -> None:
+    (embedding_bytes,), passages = embed_for_index([doc])
+    await write_documents(
+        redis_client,
+        [(doc, source, embedding_bytes)],
+        passages=passages,
+        doc_prefix=doc_prefix,
+    )
+
+
+async def create_search_index(
+    redis_client: redis.Redis,
+    index_name: str,
+    *,
+    override_plaid: bool = True,
+    doc_prefix: str = LEGACY_DOC_PREFIX,
+) -> None:
     provider_name = Settings.embeddings_provider.lower()
     if provider_name in {"pylate", "colbert"}:
         from eng_universe.search.pylate_backend import create_plaid_index
@@ -118,7 +436,7 @@ async def create_search_index(redis_client: redis.Redis, index_name: str) -> Non
             backend="pylate",
             index=f"{Settings.pylate_index_folder}/{Settings.pylate_index_name}",
         )
-        create_plaid_index(override=True)
+        create_plaid_index(override=override_plaid)
         log_event("ready", backend="pylate")
     vector_dim = Settings.embeddings_dim
     try:
@@ -139,6 +457,7 @@ async def create_search_index(redis_client: redis.Redis, index_name: str) -> Non
             ("company", "TAG"),
             ("authors", "TAG"),
             ("published_at", "TEXT"),
+            ("published_ts", "NUMERIC"),
             ("url", "TEXT"),
             ("lang", "TAG"),
         ):
@@ -148,28 +467,40 @@ async def create_search_index(redis_client: redis.Redis, index_name: str) -> Non
                 _schema_for_field(KeywordFieldConfig(name=name, field_type=field_type))
             )
         if not Settings.keyword_only and provider_name not in {"pylate", "colbert"}:
-            schema.extend(
-                [
-                    "embedding",
-                    "VECTOR",
-                    "HNSW",
-                    "6",
-                    "TYPE",
-                    "FLOAT32",
-                    "DIM",
-                    vector_dim,
-                    "DISTANCE_METRIC",
-                    "COSINE",
-                ]
-            )
+            hnsw_attrs: list[object] = [
+                "TYPE",
+                vector_type(),
+                "DIM",
+                vector_dim,
+                "DISTANCE_METRIC",
+                "COSINE",
+                "M",
+                Settings.hnsw_m,
+                "EF_CONSTRUCTION",
+                Settings.hnsw_ef_construction,
+                "EF_RUNTIME",
+                Settings.hnsw_ef_runtime,
+            ]
+            vector_fields = ["embedding"]
+            if Settings.passage_chunking:
+                vector_fields.append("passage_embedding")
+            for vector_field in vector_fields:
+                schema.extend(
+                    [vector_field, "VECTOR", "HNSW", len(hnsw_attrs), *hnsw_attrs]
+                )
+        # Passage hashes only carry `passage_embedding`, so text and filter
+        # queries never match them.
+        prefixes = [doc_prefix]
+        if Settings.passage_chunking:
+            prefixes.append(passage_prefix(doc_prefix))
         await redis_client.execute_command(
             "FT.CREATE",
             index_name,
             "ON",
             "HASH",
             "PREFIX",
-            "1",
-            "doc:",
+            str(len(prefixes)),
+            *prefixes,
             "NOOFFSETS",  # Skip term offsets (saves memory, disables search result highlighting)
             "SCHEMA",
             *schema,
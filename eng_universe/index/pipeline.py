@@ -1,16 +1,51 @@
 import asyncio
+import hashlib
 import time
-from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import Awaitable, Callable
 
 import redis.asyncio as redis
 
 from eng_universe.config import Settings
-from eng_universe.ingest.etl import parse_html
+from eng_universe.ingest.etl import ParsedDocument, parse_html
 from eng_universe.index.entities import extract_topics
-from eng_universe.index.indexer import index_document, log_event
+from eng_universe.index.indexer import (
+    PassageRecord,
+    create_search_index,
+    embed_for_index,
+    index_version,
+    log_event,
+    plaid_document_ids,
+    publish_doc_changes,
+    write_content_hashes,
+    write_documents,
+)
+from eng_universe.index.versions import (
+    bump_index_generation,
+    doc_prefix,
+    get_live_doc_prefix,
+    next_version,
+    physical_index_name,
+    promote_version,
+)
+from eng_universe.monitoring.metrics import INDEX_STAGE_QUEUE_DEPTH, record_index_stage
+from eng_universe.search.passages import passage_id, passage_prefix
+from eng_universe.search.pylate_backend import (
+    flush_plaid_buffer,
+    get_plaid_write_buffer,
+    remove_documents as pylate_remove_documents,
+)
+from eng_universe.search.suggest import (
+    queue_suggestion_removals,
+    update_suggestion_weights,
+)
+from eng_universe.search.token_store import compact_token_store, token_store_enabled
 from eng_universe.storage.r2 import download_text, r2_enabled, upload_json, upload_text
 
+_STOP = object()
+
 
 def _read_text(path: str) -> str:
     if not path:
@@ -40,102 +75,657 @@ def _decode_int(value: object | None) -> int | None:
         return None
 
 
-async def index_worker(doc_key_prefix: str | None = None) -> None:
-    redis_client = redis.from_url(Settings.redis_url)
-    prefix = doc_key_prefix or Settings.crawl_doc_key_prefix
+@dataclass
+class IndexJob:
+    raw_doc_id: str
+    url: str
+    source: str
+    raw_path: str
+    cleaned_path: str
+    raw_key: str
+    clean_key: str
+    domain: str
+    depth: int | None
+    fetched_at: int | None
+    status: int | None
+    raw_html: str = ""
+    cleaned_html: str = ""
+    parsed: ParsedDocument | None = None
+    embedding: bytes | None = None
+    passages: list[PassageRecord] | None = None
+    content_hash: str = ""
+    indexed_hash: str = ""
+    indexed_version: str = ""
+    in_plaid: bool = False
+
+
+def _content_hash(raw_html: str, cleaned_html: str) -> str:
+    digest = hashlib.sha256(raw_html.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(cleaned_html.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _job_from_meta(raw_doc_id: str, crawl_meta: dict[bytes, bytes]) -> IndexJob:
+    return IndexJob(
+        raw_doc_id=raw_doc_id,
+        url=_decode_bytes(crawl_meta.get(b"url")),
+        source=_decode_bytes(crawl_meta.get(b"source")),
+        raw_path=_decode_bytes(crawl_meta.get(b"raw_path")),
+        cleaned_path=_decode_bytes(crawl_meta.get(b"cleaned_path")),
+        raw_key=_decode_bytes(crawl_meta.get(b"raw_key")) or f"raw/{raw_doc_id}.html",
+        clean_key=(
+            _decode_bytes(crawl_meta.get(b"clean_key")) or f"clean/{raw_doc_id}.txt"
+        ),
+        domain=_decode_bytes(crawl_meta.get(b"domain")),
+        depth=_decode_int(crawl_meta.get(b"depth")),
+        fetched_at=_decode_int(crawl_meta.get(b"fetched_at")),
+        status=_decode_int(crawl_meta.get(b"status")),
+    )
+
+
+def parse_job_html(url: str, raw_html: str, cleaned_html: str) -> ParsedDocument:
+    """
+    Parses metadata from the raw HTML and content from the cleaned HTML.
+    Runs in the parse process pool, so it must stay a picklable module function.
+    """
+    base_html = raw_html or cleaned_html
+    parsed = parse_html(url, base_html)
+    if cleaned_html and raw_html:
+        cleaned_parsed = parse_html(url, cleaned_html)
+        parsed = replace(parsed, content=cleaned_parsed.content)
+    return parsed
+
+
+class Stage:
+    """A bounded queue drained by `concurrency` workers."""
+
+    def __init__(self, name: str, maxsize: int, concurrency: int) -> None:
+        self.name = name
+        self.queue: asyncio.Queue[object] = asyncio.Queue(maxsize=max(1, maxsize))
+        self.concurrency = max(1, concurrency)
+        self.processed = 0
+        self._tasks: list[asyncio.Task[None]] = []
+        INDEX_STAGE_QUEUE_DEPTH.labels(stage=name).set_function(self.queue.qsize)
+
+    def start(
+        self,
+        handler: Callable[[IndexJob], Awaitable[IndexJob | None]],
+        downstream: "Stage | None",
+    ) -> None:
+        for _ in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._work(handler, downstream)))
+
+    def start_batched(
+        self,
+        handler: Callable[[list[IndexJob]], Awaitable[list[IndexJob]]],
+        downstream: "Stage | None",
+        batch_size: int,
+    ) -> None:
+        for _ in range(self.concurrency):
+            self._tasks.append(
+                asyncio.create_task(
+                    self._work_batched(handler, downstream, max(1, batch_size))
+                )
+            )
+
+    async def stop(self) -> None:
+        """Lets workers drain everything queued so far, then waits for them."""
+        for _ in self._tasks:
+            await self.queue.put(_STOP)
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+    def cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    def _done(self, count: int) -> None:
+        self.processed += count
+        record_index_stage(self.name, count)
+
+    async def _work(
+        self,
+        handler: Callable[[IndexJob], Awaitable[IndexJob | None]],
+        downstream: "Stage | None",
+    ) -> None:
+        while True:
+            item = await self.queue.get()
+            if item is _STOP:
+                return
+            job: IndexJob = item  # type: ignore[assignment]
+            try:
+                result = await handler(job)
+            except Exception as exc:
+                log_event(
+                    "fail",
+                    stage=self.name,
+                    doc_id=job.raw_doc_id,
+                    error=f"{type(exc).__name__}: {exc}",
+                )
+                continue
+            self._done(1)
+            if result is not None and downstream is not None:
+                await downstream.queue.put(result)
+
+    async def _work_batched(
+        self,
+        handler: Callable[[list[IndexJob]], Awaitable[list[IndexJob]]],
+        downstream: "Stage | None",
+        batch_size: int,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is _STOP:
+                return
+            batch: list[IndexJob] = [item]  # type: ignore[list-item]
+            deadline = loop.time() + Settings.indexer_batch_linger_s
+            while len(batch) < batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout <= 0:
+                        item = self.queue.get_nowait()
+                    else:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)  # type: ignore[arg-type]
+            try:
+                results = await handler(batch)
+            except Exception as exc:
+                log_event(
+                    "fail",
+                    stage=self.name,
+                    docs=len(batch),
+                    error=f"{type(exc).__name__}: {exc}",
+                )
+                continue
+            self._done(len(batch))
+            if downstream is not None:
+                for result in results:
+                    await downstream.queue.put(result)
+
+
+async def _load_job(job: IndexJob, *, incremental: bool) -> IndexJob | None:
+    raw_html = ""
+    if r2_enabled():
+        try:
+            raw_html = await asyncio.to_thread(download_text, job.raw_key) or ""
+        except Exception as exc:
+            log_event("r2_fail", doc_id=job.raw_doc_id, error=type(exc).__name__)
+            raw_html = ""
+    if not raw_html:
+        raw_html = await asyncio.to_thread(_read_text, job.raw_path)
+    cleaned_html = await asyncio.to_thread(_read_text, job.cleaned_path)
+    if not job.url or not (raw_html or cleaned_html):
+        log_event("skip", doc_id=job.raw_doc_id, url=job.url, reason="missing_html")
+        return None
+    job.content_hash = _content_hash(raw_html, cleaned_html)
+    unchanged = (
+        job.content_hash == job.indexed_hash
+        and job.indexed_version == index_version()
+    )
+    if incremental and unchanged:
+        record_index_stage("unchanged")
+        return None
+    # A full build looks hashes up under the live prefix: PLAID is not
+    # versioned, so a doc unchanged since then is already in it.
+    job.in_plaid = unchanged
+    job.raw_html = raw_html
+    job.cleaned_html = cleaned_html
+    return job
+
+
+async def _upload_job(job: IndexJob) -> IndexJob:
+    parsed = job.parsed
+    if parsed is None or not r2_enabled():
+        return job
+    raw_doc_id = job.raw_doc_id
+    index_payload = {
+        "doc_id": int(raw_doc_id) if raw_doc_id.isdigit() else raw_doc_id,
+        "url": parsed.url,
+        "canonical_url": parsed.canonical_url,
+        "title": parsed.title,
+        "content": parsed.content,
+        "authors": parsed.authors,
+        "company": parsed.company,
+        "published_at": parsed.published_at,
+        "language": parsed.language,
+        "source": job.source,
+        "domain": job.domain,
+        "depth": job.depth,
+        "fetched_at": job.fetched_at,
+        "status": job.status,
+        "topics": extract_topics(parsed.content),
+        "raw_key": job.raw_key,
+        "clean_key": job.clean_key,
+    }
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(upload_text, parsed.content, job.clean_key),
+            asyncio.to_thread(upload_json, index_payload, f"index/{raw_doc_id}.json"),
+        )
+    except Exception as exc:
+        log_event("r2_fail", doc_id=raw_doc_id, error=type(exc).__name__)
+    return job
+
+
+async def _embed_jobs(jobs: list[IndexJob]) -> list[IndexJob]:
+    jobs = [job for job in jobs if job.parsed is not None]
+    docs = [job.parsed for job in jobs]
+    embeddings, passages = await asyncio.to_thread(
+        embed_for_index, docs, in_plaid=[job.in_plaid for job in jobs]
+    )
+    for index, (job, embedding) in enumerate(zip(jobs, embeddings)):
+        job.embedding = embedding
+        job.passages = passages[index] if passages is not None else None
+    return jobs
+
+
+def _uses_plaid() -> bool:
+    return Settings.embeddings_provider.lower() in {"pylate", "colbert"}
+
+
+async def _record_plaid_synced(redis_client: redis.Redis) -> None:
+    """Stores the content hashes of docs whose PLAID writes have landed."""
+    synced = get_plaid_write_buffer().take_synced()
+    await write_content_hashes(redis_client, synced)  # type: ignore[arg-type]
+
+
+async def _fetch_jobs(
+    redis_client: redis.Redis,
+    prefix: str,
+    downstream: Stage,
+    *,
+    incremental: bool,
+    queue_key: str,
+    resolve_prefix: Callable[[], Awaitable[str]],
+    exit_on_idle: bool,
+    plaid_prefix: str | None = None,
+) -> int:
+    """
+    Pops crawl doc ids in batches and feeds their metadata into the pipeline.
+    Stored hashes are looked up under the write prefix in incremental mode and
+    under `plaid_prefix` otherwise.
+    """
+    fetched = 0
     last_idle_log = 0.0
     idle_since: float | None = None
     while True:
-        raw_doc_id = await redis_client.lpop(Settings.raw_queue_key)
-        if raw_doc_id is None:
+        raw_doc_ids = await redis_client.lpop(
+            queue_key, Settings.indexer_fetch_batch_size
+        )
+        if not raw_doc_ids:
             now = time.time()
             if idle_since is None:
                 idle_since = now
+            if len(get_plaid_write_buffer()):
+                if await asyncio.to_thread(get_plaid_write_buffer().flush_if_due):
+                    await bump_index_generation(redis_client)
+                    await _record_plaid_synced(redis_client)
             if now - last_idle_log > 10:
-                log_event("idle", queue=Settings.raw_queue_key)
+                log_event("idle", queue=queue_key)
                 last_idle_log = now
-            if (
-                Settings.indexer_exit_on_idle
-                and now - idle_since >= Settings.indexer_idle_grace_s
-            ):
+            if exit_on_idle and now - idle_since >= Settings.indexer_idle_grace_s:
                 log_event(
                     "done",
                     reason="idle",
-                    queue=Settings.raw_queue_key,
+                    queue=queue_key,
                     idle_s=round(now - idle_since, 1),
                 )
-                break
+                return fetched
             await asyncio.sleep(0.2)
             continue
         idle_since = None
-        raw_doc_id = raw_doc_id.decode()
-        crawl_meta = await redis_client.hgetall(f"{prefix}{raw_doc_id}")
-        if not crawl_meta:
-            log_event("skip", doc_id=raw_doc_id, reason="missing_meta")
+        doc_ids = [raw_doc_id.decode() for raw_doc_id in raw_doc_ids]
+        pipe = redis_client.pipeline(transaction=False)
+        for raw_doc_id in doc_ids:
+            pipe.hgetall(f"{prefix}{raw_doc_id}")
+        crawl_metas = await pipe.execute()
+        fetched += len(doc_ids)
+        record_index_stage("fetch", len(doc_ids))
+        jobs: list[IndexJob] = []
+        for raw_doc_id, crawl_meta in zip(doc_ids, crawl_metas):
+            if not crawl_meta:
+                log_event("skip", doc_id=raw_doc_id, reason="missing_meta")
+                continue
+            jobs.append(_job_from_meta(raw_doc_id, crawl_meta))
+        hash_prefix = await resolve_prefix() if incremental else plaid_prefix
+        if hash_prefix is not None and jobs:
+            pipe = redis_client.pipeline(transaction=False)
+            for job in jobs:
+                pipe.hmget(
+                    f"{hash_prefix}{job.url}", ["content_hash", "index_version"]
+                )
+            for job, (indexed_hash, indexed_version) in zip(
+                jobs, await pipe.execute()
+            ):
+                job.indexed_hash = _decode_bytes(indexed_hash)
+                job.indexed_version = _decode_bytes(indexed_version)
+        for job in jobs:
+            await downstream.queue.put(job)
+
+
+async def _report_stages(stages: list[Stage], interval_s: float) -> None:
+    last = {stage.name: stage.processed for stage in stages}
+    while True:
+        await asyncio.sleep(interval_s)
+        fields: dict[str, str] = {}
+        for stage in stages:
+            rate = (stage.processed - last[stage.name]) / interval_s
+            last[stage.name] = stage.processed
+            fields[stage.name] = f"{rate:.1f}/s,q={stage.queue.qsize()}"
+        log_event("stages", **fields)
+
+
+async def requeue_crawl_docs(
+    redis_client: redis.Redis,
+    prefix: str | None = None,
+    *,
+    queue_key: str | None = None,
+    batch_size: int = 1000,
+    fetched_since: int | None = None,
+) -> int:
+    """
+    Pushes every crawl doc id onto the raw queue (or `queue_key`), or only
+    those whose `fetched_at` is at or after `fetched_since`.
+    """
+    prefix = prefix or Settings.crawl_doc_key_prefix
+    queue_key = queue_key or Settings.raw_queue_key
+    batch: list[str] = []
+    total = 0
+
+    async def _push() -> None:
+        nonlocal total
+        doc_ids = list(batch)
+        batch.clear()
+        if fetched_since is not None:
+            pipe = redis_client.pipeline(transaction=False)
+            for doc_id in doc_ids:
+                pipe.hget(f"{prefix}{doc_id}", "fetched_at")
+            fetched = await pipe.execute()
+            doc_ids = [
+                doc_id
+                for doc_id, fetched_at in zip(doc_ids, fetched)
+                if (_decode_int(fetched_at) or 0) >= fetched_since
+            ]
+        if doc_ids:
+            await redis_client.rpush(queue_key, *doc_ids)
+            total += len(doc_ids)
+
+    async for key in redis_client.scan_iter(match=f"{prefix}*", count=1000):
+        key_str = _decode_bytes(key)
+        if not key_str.startswith(prefix):
             continue
-        url = _decode_bytes(crawl_meta.get(b"url"))
-        source = _decode_bytes(crawl_meta.get(b"source"))
-        raw_path = _decode_bytes(crawl_meta.get(b"raw_path"))
-        cleaned_path = _decode_bytes(crawl_meta.get(b"cleaned_path"))
-        raw_key = _decode_bytes(crawl_meta.get(b"raw_key"))
-        clean_key = _decode_bytes(crawl_meta.get(b"clean_key"))
-        if not raw_key:
-            raw_key = f"raw/{raw_doc_id}.html"
-        if not clean_key:
-            clean_key = f"clean/{raw_doc_id}.txt"
-        domain = _decode_bytes(crawl_meta.get(b"domain"))
-        depth = _decode_int(crawl_meta.get(b"depth"))
-        fetched_at = _decode_int(crawl_meta.get(b"fetched_at"))
-        status = _decode_int(crawl_meta.get(b"status"))
-        raw_html = ""
-        if r2_enabled():
-            try:
-                raw_html = await asyncio.to_thread(download_text, raw_key)
-            except Exception as exc:
-                log_event("r2_fail", doc_id=raw_doc_id, error=type(exc).__name__)
-                raw_html = ""
-        if not raw_html:
-            raw_html = _read_text(raw_path)
-        cleaned_html = _read_text(cleaned_path)
-        if not url or not (raw_html or cleaned_html):
-            log_event("skip", doc_id=raw_doc_id, url=url, reason="missing_html")
+        doc_id = key_str[len(prefix) :]
+        if not doc_id:
             continue
-        base_html = raw_html or cleaned_html
-        parsed = parse_html(url, base_html)
-        if cleaned_html:
-            cleaned_parsed = parse_html(url, cleaned_html)
-            parsed = replace(parsed, content=cleaned_parsed.content)
-        if r2_enabled():
-            index_payload = {
-                "doc_id": int(raw_doc_id) if raw_doc_id.isdigit() else raw_doc_id,
-                "url": parsed.url,
-                "canonical_url": parsed.canonical_url,
-                "title": parsed.title,
-                "content": parsed.content,
-                "authors": parsed.authors,
-                "company": parsed.company,
-                "published_at": parsed.published_at,
-                "language": parsed.language,
-                "source": source,
-                "domain": domain,
-                "depth": depth,
-                "fetched_at": fetched_at,
-                "status": status,
-                "topics": extract_topics(parsed.content),
-                "raw_key": raw_key,
-                "clean_key": clean_key,
-            }
-            try:
-                await asyncio.to_thread(
-                    upload_text,
-                    parsed.content,
-                    clean_key,
-                )
-                await asyncio.to_thread(
-                    upload_json,
-                    index_payload,
-                    f"index/{raw_doc_id}.json",
+        batch.append(doc_id)
+        if len(batch) >= batch_size:
+            await _push()
+    if batch:
+        await _push()
+    return total
+
+
+async def delete_orphan_documents(
+    redis_client: redis.Redis,
+    prefix: str | None = None,
+    *,
+    index_prefix: str | None = None,
+    batch_size: int = 500,
+) -> int:
+    """Deletes indexed doc hashes whose URL no longer has crawl metadata."""
+    prefix = prefix or Settings.crawl_doc_key_prefix
+    if index_prefix is None:
+        index_prefix = await get_live_doc_prefix(redis_client)
+    crawl_urls: set[str] = set()
+    keys: list[bytes] = []
+
+    async def _collect_urls() -> None:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hget(key, "url")
+        for url in await pipe.execute():
+            if url:
+                crawl_urls.add(_decode_bytes(url))
+        keys.clear()
+
+    async for key in redis_client.scan_iter(match=f"{prefix}*", count=1000):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            await _collect_urls()
+    if keys:
+        await _collect_urls()
+    if not crawl_urls:
+        log_event("orphans", deleted=0, reason="no_crawl_metadata")
+        return 0
+    orphans: list[str] = []
+    async for key in redis_client.scan_iter(match=f"{index_prefix}*", count=1000):
+        doc_key = _decode_bytes(key)
+        if doc_key[len(index_prefix) :] not in crawl_urls:
+            orphans.append(doc_key)
+    orphan_passages: list[str] = []
+    passages_prefix = passage_prefix(index_prefix)
+    for start in range(0, len(orphans), batch_size):
+        chunk = orphans[start : start + batch_size]
+        pipe = redis_client.pipeline(transaction=False)
+        for doc_key in chunk:
+            pipe.hmget(doc_key, ["passage_count", "title"])
+        chunk_passages: list[str] = []
+        titles: list[object] = []
+        for doc_key, (count, title) in zip(chunk, await pipe.execute()):
+            chunk_passages.extend(
+                passage_id(doc_key[len(index_prefix) :], index)
+                for index in range(int(count or 0))
+            )
+            titles.append(title)
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.delete(*chunk, *(f"{passages_prefix}{pid}" for pid in chunk_passages))
+        queue_suggestion_removals(pipe, titles)
+        publish_doc_changes(pipe, chunk, op="del")
+        await pipe.execute()
+        await update_suggestion_weights(
+            redis_client, {doc_key[len(index_prefix) :]: None for doc_key in chunk}
+        )
+        orphan_passages.extend(chunk_passages)
+    if orphans and Settings.embeddings_provider.lower() in {"pylate", "colbert"}:
+        await asyncio.to_thread(
+            pylate_remove_documents,
+            [key[len(index_prefix) :] for key in orphans] + orphan_passages,
+        )
+    if orphans:
+        await bump_index_generation(redis_client)
+    log_event("orphans", deleted=len(orphans))
+    return len(orphans)
+
+
+async def index_worker(
+    doc_key_prefix: str | None = None,
+    *,
+    incremental: bool | None = None,
+    index_prefix: str | None = None,
+    queue_key: str | None = None,
+    exit_on_idle: bool | None = None,
+    plaid_prefix: str | None = None,
+) -> None:
+    """
+    Runs the staged indexing pipeline:
+    fetch -> load (async I/O) -> parse (process pool) -> upload (async I/O)
+    -> embed (batched) -> write (batched Redis pipeline).
+    In incremental mode, docs whose input HTML hash and `index_version()`
+    match the stored doc hash are dropped after the load stage.
+    Docs are written under `index_prefix` (a background build, which leaves the
+    search result cache alone); by default the live version's prefix is looked
+    up per write batch, so a long-running worker follows promotions.
+    The worker returns once `queue_key` has stayed empty for the idle grace
+    period if `exit_on_idle` (default `INDEXER_EXIT_ON_IDLE`). A full pass
+    given `plaid_prefix` does not re-add docs whose hash under that prefix
+    still matches to PLAID.
+    """
+    if incremental is None:
+        incremental = Settings.indexer_incremental
+    if exit_on_idle is None:
+        exit_on_idle = Settings.indexer_exit_on_idle
+    redis_client = redis.from_url(Settings.redis_url)
+    prefix = doc_key_prefix or Settings.crawl_doc_key_prefix
+    queue_key = queue_key or Settings.raw_queue_key
+
+    async def _resolve_prefix() -> str:
+        if index_prefix is not None:
+            return index_prefix
+        return await get_live_doc_prefix(redis_client)
+
+    queue_size = Settings.indexer_queue_size
+    io_concurrency = Settings.indexer_io_concurrency
+    load = Stage("load", queue_size, io_concurrency)
+    parse = Stage("parse", queue_size, Settings.indexer_parse_workers)
+    upload = Stage("upload", queue_size, io_concurrency)
+    embed = Stage("embed", queue_size, Settings.indexer_embed_concurrency)
+    write = Stage("write", queue_size, 1)
+    stages = [load, parse, upload, embed, write]
+    pool = ProcessPoolExecutor(max_workers=parse.concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def _parse_job(job: IndexJob) -> IndexJob:
+        job.parsed = await loop.run_in_executor(
+            pool, parse_job_html, job.url, job.raw_html, job.cleaned_html
+        )
+        job.raw_html = ""
+        job.cleaned_html = ""
+        return job
+
+    async def _write_jobs(jobs: list[IndexJob]) -> list[IndexJob]:
+        jobs = [job for job in jobs if job.parsed is not None]
+        plaid = _uses_plaid() and not Settings.keyword_only
+        write_prefix = await _resolve_prefix()
+        await write_documents(
+            redis_client,
+            [(job.parsed, job.source, job.embedding) for job in jobs],
+            # PyLate docs get their hash once the PLAID buffer has flushed them.
+            content_hashes=[
+                job.content_hash if job.in_plaid or not plaid else None
+                for job in jobs
+            ],
+            passages=(
+                [job.passages or [] for job in jobs]
+                if Settings.passage_chunking
+                else None
+            ),
+            doc_prefix=write_prefix,
+            live=index_prefix is None,
+        )
+        if plaid:
+            buffer = get_plaid_write_buffer()
+            for job in jobs:
+                if job.parsed is None or job.in_plaid:
+                    continue
+                buffer.when_synced(
+                    plaid_document_ids(
+                        job.parsed,
+                        job.passages if Settings.passage_chunking else None,
+                    ),
+                    (f"{write_prefix}{job.parsed.url}", job.content_hash),
                 )
-            except Exception as exc:
-                log_event("r2_fail", doc_id=raw_doc_id, error=type(exc).__name__)
-        await index_document(redis_client, parsed, source=source)
+            await _record_plaid_synced(redis_client)
+        return jobs
+
+    async def _load(job: IndexJob) -> IndexJob | None:
+        return await _load_job(job, incremental=incremental)
+
+    load.start(_load, parse)
+    parse.start(_parse_job, upload)
+    upload.start(_upload_job, embed)
+    embed.start_batched(_embed_jobs, write, Settings.embeddings_batch_size)
+    write.start_batched(_write_jobs, None, Settings.indexer_write_batch_size)
+    reporter = asyncio.create_task(
+        _report_stages(stages, max(0.1, Settings.indexer_stats_interval_s))
+    )
+    start = time.perf_counter()
+    try:
+        fetched = await _fetch_jobs(
+            redis_client,
+            prefix,
+            load,
+            incremental=incremental,
+            queue_key=queue_key,
+            resolve_prefix=_resolve_prefix,
+            exit_on_idle=exit_on_idle,
+            plaid_prefix=plaid_prefix,
+        )
+        for stage in stages:
+            await stage.stop()
+    finally:
+        reporter.cancel()
+        for stage in stages:
+            stage.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+    if await asyncio.to_thread(flush_plaid_buffer):
+        await bump_index_generation(redis_client)
+    if _uses_plaid():
+        await _record_plaid_synced(redis_client)
+    elapsed_s = time.perf_counter() - start
+    log_event(
+        "pipeline",
+        fetched=fetched,
+        written=write.processed,
+        elapsed_s=round(elapsed_s, 1),
+        docs_per_s=round(write.processed / elapsed_s, 1) if elapsed_s else 0,
+    )
+
+
+async def build_index_version(
+    redis_client: redis.Redis, *, promote: bool = True
+) -> int:
+    """
+    Builds a new physical index over a fresh doc prefix from every crawl doc
+    while the alias keeps serving the live version, then (optionally) promotes
+    it with an atomic FT.ALIASUPDATE.
+    The live indexer keeps writing docs crawled meanwhile to the live prefix
+    only, so they are requeued onto the build before promotion, and those
+    crawled during that catch-up onto the live queue after it. The build
+    re-stores every changed doc's tokens, so it ends by compacting the ColBERT
+    token store.
+    """
+    version = await next_version(redis_client)
+    index_name = physical_index_name(version)
+    index_prefix = doc_prefix(version)
+    await create_search_index(
+        redis_client, index_name, override_plaid=False, doc_prefix=index_prefix
+    )
+    plaid_prefix = await get_live_doc_prefix(redis_client) if _uses_plaid() else None
+    # A dedicated queue keeps the live indexer draining raw:queue meanwhile.
+    queue_key = f"{Settings.raw_queue_key}:v{version}"
+    started = int(time.time())
+    requeued = await requeue_crawl_docs(redis_client, queue_key=queue_key)
+    log_event("build", index=index_name, prefix=index_prefix, requeued=requeued)
+    await index_worker(
+        incremental=False,
+        index_prefix=index_prefix,
+        queue_key=queue_key,
+        exit_on_idle=True,
+        plaid_prefix=plaid_prefix,
+    )
+    caught_up = int(time.time())
+    requeued = await requeue_crawl_docs(
+        redis_client, queue_key=queue_key, fetched_since=started
+    )
+    log_event("build_catch_up", index=index_name, requeued=requeued)
+    if requeued:
+        await index_worker(
+            incremental=True,
+            index_prefix=index_prefix,
+            queue_key=queue_key,
+            exit_on_idle=True,
+        )
+    if token_store_enabled():
+        await asyncio.to_thread(compact_token_store)
+    if promote:
+        await promote_version(redis_client, version)
+        await requeue_crawl_docs(redis_client, fetched_since=caught_up)
+    return version
@@ -0,0 +1,159 @@
+"""Versioned (blue/green) RediSearch indexes behind a stable alias."""
+
+import asyncio
+import time
+
+import redis.asyncio as redis
+
+from eng_universe.config import Settings
+from eng_universe.monitoring.logging_utils import get_event_logger
+
+log_event = get_event_logger("versions")
+
+LEGACY_DOC_PREFIX = "doc:"
+
+
+def _decode(value: object) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    return str(value)
+
+
+def physical_index_name(version: int) -> str:
+    return f"{Settings.search_index_name}:v{version}"
+
+
+def doc_prefix(version: int | None) -> str:
+    """
+    Key prefix for a version's `doc` hashes. Versioned prefixes deliberately do
+    not start with `doc:` so a legacy index on `doc:` never picks them up.
+    """
+    if not version:
+        return LEGACY_DOC_PREFIX
+    return f"v{version}:{LEGACY_DOC_PREFIX}"
+
+
+async def _get_int(redis_client: redis.Redis, key: str) -> int | None:
+    raw = await redis_client.get(key)
+    if raw is None:
+        return None
+    try:
+        return int(_decode(raw))
+    except ValueError:
+        return None
+
+
+async def get_live_version(redis_client: redis.Redis) -> int | None:
+    return await _get_int(redis_client, Settings.index_live_version_key)
+
+
+async def get_live_doc_prefix(redis_client: redis.Redis) -> str:
+    return doc_prefix(await get_live_version(redis_client))
+
+
+async def live_index_target(redis_client: redis.Redis) -> tuple[str, str]:
+    """(physical index name, doc prefix) that live writes should go to."""
+    version = await get_live_version(redis_client)
+    if version is None:
+        return Settings.search_index_name, LEGACY_DOC_PREFIX
+    return physical_index_name(version), doc_prefix(version)
+
+
+async def bump_index_generation(redis_client: redis.Redis) -> int:
+    """Invalidates cached search results after any change to indexed docs."""
+    return int(await redis_client.incr(Settings.index_generation_key))
+
+
+async def next_version(redis_client: redis.Redis) -> int:
+    return int(await redis_client.incr(Settings.index_version_seq_key))
+
+
+async def index_info(redis_client: redis.Redis, index_name: str) -> dict[str, str]:
+    raw = await redis_client.execute_command("FT.INFO", index_name)
+    items = list(raw)
+    return {
+        _decode(items[i]): _decode(items[i + 1])
+        for i in range(0, len(items) - 1, 2)
+        if not isinstance(items[i + 1], (list, tuple))
+    }
+
+
+async def wait_until_indexed(
+    redis_client: redis.Redis, index_name: str, *, timeout_s: float = 600.0
+) -> int:
+    """Waits for background indexing to finish; returns the index's num_docs."""
+    deadline = time.monotonic() + timeout_s
+    while True:
+        info = await index_info(redis_client, index_name)
+        if info.get("indexing", "0") in {"0", "0.0"}:
+            return int(float(info.get("num_docs", "0")))
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{index_name} still indexing after {timeout_s}s")
+        await asyncio.sleep(1.0)
+
+
+async def _drop_legacy_index(redis_client: redis.Redis) -> None:
+    """
+    A pre-versioning deployment has a physical index named like the alias,
+    which shadows the alias until it is dropped (keeping its `doc:` hashes).
+    """
+    alias = Settings.search_index_name
+    try:
+        info = await index_info(redis_client, alias)
+    except redis.ResponseError:
+        return
+    if info.get("index_name") == alias:
+        await redis_client.execute_command("FT.DROPINDEX", alias)
+        log_event("drop", index=alias, reason="legacy")
+
+
+async def promote_version(
+    redis_client: redis.Redis, version: int, *, min_docs: int = 1
+) -> None:
+    """Atomically points the search alias at `idx:...:v{version}`."""
+    index_name = physical_index_name(version)
+    num_docs = await wait_until_indexed(redis_client, index_name)
+    if num_docs < min_docs:
+        raise RuntimeError(
+            f"Refusing to promote {index_name}: {num_docs} docs < {min_docs}"
+        )
+    previous = await get_live_version(redis_client)
+    # Alias first: queries keep hitting the legacy index until it is dropped.
+    await redis_client.execute_command(
+        "FT.ALIASUPDATE", Settings.search_index_name, index_name
+    )
+    await _drop_legacy_index(redis_client)
+    pipe = redis_client.pipeline()
+    pipe.set(Settings.index_live_version_key, version)
+    pipe.incr(Settings.index_generation_key)
+    if previous is not None and previous != version:
+        pipe.set(Settings.index_previous_version_key, previous)
+    await pipe.execute()
+    log_event(
+        "promote",
+        alias=Settings.search_index_name,
+        index=index_name,
+        docs=num_docs,
+        previous=previous,
+    )
+
+
+async def rollback_version(redis_client: redis.Redis) -> int:
+    """Points the alias back at the previously live version and returns it."""
+    previous = await _get_int(redis_client, Settings.index_previous_version_key)
+    if previous is None:
+        raise RuntimeError("No previous index version to roll back to")
+    await promote_version(redis_client, previous, min_docs=0)
+    return previous
+
+
+async def drop_version(
+    redis_client: redis.Redis, version: int, *, delete_docs: bool = False
+) -> None:
+    if version == await get_live_version(redis_client):
+        raise RuntimeError(f"Refusing to drop live index version {version}")
+    args: list[object] = ["FT.DROPINDEX", physical_index_name(version)]
+    if delete_docs:
+        args.append("DD")
+    await redis_client.execute_command(*args)
+    log_event("drop", index=physical_index_name(version), delete_docs=delete_docs)
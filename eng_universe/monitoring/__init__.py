@@ -2,10 +2,33 @@
 
 from eng_universe.monitoring.metrics import (
     CRAWL_PAGES,
+    DOC_CACHE_REFRESH_LAG_MS,
+    DOC_CACHE_UPDATES,
+    EMBEDDING_CACHE_LOOKUPS,
     INDEX_DOCS,
+    PLAID_FLUSH_DOCS,
+    PLAID_FLUSH_LATENCY_MS,
+    PYLATE_QUERY_BATCH_LATENCY_MS,
+    PYLATE_QUERY_BATCH_SIZE,
+    QUERY_EMBEDDING_CACHE_LOOKUPS,
+    SEARCH_EARLY_EXITS,
     SEARCH_LATENCY_MS,
+    SEARCH_LEG_LATENCY_MS,
+    SEARCH_RESULT_CACHE_LOOKUPS,
+    SEARCH_SINGLE_FLIGHT,
+    SEARCH_STAGE_LATENCY_MS,
     record_crawl,
+    record_doc_cache_refresh,
+    record_embedding_cache,
     record_index,
+    record_plaid_flush,
+    record_pylate_query_batch,
+    record_query_embedding_cache,
+    record_search_cache,
+    record_search_early_exit,
+    record_search_leg,
+    record_search_single_flight,
+    record_search_stages,
 )
 from eng_universe.monitoring.logging_utils import get_event_logger, get_logger, log_event
 from eng_universe.monitoring.metrics_server import run_metrics_server
@@ -13,10 +36,33 @@ from eng_universe.monitoring.metrics_server import run_metrics_server
 __all__ = [
     # metrics
     "CRAWL_PAGES",
+    "DOC_CACHE_REFRESH_LAG_MS",
+    "DOC_CACHE_UPDATES",
+    "EMBEDDING_CACHE_LOOKUPS",
     "INDEX_DOCS",
+    "PLAID_FLUSH_DOCS",
+    "PLAID_FLUSH_LATENCY_MS",
+    "PYLATE_QUERY_BATCH_LATENCY_MS",
+    "PYLATE_QUERY_BATCH_SIZE",
+    "QUERY_EMBEDDING_CACHE_LOOKUPS",
+    "SEARCH_EARLY_EXITS",
     "SEARCH_LATENCY_MS",
+    "SEARCH_LEG_LATENCY_MS",
+    "SEARCH_RESULT_CACHE_LOOKUPS",
+    "SEARCH_SINGLE_FLIGHT",
+    "SEARCH_STAGE_LATENCY_MS",
     "record_crawl",
+    "record_doc_cache_refresh",
+    "record_embedding_cache",
     "record_index",
+    "record_plaid_flush",
+    "record_pylate_query_batch",
+    "record_query_embedding_cache",
+    "record_search_cache",
+    "record_search_early_exit",
+    "record_search_leg",
+    "record_search_single_flight",
+    "record_search_stages",
     # logging
     "get_event_logger",
     "get_logger",
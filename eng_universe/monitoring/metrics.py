@@ -1,20 +1,151 @@
-from prometheus_client import Counter, Histogram
+from collections.abc import Mapping
+
+from prometheus_client import Counter, Gauge, Histogram
 
 
 CRAWL_PAGES = Counter(
     "crawler_pages_total", "Total pages fetched by crawler", ["domain"]
 )
 INDEX_DOCS = Counter("indexer_docs_total", "Total docs indexed")
+INDEX_STAGE_ITEMS = Counter(
+    "indexer_stage_items_total", "Items processed per indexing stage", ["stage"]
+)
+INDEX_STAGE_QUEUE_DEPTH = Gauge(
+    "indexer_stage_queue_depth", "Items waiting in each indexing stage", ["stage"]
+)
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "embedding_cache_lookups_total", "Embedding cache lookups", ["result"]
+)
+QUERY_EMBEDDING_CACHE_LOOKUPS = Counter(
+    "query_embedding_cache_lookups_total",
+    "Query embedding cache lookups (hit, miss or coalesced)",
+    ["result"],
+)
+SEARCH_RESULT_CACHE_LOOKUPS = Counter(
+    "search_result_cache_lookups_total",
+    "Search result cache lookups per tier",
+    ["tier", "result"],
+)
+DOC_CACHE_UPDATES = Counter(
+    "doc_cache_updates_total", "Docs refreshed in the API doc cache"
+)
+DOC_CACHE_REFRESH_LAG_MS = Histogram(
+    "doc_cache_refresh_lag_ms",
+    "Age of the newest change-feed entry when applied to the API doc cache",
+    buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000),
+)
+PLAID_FLUSH_LATENCY_MS = Histogram(
+    "plaid_flush_latency_ms",
+    "PLAID write buffer flush latency in milliseconds",
+    buckets=(50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000),
+)
+PLAID_FLUSH_DOCS = Histogram(
+    "plaid_flush_docs",
+    "Documents written per PLAID write buffer flush",
+    buckets=(1, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+PYLATE_QUERY_BATCH_SIZE = Histogram(
+    "pylate_query_batch_size",
+    "Queries encoded and retrieved per PyLate batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+PYLATE_QUERY_BATCH_LATENCY_MS = Histogram(
+    "pylate_query_batch_latency_ms",
+    "PyLate encode + retrieve latency per batch in milliseconds",
+    buckets=(5, 10, 20, 50, 100, 200, 400, 800, 1600),
+)
+SEARCH_LEG_LATENCY_MS = Histogram(
+    "search_leg_latency_ms",
+    "Latency of each retrieval leg (bm25, knn, plaid) in milliseconds",
+    ["leg"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 400, 800),
+)
+SEARCH_EARLY_EXITS = Counter(
+    "search_early_exits_total", "Retrieval legs skipped by early exit", ["leg"]
+)
+SEARCH_SINGLE_FLIGHT = Counter(
+    "search_single_flight_total",
+    "Searches that ran (leader) or joined an identical in-flight one (coalesced)",
+    ["result"],
+)
 SEARCH_LATENCY_MS = Histogram(
     "search_latency_ms",
-    "Search latency in milliseconds",
+    "Search query latency (RediSearch, PLAID) in milliseconds",
+    ["mode"],
     buckets=(5, 10, 20, 30, 40, 50, 75, 100, 200, 400, 800),
 )
+SEARCH_STAGE_LATENCY_MS = Histogram(
+    "search_stage_latency_ms",
+    "Latency of each search request stage (embed, bm25, knn, fuse, hydrate, "
+    "snippet, serialize, total) in milliseconds",
+    ["stage", "mode", "cache"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 50, 100, 200, 400, 800, 1600),
+)
 
 
 def record_crawl(domain: str) -> None:
     CRAWL_PAGES.labels(domain=domain).inc()
 
 
-def record_index() -> None:
-    INDEX_DOCS.inc()
+def record_index(count: int = 1) -> None:
+    INDEX_DOCS.inc(count)
+
+
+def record_index_stage(stage: str, count: int = 1) -> None:
+    INDEX_STAGE_ITEMS.labels(stage=stage).inc(count)
+
+
+def record_embedding_cache(hits: int, misses: int) -> None:
+    if hits:
+        EMBEDDING_CACHE_LOOKUPS.labels(result="hit").inc(hits)
+    if misses:
+        EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc(misses)
+
+
+def record_query_embedding_cache(result: str) -> None:
+    QUERY_EMBEDDING_CACHE_LOOKUPS.labels(result=result).inc()
+
+
+def record_search_cache(tier: str, hit: bool) -> None:
+    SEARCH_RESULT_CACHE_LOOKUPS.labels(
+        tier=tier, result="hit" if hit else "miss"
+    ).inc()
+
+
+def record_doc_cache_refresh(docs: int, lag_ms: float) -> None:
+    DOC_CACHE_UPDATES.inc(docs)
+    DOC_CACHE_REFRESH_LAG_MS.observe(lag_ms)
+
+
+def record_pylate_query_batch(size: int, latency_ms: float) -> None:
+    PYLATE_QUERY_BATCH_SIZE.observe(size)
+    PYLATE_QUERY_BATCH_LATENCY_MS.observe(latency_ms)
+
+
+def record_search_leg(leg: str, latency_ms: float) -> None:
+    SEARCH_LEG_LATENCY_MS.labels(leg=leg).observe(latency_ms)
+
+
+def record_search_stages(
+    mode: str, cache: str, stages: Mapping[str, float], total_ms: float
+) -> None:
+    for stage, latency_ms in stages.items():
+        SEARCH_STAGE_LATENCY_MS.labels(stage=stage, mode=mode, cache=cache).observe(
+            latency_ms
+        )
+    SEARCH_STAGE_LATENCY_MS.labels(stage="total", mode=mode, cache=cache).observe(
+        total_ms
+    )
+
+
+def record_search_early_exit(leg: str) -> None:
+    SEARCH_EARLY_EXITS.labels(leg=leg).inc()
+
+
+def record_search_single_flight(shared: bool) -> None:
+    SEARCH_SINGLE_FLIGHT.labels(result="coalesced" if shared else "leader").inc()
+
+
+def record_plaid_flush(docs: int, latency_ms: float) -> None:
+    PLAID_FLUSH_DOCS.observe(docs)
+    PLAID_FLUSH_LATENCY_MS.observe(latency_ms)
@@ -1,41 +1,189 @@
 """Search subpackage: search operations."""
 
+from eng_universe.search.cursors import (
+    PageCursor,
+    decode_cursor,
+    encode_cursor,
+    get_candidate_cache,
+)
+from eng_universe.search.doc_store import (
+    DocStore,
+    LiveDocCache,
+    adopt_doc_snapshot,
+    compact_doc_cache,
+    load_doc_store,
+    load_live_doc_cache,
+    refresh_doc_cache,
+)
+from eng_universe.search.embedding_cache import (
+    EmbeddingCache,
+    embed_documents,
+    get_embedding_cache,
+)
 from eng_universe.search.embeddings import (
     EmbeddingProvider,
     EmbeddingResult,
     get_embedding_provider,
     normalize_embedding,
 )
+from eng_universe.search.facets import FACET_FIELDS, FacetCount, facet_counts
+from eng_universe.search.filters import (
+    SearchFilters,
+    filter_clause,
+    parse_inline_filters,
+    published_epoch,
+)
+from eng_universe.search.passages import Passage, chunk_passages
 from eng_universe.search.pylate_backend import (
+    PlaidWriteBuffer,
+    QueryBatcher,
     add_documents,
+    close_query_batchers,
     create_plaid_index,
     encode_documents,
     encode_queries,
+    flush_plaid_buffer,
     get_colbert_model,
     get_colbert_retriever,
     get_colbert_stack,
     get_plaid_index,
+    get_plaid_write_buffer,
+    remove_documents,
     retrieve,
+    retrieve_async,
+    retrieve_batch,
+)
+from eng_universe.search.query_cache import SingleFlight, TTLCache, embed_query
+from eng_universe.search.result_cache import SearchResultCache, get_search_result_cache
+from eng_universe.search.search import (
+    SearchPage,
+    SearchResult,
+    available_search_modes,
+    search,
+    search_facets,
+    search_page,
+)
+from eng_universe.search.snippets import (
+    best_window_start,
+    build_snippet_index,
+    query_term_hashes,
+)
+from eng_universe.search.suggest import (
+    SUGGEST_KINDS,
+    Suggestion,
+    queue_suggestions,
+    suggest,
+    update_suggestion_weights,
+)
+from eng_universe.search.timings import (
+    StageTimings,
+    search_timings,
+    timed_stage,
+)
+from eng_universe.search.token_store import (
+    TokenStore,
+    TokenStoreWriter,
+    compact_token_store,
+    get_token_store,
+    maxsim_scores,
+    store_document_tokens,
+)
+from eng_universe.search.vectors import (
+    bytes_to_array,
+    dequantize_int8,
+    quantize_int8,
 )
-from eng_universe.search.search import SearchResult, search
 
 __all__ = [
+    # cursors
+    "PageCursor",
+    "decode_cursor",
+    "encode_cursor",
+    "get_candidate_cache",
+    # doc_store
+    "DocStore",
+    "LiveDocCache",
+    "adopt_doc_snapshot",
+    "compact_doc_cache",
+    "load_doc_store",
+    "load_live_doc_cache",
+    "refresh_doc_cache",
+    # embedding_cache
+    "EmbeddingCache",
+    "embed_documents",
+    "get_embedding_cache",
     # embeddings
     "EmbeddingProvider",
     "EmbeddingResult",
     "get_embedding_provider",
     "normalize_embedding",
+    # facets
+    "FACET_FIELDS",
+    "FacetCount",
+    "facet_counts",
+    # filters
+    "SearchFilters",
+    "filter_clause",
+    "parse_inline_filters",
+    "published_epoch",
+    # passages
+    "Passage",
+    "chunk_passages",
     # pylate_backend
+    "PlaidWriteBuffer",
+    "QueryBatcher",
     "add_documents",
+    "close_query_batchers",
     "create_plaid_index",
     "encode_documents",
     "encode_queries",
+    "flush_plaid_buffer",
     "get_colbert_model",
     "get_colbert_retriever",
     "get_colbert_stack",
     "get_plaid_index",
+    "get_plaid_write_buffer",
+    "remove_documents",
     "retrieve",
+    "retrieve_async",
+    "retrieve_batch",
+    # query_cache
+    "SingleFlight",
+    "TTLCache",
+    "embed_query",
+    # result_cache
+    "SearchResultCache",
+    "get_search_result_cache",
     # search
+    "SearchPage",
     "SearchResult",
+    "available_search_modes",
     "search",
+    "search_facets",
+    "search_page",
+    # snippets
+    "best_window_start",
+    "build_snippet_index",
+    "query_term_hashes",
+    # suggest
+    "SUGGEST_KINDS",
+    "Suggestion",
+    "queue_suggestions",
+    "suggest",
+    "update_suggestion_weights",
+    # timings
+    "StageTimings",
+    "search_timings",
+    "timed_stage",
+    # token_store
+    "TokenStore",
+    "TokenStoreWriter",
+    "compact_token_store",
+    "get_token_store",
+    "maxsim_scores",
+    "store_document_tokens",
+    # vectors
+    "bytes_to_array",
+    "dequantize_int8",
+    "quantize_int8",
 ]
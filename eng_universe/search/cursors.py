@@ -0,0 +1,99 @@
+"""Opaque page cursors and the short-lived candidate lists they page through."""
+
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+
+from eng_universe.config import Settings
+from eng_universe.search.filters import SearchFilters
+from eng_universe.search.result_cache import SearchResultCache
+
+
+SEARCH_MODES = ("keyword", "hybrid", "semantic", "rerank")
+MAX_EF_RUNTIME = 4096
+_TAG_FILTERS = ("company", "topics", "authors", "lang", "source")
+
+
+@dataclass
+class PageCursor:
+    """The request a page belongs to and where the page starts."""
+
+    query: str
+    mode: str
+    limit: int
+    offset: int
+    filters: dict[str, object] = field(default_factory=dict)
+    ef_runtime: int | None = None
+
+
+def encode_cursor(cursor: PageCursor) -> str:
+    payload = json.dumps(asdict(cursor), sort_keys=True, separators=(",", ":"))
+    token = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+    return token.rstrip("=")
+
+
+def _is_int(value: object) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _valid_filters(filters: object) -> bool:
+    if not isinstance(filters, dict):
+        return False
+    for name, value in filters.items():
+        if name in _TAG_FILTERS:
+            if not isinstance(value, list) or not all(
+                isinstance(item, str) for item in value
+            ):
+                return False
+        elif not _is_int(value):
+            return False
+    return True
+
+
+def decode_cursor(token: str) -> PageCursor:
+    """
+    Raises ValueError for anything `encode_cursor` did not produce. Cursors
+    come from clients and every field ends up in a RediSearch query, so they
+    are held to the same types and bounds as the `/search` params.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        cursor = PageCursor(**json.loads(base64.urlsafe_b64decode(padded)))
+        SearchFilters(**cursor.filters)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    numbers = (cursor.limit, cursor.offset)
+    if not all(_is_int(value) for value in numbers) or not (
+        cursor.limit >= 1 and cursor.offset >= 0
+    ):
+        raise ValueError("Invalid cursor")
+    if not isinstance(cursor.query, str) or cursor.mode not in SEARCH_MODES:
+        raise ValueError("Invalid cursor")
+    if cursor.ef_runtime is not None and not (
+        _is_int(cursor.ef_runtime) and 1 <= cursor.ef_runtime <= MAX_EF_RUNTIME
+    ):
+        raise ValueError("Invalid cursor")
+    if not _valid_filters(cursor.filters):
+        raise ValueError("Invalid cursor")
+    return cursor
+
+
+@lru_cache(maxsize=1)
+def get_candidate_cache() -> SearchResultCache | None:
+    """
+    Ranked candidate lists behind page cursors. Same tiers and index
+    generation invalidation as the result cache, with their own size and TTL.
+    """
+    backend = Settings.search_cache_backend
+    if backend in {"", "none", "off"} or Settings.search_cursor_cache_size <= 0:
+        return None
+    return SearchResultCache(
+        Settings.search_cursor_cache_size,
+        Settings.search_cursor_ttl_s,
+        use_redis=backend == "redis",
+        key_prefix=Settings.search_cursor_key_prefix,
+        generation_poll_s=Settings.search_cache_generation_poll_s,
+    )
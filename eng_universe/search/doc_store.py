@@ -0,0 +1,728 @@
+"""Columnar, memory-mapped snapshot of indexed docs for the API doc cache."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import fcntl
+import json
+import mmap
+import os
+import struct
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+import redis.asyncio as redis
+
+from eng_universe.config import Settings
+from eng_universe.monitoring.logging_utils import get_event_logger
+from eng_universe.monitoring.metrics import record_doc_cache_refresh
+from eng_universe.search.vectors import quantize_int8, unit_vector
+
+log_event = get_event_logger("doc_store")
+
+SNAPSHOT_MAGIC = b"EUDOCS1\n"
+SNAPSHOT_FORMAT = 3
+TEXT_FIELDS = ("doc_id", "title", "url", "content", "published_at")
+_LOAD_FIELDS = (
+    *TEXT_FIELDS,
+    "company",
+    "authors",
+    "embedding",
+    "embedding_i8",
+    "snippet_index",
+)
+_ALIGN = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _decode(value: object) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    return str(value)
+
+
+def _raw_bytes(value: object) -> bytes:
+    if value is None:
+        return b""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    return str(value).encode()
+
+
+class _StringColumn(Sequence[str]):
+    """Offset-indexed UTF-8 strings over one contiguous blob."""
+
+    def __init__(self, buffer: mmap.mmap | bytes, base: int, offsets: np.ndarray):
+        self._buffer = buffer
+        self._base = base
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    def __getitem__(self, index: int) -> str:  # type: ignore[override]
+        start = self._base + int(self._offsets[index])
+        end = self._base + int(self._offsets[index + 1])
+        return self._buffer[start:end].decode()
+
+    def window(self, index: int, start: int, length: int) -> tuple[bytes, int]:
+        """Raw bytes `[start, start + length)` of one string, plus its size."""
+        begin = self._base + int(self._offsets[index])
+        end = self._base + int(self._offsets[index + 1])
+        first = min(begin + start, end)
+        return self._buffer[first : min(first + length, end)], end - begin
+
+
+def _pack_strings(values: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    return _pack_bytes([value.encode() for value in values])
+
+
+def _pack_bytes(encoded: Sequence[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class DocView(Mapping[str, object]):
+    """
+    Read-only doc mapping over one snapshot row; fields are decoded on access,
+    so scoring candidates never touches their content.
+    """
+
+    _FIELDS = (
+        *TEXT_FIELDS,
+        "company",
+        "authors",
+        "snippet_index",
+        "_vec",
+        "_vec_scale",
+    )
+
+    def __init__(self, store: DocStore, row: int) -> None:
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, name: str) -> object:
+        store = self._store
+        if name in TEXT_FIELDS:
+            return store._text[name][self._row]
+        if name == "company":
+            index = int(store._company[self._row])
+            return store._strings[index] if index >= 0 else ""
+        if name == "authors":
+            start, end = store._author_offsets[self._row : self._row + 2]
+            ids = store._author_ids[int(start) : int(end)]
+            return ",".join(store._strings[int(index)] for index in ids)
+        if name == "snippet_index":
+            start, end = store._snippet_offsets[self._row : self._row + 2]
+            base = store._snippet_base
+            return memoryview(store._mm)[base + int(start) : base + int(end)]
+        if name == "_vec":
+            if store._vector_scales[self._row] == 0:
+                return None
+            return store._vectors[self._row]
+        if name == "_vec_scale":
+            return float(store._vector_scales[self._row])
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._FIELDS)
+
+    def __len__(self) -> int:
+        return len(self._FIELDS)
+
+    def content_window(self, start: int, length: int) -> tuple[bytes, int]:
+        """`length` bytes of UTF-8 `content` from byte `start`, plus its size."""
+        return self._store._text["content"].window(self._row, start, length)
+
+
+class DocStore(Mapping[str, DocView]):
+    """
+    Immutable doc cache backed by an mmap'd snapshot file:
+    - doc keys and text fields as offset-indexed UTF-8 blobs (keys sorted, so
+      lookups are a binary search with nothing to build at open time);
+    - companies and authors interned into one shared string table;
+    - each doc's `snippet_index` (see `snippets.build_snippet_index`) as one
+      offset-indexed blob;
+    - unit-norm doc vectors as one contiguous (n, dim) matrix plus per-row
+      scales (0 = no vector), float32 or int8 with `EMBEDDINGS_INT8`.
+    Every process that opens the same file shares its page cache. The header
+    records the change-feed entry the snapshot is current as of (`stream_id`).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a doc store snapshot: {path}")
+        (header_len,) = struct.unpack_from("<Q", self._mm, len(SNAPSHOT_MAGIC))
+        header_start = len(SNAPSHOT_MAGIC) + 8
+        header = json.loads(self._mm[header_start : header_start + header_len])
+        self.header: dict[str, object] = header
+        self.generation = int(header["generation"])
+        self.stream_id = str(header.get("stream_id", ""))
+        self.doc_prefix = str(header["doc_prefix"])
+        self.dim = int(header["dim"])
+        data_start = _align(header_start + header_len)
+        columns: dict[str, tuple[int, np.ndarray]] = {}
+        for name, spec in header["columns"].items():
+            offset = data_start + int(spec["offset"])
+            shape = tuple(spec["shape"])
+            count = int(np.prod(shape)) if shape else 1
+            if count:
+                array = np.frombuffer(
+                    self._mm, dtype=spec["dtype"], count=count, offset=offset
+                ).reshape(shape)
+            else:
+                array = np.zeros(shape, dtype=spec["dtype"])
+            columns[name] = (offset, array)
+
+        def strings(name: str) -> _StringColumn:
+            return _StringColumn(
+                self._mm, columns[f"{name}_blob"][0], columns[f"{name}_off"][1]
+            )
+
+        self._keys = strings("keys")
+        self._text = {name: strings(name) for name in TEXT_FIELDS}
+        self._strings = strings("strings")
+        self._company = columns["company"][1]
+        self._author_offsets = columns["author_off"][1]
+        self._author_ids = columns["author_ids"][1]
+        self._vectors = columns["vectors"][1]
+        self._vector_scales = columns["vector_scales"][1]
+        self._snippet_base = columns["snippet_index_blob"][0]
+        self._snippet_offsets = columns["snippet_index_off"][1]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the mapped snapshot (shared across processes)."""
+        return len(self._mm)
+
+    def _row(self, key: str) -> int | None:
+        row = bisect.bisect_left(self._keys, key)
+        if row < len(self._keys) and self._keys[row] == key:
+            return row
+        return None
+
+    def __getitem__(self, key: str) -> DocView:
+        row = self._row(key)
+        if row is None:
+            raise KeyError(key)
+        return DocView(self, row)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._row(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def _snapshot_vector(
+    mapping: Mapping[str, object], dim: int, use_int8: bool
+) -> tuple[np.ndarray, float] | None:
+    if "_vec" in mapping:
+        # A doc cache row (see `compact_doc_cache`): already a unit vector.
+        vector = mapping["_vec"]
+        if vector is None:
+            return None
+        return (
+            np.asarray(vector),
+            float(mapping["_vec_scale"]),  # type: ignore[arg-type]
+        )
+    return unit_vector(
+        mapping.get("embedding"),
+        mapping.get("embedding_i8") if use_int8 else None,
+        dim,
+    )
+
+
+def write_doc_store_snapshot(
+    path: Path,
+    docs: Sequence[tuple[str, Mapping[str, object]]],
+    *,
+    generation: int,
+    doc_prefix: str,
+    stream_id: str = "0-0",
+) -> None:
+    """
+    Writes (doc_key, hash fields) pairs to `path` atomically; doc cache rows
+    (with `_vec`) are accepted as well. `stream_id` is the last change-feed
+    entry the docs reflect.
+    """
+    dim = Settings.embeddings_dim
+    use_int8 = Settings.embeddings_int8
+    docs = sorted(docs, key=lambda item: item[0])
+    interned: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        return interned.setdefault(value, len(interned))
+
+    company = np.full(len(docs), -1, dtype="<i4")
+    author_ids: list[int] = []
+    author_offsets = np.zeros(len(docs) + 1, dtype="<u8")
+    vectors = np.zeros((len(docs), dim), dtype=np.int8 if use_int8 else "<f4")
+    vector_scales = np.zeros(len(docs), dtype="<f4")
+    for row, (_, mapping) in enumerate(docs):
+        name = _decode(mapping.get("company")).strip()
+        if name:
+            company[row] = intern(name)
+        for author in _decode(mapping.get("authors")).split(","):
+            if author.strip():
+                author_ids.append(intern(author.strip()))
+        author_offsets[row + 1] = len(author_ids)
+        unit = _snapshot_vector(mapping, dim, use_int8)
+        if unit is None:
+            continue
+        vector, scale = unit
+        if use_int8 and vector.dtype != np.int8:
+            codes, _ = quantize_int8(vector)
+            vector = np.frombuffer(codes, dtype=np.int8)
+            scale = 1.0 / float(np.linalg.norm(vector.astype(np.float32)) or 1.0)
+        vectors[row] = vector
+        vector_scales[row] = scale
+
+    columns: dict[str, np.ndarray] = {}
+    for name, values in (
+        ("keys", [key for key, _ in docs]),
+        *(
+            (field, [_decode(mapping.get(field)) for _, mapping in docs])
+            for field in TEXT_FIELDS
+        ),
+        ("strings", list(interned)),
+    ):
+        columns[f"{name}_blob"], columns[f"{name}_off"] = _pack_strings(values)
+    columns["snippet_index_blob"], columns["snippet_index_off"] = _pack_bytes(
+        [_raw_bytes(mapping.get("snippet_index")) for _, mapping in docs]
+    )
+    columns["company"] = company
+    columns["author_off"] = author_offsets
+    columns["author_ids"] = np.asarray(author_ids, dtype="<i4")
+    columns["vectors"] = vectors
+    columns["vector_scales"] = vector_scales
+
+    layout: dict[str, dict[str, object]] = {}
+    offset = 0
+    for name, array in columns.items():
+        offset = _align(offset)
+        layout[name] = {
+            "offset": offset,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+        offset += array.nbytes
+    header = json.dumps(
+        {
+            "format": SNAPSHOT_FORMAT,
+            "generation": generation,
+            "stream_id": stream_id,
+            "doc_prefix": doc_prefix,
+            "dim": dim,
+            "int8": use_int8,
+            "count": len(docs),
+            "columns": layout,
+        }
+    ).encode()
+    header_start = len(SNAPSHOT_MAGIC) + 8
+    data_start = _align(header_start + len(header))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(SNAPSHOT_MAGIC)
+        fh.write(struct.pack("<Q", len(header)))
+        fh.write(header)
+        for name, array in columns.items():
+            fh.seek(data_start + int(layout[name]["offset"]))  # type: ignore[arg-type]
+            fh.write(np.ascontiguousarray(array).tobytes())
+        fh.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+async def _fetch_docs(
+    redis_client: redis.Redis, doc_prefix: str, batch_size: int
+) -> list[tuple[str, dict[str, object]]]:
+    docs: list[tuple[str, dict[str, object]]] = []
+    keys: list[str] = []
+
+    async def _flush() -> None:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(key, _LOAD_FIELDS)
+        for key, values in zip(keys, await pipe.execute()):
+            if any(value is not None for value in values):
+                docs.append((key, dict(zip(_LOAD_FIELDS, values))))
+        keys.clear()
+
+    async for key in redis_client.scan_iter(match=f"{doc_prefix}*", count=batch_size):
+        keys.append(_decode(key))
+        if len(keys) >= batch_size:
+            await _flush()
+    if keys:
+        await _flush()
+    return docs
+
+
+def _open_snapshot(path: Path, *, doc_prefix: str) -> DocStore | None:
+    if not path.exists():
+        return None
+    try:
+        store = DocStore(path)
+    except (OSError, ValueError, KeyError) as exc:
+        log_event("snapshot", reason="unreadable", error=type(exc).__name__)
+        return None
+    if (
+        store.header.get("format") == SNAPSHOT_FORMAT
+        and store.doc_prefix == doc_prefix
+        and store.dim == Settings.embeddings_dim
+        and bool(store.header.get("int8")) == Settings.embeddings_int8
+    ):
+        return store
+    return None
+
+
+async def load_doc_store(
+    redis_client: redis.Redis,
+    *,
+    doc_prefix: str = "doc:",
+    path: str | Path | None = None,
+    batch_size: int = 500,
+) -> DocStore:
+    """
+    Opens the snapshot at `path` if it is for `doc_prefix` and the change feed
+    still holds every entry after its `stream_id`, however old it is (callers
+    replay those entries, see `load_live_doc_cache`). Otherwise it is rebuilt
+    from Redis first. The feed tail is read before scanning, so docs written
+    mid-build are replayed once more, which is harmless.
+    """
+    path = Path(path or Settings.doc_store_path)
+    store = _open_snapshot(path, doc_prefix=doc_prefix)
+    if store is not None and await _replayable(redis_client, store.stream_id):
+        log_event(
+            "snapshot",
+            reason="reuse",
+            generation=store.generation,
+            stream_id=store.stream_id,
+            docs=len(store),
+        )
+        return store
+    stream_id = await _change_feed_tail(redis_client)
+    raw_generation = await redis_client.get(Settings.index_generation_key)
+    generation = int(raw_generation) if raw_generation is not None else 0
+    docs = await _fetch_docs(redis_client, doc_prefix, batch_size)
+    await asyncio.to_thread(
+        write_doc_store_snapshot,
+        path,
+        docs,
+        generation=generation,
+        doc_prefix=doc_prefix,
+        stream_id=stream_id,
+    )
+    log_event(
+        "snapshot",
+        reason="rebuilt",
+        generation=generation,
+        stream_id=stream_id,
+        docs=len(docs),
+    )
+    return DocStore(path)
+
+
+def _stream_id(value: object) -> tuple[int, int]:
+    millis, _, seq = _decode(value).partition("-")
+    return int(millis), int(seq or 0)
+
+
+def _overlay_mapping(values: Sequence[object]) -> dict[str, object]:
+    fields = dict(zip(_LOAD_FIELDS, values))
+    mapping: dict[str, object] = {
+        name: _decode(fields.get(name)) for name in (*TEXT_FIELDS, "company")
+    }
+    mapping["authors"] = _decode(fields.get("authors"))
+    mapping["snippet_index"] = _raw_bytes(fields.get("snippet_index"))
+    unit = unit_vector(
+        fields.get("embedding"),
+        fields.get("embedding_i8") if Settings.embeddings_int8 else None,
+        Settings.embeddings_dim,
+    )
+    mapping["_vec"], mapping["_vec_scale"] = unit if unit else (None, 0.0)
+    return mapping
+
+
+class LiveDocCache(Mapping[str, Mapping[str, object]]):
+    """
+    A `DocStore` snapshot plus an in-memory overlay of docs changed since it
+    was taken, kept current from the indexer's change feed. `last_id` is the
+    last change-feed entry applied. `compact_doc_cache` folds the overlay into
+    a new snapshot once `compaction_due()`.
+    """
+
+    def __init__(self, store: DocStore, *, doc_prefix: str, last_id: str) -> None:
+        self.store = store
+        self.doc_prefix = doc_prefix
+        self.last_id = last_id
+        self._overlay: dict[str, dict[str, object] | None] = {}
+        self._overlay_since: float | None = None
+
+    @property
+    def nbytes(self) -> int:
+        return self.store.nbytes
+
+    @property
+    def overlay_size(self) -> int:
+        return len(self._overlay)
+
+    @property
+    def overlay_age_s(self) -> float:
+        """Seconds since the oldest overlay entry was applied."""
+        if self._overlay_since is None:
+            return 0.0
+        return time.monotonic() - self._overlay_since
+
+    def compaction_due(self) -> bool:
+        if not self._overlay:
+            return False
+        return (
+            len(self._overlay) >= Settings.doc_cache_overlay_max_docs
+            or self.overlay_age_s >= Settings.doc_cache_overlay_max_age_s
+        )
+
+    def apply(self, changes: Mapping[str, dict[str, object] | None]) -> None:
+        """`None` marks a deleted doc."""
+        if changes and self._overlay_since is None:
+            self._overlay_since = time.monotonic()
+        self._overlay.update(changes)
+
+    def __getitem__(self, key: str) -> Mapping[str, object]:
+        if key in self._overlay:
+            mapping = self._overlay[key]
+            if mapping is None:
+                raise KeyError(key)
+            return mapping
+        return self.store[key]
+
+    def __contains__(self, key: object) -> bool:
+        if isinstance(key, str) and key in self._overlay:
+            return self._overlay[key] is not None
+        return key in self.store
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.store:
+            if key not in self._overlay:
+                yield key
+        for key, mapping in self._overlay.items():
+            if mapping is not None:
+                yield key
+
+    def __len__(self) -> int:
+        added = sum(
+            1
+            for key, mapping in self._overlay.items()
+            if mapping is not None and key not in self.store
+        )
+        removed = sum(
+            1
+            for key, mapping in self._overlay.items()
+            if mapping is None and key in self.store
+        )
+        return len(self.store) + added - removed
+
+
+def _newer_snapshot(path: Path, cache: LiveDocCache) -> DocStore | None:
+    """The snapshot at `path`, if another worker compacted past `cache`'s."""
+    store = _open_snapshot(path, doc_prefix=cache.doc_prefix)
+    if store is None or _stream_id(store.stream_id) <= _stream_id(
+        cache.store.stream_id
+    ):
+        return None
+    return store
+
+
+async def compact_doc_cache(
+    cache: LiveDocCache, *, path: str | Path | None = None
+) -> LiveDocCache | None:
+    """
+    Writes the snapshot plus overlay of `cache` to a new snapshot (current as
+    of `cache.last_id`) and returns a cache over it with an empty overlay. No
+    Redis reads are needed; `cache` must not be refreshed meanwhile.
+    Uvicorn workers share the snapshot file, so only one writes it: this
+    returns `None` while another holds `{path}.lock`, or if one already
+    replaced the snapshot (see `adopt_doc_snapshot`).
+    """
+    path = Path(path or Settings.doc_store_path)
+    with open(path.with_name(f"{path.name}.lock"), "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+        try:
+            if _newer_snapshot(path, cache) is not None:
+                return None
+            overlay = cache.overlay_size
+            await asyncio.to_thread(
+                write_doc_store_snapshot,
+                path,
+                [(key, cache[key]) for key in cache],
+                generation=cache.store.generation,
+                doc_prefix=cache.doc_prefix,
+                stream_id=cache.last_id,
+            )
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    store = DocStore(path)
+    log_event(
+        "snapshot",
+        reason="compacted",
+        stream_id=cache.last_id,
+        overlay=overlay,
+        docs=len(store),
+    )
+    return LiveDocCache(store, doc_prefix=cache.doc_prefix, last_id=cache.last_id)
+
+
+async def adopt_doc_snapshot(
+    redis_client: redis.Redis,
+    cache: LiveDocCache,
+    *,
+    path: str | Path | None = None,
+) -> LiveDocCache | None:
+    """
+    A cache over the snapshot another worker compacted `cache`'s docs into,
+    replayed from the change feed, so every worker maps (and shares the pages
+    of) the same file. `None` if there is no newer snapshot or the feed no
+    longer holds the entries after it.
+    """
+    path = Path(path or Settings.doc_store_path)
+    store = _newer_snapshot(path, cache)
+    if store is None or not await _replayable(redis_client, store.stream_id):
+        return None
+    adopted = LiveDocCache(store, doc_prefix=cache.doc_prefix, last_id=store.stream_id)
+    replayed = await _replay(redis_client, adopted)
+    log_event(
+        "snapshot", reason="adopted", stream_id=store.stream_id, entries=replayed
+    )
+    return adopted
+
+
+async def _change_feed_tail(redis_client: redis.Redis) -> str:
+    entries = await redis_client.xrevrange(Settings.doc_change_stream_key, count=1)
+    return _decode(entries[0][0]) if entries else "0-0"
+
+
+async def _trimmed_past(redis_client: redis.Redis, last_id: str) -> bool:
+    try:
+        info = await redis_client.xinfo_stream(Settings.doc_change_stream_key)
+    except redis.ResponseError:
+        return False
+    deleted = info.get("max-deleted-entry-id")
+    if deleted is not None:
+        return _stream_id(deleted) > _stream_id(last_id)
+    first = info.get("first-entry")
+    return bool(first) and _stream_id(first[0]) > _stream_id(last_id)
+
+
+async def _replayable(redis_client: redis.Redis, last_id: str) -> bool:
+    """
+    True when every change-feed entry after `last_id` is still in the feed. A
+    feed behind `last_id` was recreated (e.g. Redis was flushed).
+    """
+    if not last_id:
+        return False
+    if _stream_id(last_id) > _stream_id(await _change_feed_tail(redis_client)):
+        return False
+    return not await _trimmed_past(redis_client, last_id)
+
+
+async def load_live_doc_cache(
+    redis_client: redis.Redis, *, doc_prefix: str = "doc:"
+) -> LiveDocCache:
+    """
+    Opens (or rebuilds) the snapshot and replays the change feed from the
+    snapshot's `stream_id` before returning, so a snapshot taken before the
+    latest writes is brought current instead of rebuilt.
+    """
+    store = await load_doc_store(redis_client, doc_prefix=doc_prefix)
+    cache = LiveDocCache(store, doc_prefix=doc_prefix, last_id=store.stream_id)
+    replayed = await _replay(redis_client, cache)
+    if replayed:
+        log_event(
+            "snapshot", reason="replayed", entries=replayed, docs=cache.overlay_size
+        )
+    return cache
+
+
+async def _replay(redis_client: redis.Redis, cache: LiveDocCache) -> int:
+    """Applies every change-feed entry after `cache.last_id` without blocking."""
+    replayed = 0
+    while True:
+        consumed = await _apply_changes(redis_client, cache, block_ms=None)
+        replayed += consumed
+        if consumed < Settings.doc_cache_refresh_batch_size:
+            return replayed
+
+
+async def change_feed_gap(redis_client: redis.Redis, cache: LiveDocCache) -> bool:
+    """
+    True when the feed was trimmed past `cache.last_id`, i.e. some changes
+    can no longer be replayed and the cache needs a full reload.
+    """
+    return await _trimmed_past(redis_client, cache.last_id)
+
+
+async def refresh_doc_cache(
+    redis_client: redis.Redis, cache: LiveDocCache, *, block_ms: int | None = None
+) -> int:
+    """
+    Applies one batch of change-feed entries to `cache`, waiting up to
+    `block_ms` for new ones. Returns the number of entries consumed.
+    """
+    if block_ms is None:
+        block_ms = Settings.doc_cache_refresh_block_ms
+    return await _apply_changes(redis_client, cache, block_ms=block_ms)
+
+
+async def _apply_changes(
+    redis_client: redis.Redis, cache: LiveDocCache, *, block_ms: int | None
+) -> int:
+    """One `refresh_doc_cache` batch; `block_ms=None` returns at once."""
+    response = await redis_client.xread(
+        {Settings.doc_change_stream_key: cache.last_id},
+        count=Settings.doc_cache_refresh_batch_size,
+        block=block_ms,
+    )
+    if not response:
+        return 0
+    _, entries = response[0]
+    ops: dict[str, str] = {}
+    for _, fields in entries:
+        key = _decode(fields.get(b"key", fields.get("key")))
+        if key.startswith(cache.doc_prefix):
+            ops[key] = _decode(fields.get(b"op", fields.get("op")))
+    upserts = [key for key, op in ops.items() if op != "del"]
+    changes: dict[str, dict[str, object] | None] = {
+        key: None for key, op in ops.items() if op == "del"
+    }
+    if upserts:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in upserts:
+            pipe.hmget(key, _LOAD_FIELDS)
+        for key, values in zip(upserts, await pipe.execute()):
+            if any(value is not None for value in values):
+                changes[key] = _overlay_mapping(values)
+            else:
+                changes[key] = None
+    cache.apply(changes)
+    cache.last_id = _decode(entries[-1][0])
+    lag_ms = max(0.0, time.time() * 1000 - _stream_id(cache.last_id)[0])
+    record_doc_cache_refresh(len(changes), lag_ms)
+    return len(entries)
@@ -0,0 +1,292 @@
+"""Persistent content-hash cache for document embeddings."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import struct
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from eng_universe.config import Settings
+from eng_universe.search.embeddings import get_embedding_provider, normalize_embedding
+from eng_universe.monitoring.metrics import record_embedding_cache
+
+
+def cache_key(provider: str, model: str, dim: int, text: str) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{provider}:{model}:{dim}:{digest}"
+
+
+def pack_array(array: Any) -> bytes:
+    """Serializes a float array as `ndim, *shape` (little-endian) + float32 data."""
+    matrix = np.ascontiguousarray(np.asarray(array, dtype=np.float32))
+    header = struct.pack(f"<B{matrix.ndim}I", matrix.ndim, *matrix.shape)
+    return header + matrix.tobytes()
+
+
+def unpack_array(raw: bytes) -> np.ndarray:
+    ndim = raw[0]
+    shape = struct.unpack_from(f"<{ndim}I", raw, 1)
+    offset = 1 + 4 * ndim
+    return np.frombuffer(raw, dtype=np.float32, offset=offset).reshape(shape)
+
+
+class EmbeddingCache:
+    def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        raise NotImplementedError
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        raise NotImplementedError
+
+
+class DiskEmbeddingCache(EmbeddingCache):
+    """
+    SQLite-backed cache with least-recently-used eviction past `max_bytes` of
+    stored values. The total is read once at open and then kept up to date,
+    so writes never count the table.
+    """
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings(accessed)"
+        )
+        self._conn.commit()
+        (self._bytes,) = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM embeddings"
+        ).fetchone()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        found: dict[str, bytes] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = list(keys[start : start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return [found.get(key) for key in keys]
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        if not items:
+            return
+        now = time.time()
+        keys = list(items)
+        with self._lock:
+            replaced = 0
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                (size,) = self._conn.execute(
+                    "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM embeddings "
+                    f"WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchone()
+                replaced += size
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, value, accessed) "
+                "VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items.items()],
+            )
+            self._bytes += sum(len(value) for value in items.values()) - replaced
+            if self._bytes > self._max_bytes:
+                self._evict(self._bytes - self._max_bytes)
+            self._conn.commit()
+
+    def _evict(self, excess: int) -> None:
+        """Deletes the least recently used entries until `excess` bytes are freed."""
+        evicted: list[str] = []
+        freed = 0
+        rows = self._conn.execute(
+            "SELECT key, LENGTH(value) FROM embeddings ORDER BY accessed ASC"
+        )
+        for key, size in rows:
+            if freed >= excess:
+                break
+            evicted.append(key)
+            freed += size
+        rows.close()
+        self._conn.executemany(
+            "DELETE FROM embeddings WHERE key = ?", [(key,) for key in evicted]
+        )
+        self._bytes -= freed
+
+
+# Oldest entries read per Redis eviction round.
+_EVICT_SCAN = 256
+
+
+class RedisEmbeddingCache(EmbeddingCache):
+    """
+    Redis-backed cache; a sorted set of access times drives LRU eviction and a
+    counter tracks the stored bytes against `max_bytes`.
+    """
+
+    def __init__(self, redis_url: str, key_prefix: str, max_bytes: int) -> None:
+        import redis as redis_sync
+
+        self._client = redis_sync.from_url(redis_url)
+        self._prefix = key_prefix
+        self._lru_key = f"{key_prefix}lru"
+        self._bytes_key = f"{key_prefix}bytes"
+        self._max_bytes = max_bytes
+
+    def get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        values = self._client.mget([f"{self._prefix}{key}" for key in keys])
+        now = time.time()
+        hits = {key: now for key, value in zip(keys, values) if value is not None}
+        if hits:
+            self._client.zadd(self._lru_key, hits)
+        return list(values)
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        if not items:
+            return
+        now = time.time()
+        pipe = self._client.pipeline()
+        for key, value in items.items():
+            # Values are a pure function of the key: keep the first copy.
+            pipe.set(f"{self._prefix}{key}", value, nx=True)
+        pipe.zadd(self._lru_key, {key: now for key in items})
+        stored = pipe.execute()[: len(items)]
+        added = sum(len(value) for value, ok in zip(items.values(), stored) if ok)
+        total = int(self._client.incrby(self._bytes_key, added))
+        while total > self._max_bytes:
+            freed = self._evict(total - self._max_bytes)
+            if freed is None:
+                break
+            total = int(self._client.decrby(self._bytes_key, freed))
+
+    def _evict(self, excess: int) -> int | None:
+        """
+        Deletes the least recently used entries until `excess` bytes are freed,
+        like `DiskEmbeddingCache._evict`; returns the bytes freed, or `None`
+        once nothing is left. Entries another writer evicted meanwhile are
+        skipped, so the caller re-checks the byte counter.
+        """
+        oldest = self._client.zrange(self._lru_key, 0, _EVICT_SCAN - 1)
+        if not oldest:
+            return None
+        pipe = self._client.pipeline()
+        for key in oldest:
+            pipe.strlen(f"{self._prefix}{key.decode()}")
+        planned: list[tuple[bytes, int]] = []
+        for key, size in zip(oldest, pipe.execute()):
+            planned.append((key, int(size)))
+            excess -= int(size)
+            if excess <= 0:
+                break
+        pipe = self._client.pipeline()
+        for key, _ in planned:
+            pipe.zrem(self._lru_key, key)
+        evicted = [item for item, removed in zip(planned, pipe.execute()) if removed]
+        if evicted:
+            names = [f"{self._prefix}{key.decode()}" for key, _ in evicted]
+            self._client.delete(*names)
+        return sum(size for _, size in evicted)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache | None:
+    backend = Settings.embedding_cache_backend.lower()
+    if backend in {"", "none", "off"}:
+        return None
+    if backend == "disk":
+        return DiskEmbeddingCache(
+            Settings.embedding_cache_path, Settings.embedding_cache_max_bytes
+        )
+    if backend == "redis":
+        return RedisEmbeddingCache(
+            Settings.redis_url,
+            Settings.embedding_cache_key_prefix,
+            Settings.embedding_cache_max_bytes,
+        )
+    raise ValueError(f"Unknown embedding cache backend: {backend}")
+
+
+def cached_encode(
+    texts: Sequence[str],
+    encode: Callable[[list[str]], Sequence[Any]],
+    *,
+    provider: str,
+    model: str,
+    dim: int,
+) -> list[np.ndarray]:
+    """
+    Returns one float32 array per text, calling `encode` only for cache misses.
+    Duplicate texts within a batch are encoded once.
+    """
+    if not texts:
+        return []
+    cache = get_embedding_cache()
+    if cache is None:
+        return [np.asarray(item, dtype=np.float32) for item in encode(list(texts))]
+    keys = [cache_key(provider, model, dim, text) for text in texts]
+    cached = cache.get_many(keys)
+    results: dict[str, np.ndarray] = {}
+    for key, raw in zip(keys, cached):
+        if raw is not None:
+            results[key] = unpack_array(raw)
+    missing: dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in results and key not in missing:
+            missing[key] = text
+    hits = sum(1 for raw in cached if raw is not None)
+    record_embedding_cache(hits=hits, misses=len(keys) - hits)
+    if missing:
+        encoded = encode(list(missing.values()))
+        fresh: dict[str, bytes] = {}
+        for key, item in zip(missing, encoded):
+            array = np.asarray(item, dtype=np.float32)
+            results[key] = array
+            fresh[key] = pack_array(array)
+        cache.set_many(fresh)
+    return [results[key] for key in keys]
+
+
+def embed_documents(texts: Sequence[str]) -> list[list[float]]:
+    """Embeds documents with the configured dense provider through the cache."""
+    provider = get_embedding_provider()
+    dim = Settings.embeddings_dim
+
+    def _encode(batch: list[str]) -> list[list[float]]:
+        return [
+            normalize_embedding(result.vector, dim)
+            for result in provider.embed_batch(batch)
+        ]
+
+    arrays = cached_encode(
+        texts, _encode, provider=provider.name, model=provider.model, dim=dim
+    )
+    return [array.tolist() for array in arrays]
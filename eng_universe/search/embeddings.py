@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import lru_cache
+from typing import Any, Sequence
+
+import numpy as np
 
 from eng_universe.config import Settings
 
@@ -13,17 +17,32 @@ class EmbeddingResult:
 
 
 class EmbeddingProvider:
-    def embed(self, text: str) -> EmbeddingResult:
+    name = "base"
+    model = ""
+
+    def embed_batch(self, texts: Sequence[str]) -> list[EmbeddingResult]:
         raise NotImplementedError
 
+    def embed(self, text: str) -> EmbeddingResult:
+        return self.embed_batch([text])[0]
+
 
 class DummyEmbeddingProvider(EmbeddingProvider):
-    def embed(self, text: str) -> EmbeddingResult:
+    name = "dummy"
+    model = "dummy"
+
+    def embed_batch(self, texts: Sequence[str]) -> list[EmbeddingResult]:
         length = Settings.embeddings_dim
-        vector = [0.0] * length
-        for index, ch in enumerate(text[:length]):
-            vector[index] = float((ord(ch) % 97) / 96.0)
-        return EmbeddingResult(vector=vector, provider="dummy")
+        matrix = np.zeros((len(texts), length), dtype=np.float32)
+        for row, text in enumerate(texts):
+            codes = np.frombuffer(
+                text[:length].encode("utf-32-le"), dtype=np.uint32
+            )
+            matrix[row, : len(codes)] = (codes % 97) / 96.0
+        return [
+            EmbeddingResult(vector=vector.tolist(), provider=self.name)
+            for vector in matrix
+        ]
 
 
 def _require_setting(value: str | None, name: str) -> str:
@@ -32,21 +51,29 @@ def _require_setting(value: str | None, name: str) -> str:
     return value
 
 
-def _mean_pool(vectors: list[list[float]]) -> list[float]:
-    if not vectors:
-        return []
-    width = len(vectors[0])
-    sums = [0.0] * width
-    for row in vectors:
-        if len(row) != width:
-            raise ValueError("Embedding rows have inconsistent dimensions")
-        for index, value in enumerate(row):
-            sums[index] += float(value)
-    count = float(len(vectors))
-    return [value / count for value in sums]
+def _mean_pool(vectors: Any) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2:
+        raise ValueError("Embedding rows have inconsistent dimensions")
+    if matrix.shape[0] == 0:
+        return np.zeros(0, dtype=np.float32)
+    return matrix.mean(axis=0)
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _batched(texts: Sequence[str], size: int) -> list[Sequence[str]]:
+    size = max(1, size)
+    return [texts[start : start + size] for start in range(0, len(texts), size)]
 
 
 class HuggingFaceEmbeddingProvider(EmbeddingProvider):
+    name = "huggingface"
+
     def __init__(self) -> None:
         try:
             from huggingface_hub import InferenceClient
@@ -55,30 +82,65 @@ class HuggingFaceEmbeddingProvider(EmbeddingProvider):
                 "huggingface_hub package is required for Hugging Face embeddings."
             ) from exc
         api_key = _require_setting(Settings.huggingface_api_key, "HUGGINGFACE_API_KEY")
-        self._model = _require_setting(
+        self.model = _require_setting(
             Settings.huggingface_embedding_model, "HUGGINGFACE_EMBEDDINGS_MODEL"
         )
-        if "colbert" in self._model.lower():
+        if "colbert" in self.model.lower():
             raise RuntimeError(
                 "ColBERT models require EMBEDDINGS_PROVIDER=pylate; "
                 "use a standard embedding model for Hugging Face feature extraction."
             )
         provider = Settings.huggingface_provider
         self._client = InferenceClient(api_key=api_key, provider=provider)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, Settings.embeddings_concurrency),
+            thread_name_prefix="hf-embed",
+        )
 
-    def embed(self, text: str) -> EmbeddingResult:
-        output = self._client.feature_extraction(text, model=self._model)
-        if hasattr(output, "tolist"):
-            output = output.tolist()
-        vector: list[float]
-        if isinstance(output, list) and output:
-            if isinstance(output[0], list):
-                vector = _mean_pool(output)  # type: ignore[arg-type]
-            else:
-                vector = [float(value) for value in output]  # type: ignore[arg-type]
+    def _pool_output(self, output: Any) -> np.ndarray:
+        """Mean-pools token embeddings (if any) and L2-normalizes one input."""
+        array = np.asarray(output, dtype=np.float32)
+        if array.ndim == 3 and array.shape[0] == 1:
+            array = array[0]
+        if array.ndim == 2:
+            array = _mean_pool(array)
+        if array.ndim != 1 or array.size == 0:
+            raise RuntimeError("Unexpected Hugging Face embedding response")
+        return _l2_normalize(array)
+
+    def _embed_chunk(self, texts: Sequence[str]) -> list[np.ndarray]:
+        if len(texts) == 1:
+            output = self._client.feature_extraction(texts[0], model=self.model)
+            return [self._pool_output(output)]
+        output = self._client.feature_extraction(list(texts), model=self.model)
+        if isinstance(output, np.ndarray) and output.ndim in {2, 3}:
+            rows = list(output)
+        elif isinstance(output, list):
+            rows = output
         else:
             raise RuntimeError("Unexpected Hugging Face embedding response")
-        return EmbeddingResult(vector=vector, provider="huggingface")
+        if len(rows) != len(texts):
+            raise RuntimeError(
+                f"Hugging Face returned {len(rows)} embeddings for {len(texts)} inputs"
+            )
+        return [self._pool_output(row) for row in rows]
+
+    def embed_batch(self, texts: Sequence[str]) -> list[EmbeddingResult]:
+        if not texts:
+            return []
+        chunks = _batched(texts, Settings.embeddings_batch_size)
+        if len(chunks) == 1:
+            pooled = self._embed_chunk(chunks[0])
+        else:
+            pooled = [
+                vector
+                for chunk in self._executor.map(self._embed_chunk, chunks)
+                for vector in chunk
+            ]
+        return [
+            EmbeddingResult(vector=vector.tolist(), provider=self.name)
+            for vector in pooled
+        ]
 
 
 def normalize_embedding(vector: list[float], dim: int) -> list[float]:
@@ -0,0 +1,177 @@
+"""Search filters pushed down into RediSearch as TAG and NUMERIC clauses."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+
+# Inline `name:value` keys (and aliases) -> SearchFilters attribute.
+_INLINE_KEYS = {
+    "company": "company",
+    "topic": "topics",
+    "topics": "topics",
+    "author": "authors",
+    "authors": "authors",
+    "lang": "lang",
+    "source": "source",
+    "after": "published_after",
+    "since": "published_after",
+    "before": "published_before",
+}
+_INLINE = re.compile(
+    r"(?<!\S)(?P<key>[A-Za-z]+):(?:\"(?P<quoted>[^\"]*)\"|(?P<bare>[^\s\"]+))"
+)
+_TAG_SPECIAL = re.compile(r"([^\w])")
+# 100000000 is 1973-03-03; shorter digit strings are not timestamps.
+_EPOCH_MIN_DIGITS = 9
+_DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%m/%d/%Y",
+)
+
+
+def published_epoch(value: str | None) -> int | None:
+    """
+    Epoch seconds for a `published_at` string (ISO 8601 or a common
+    human-readable date; naive values are taken as UTC), else None. A 4-digit
+    number is a year (its January 1st); only 9+ digits are epoch seconds.
+    """
+    if not value:
+        return None
+    text = value.strip()
+    if text.isdigit():
+        if len(text) == 4 and int(text) > 0:
+            return int(datetime(int(text), 1, 1, tzinfo=timezone.utc).timestamp())
+        if len(text) >= _EPOCH_MIN_DIGITS:
+            return int(text)
+        return None
+    parsed: datetime | None = None
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        for fmt in _DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+    if parsed is None:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+@dataclass
+class SearchFilters:
+    """TAG values are OR-ed within a field; fields and date bounds are AND-ed."""
+
+    company: list[str] = field(default_factory=list)
+    topics: list[str] = field(default_factory=list)
+    authors: list[str] = field(default_factory=list)
+    lang: list[str] = field(default_factory=list)
+    source: list[str] = field(default_factory=list)
+    published_after: int | None = None
+    published_before: int | None = None
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, item.name) for item in fields(self))
+
+    def merged(self, other: SearchFilters) -> SearchFilters:
+        return SearchFilters(
+            company=[*self.company, *other.company],
+            topics=[*self.topics, *other.topics],
+            authors=[*self.authors, *other.authors],
+            lang=[*self.lang, *other.lang],
+            source=[*self.source, *other.source],
+            published_after=_pick(self.published_after, other.published_after, max),
+            published_before=_pick(
+                self.published_before, other.published_before, min
+            ),
+        )
+
+    def cache_key(self) -> dict[str, object]:
+        """Order-insensitive form for `result_cache_key`."""
+        return {
+            item.name: sorted(value) if isinstance(value, list) else value
+            for item in fields(self)
+            if (value := getattr(self, item.name))
+        }
+
+
+def _pick(
+    left: int | None, right: int | None, choose: Callable[[int, int], int]
+) -> int | None:
+    if left is None or right is None:
+        return left if right is None else right
+    return choose(left, right)
+
+
+def parse_inline_filters(query: str) -> tuple[str, SearchFilters]:
+    """
+    Splits `company:stripe topic:"machine learning" after:2023-01-01 kafka`
+    into the free-text query ("kafka") and filters. Unknown keys and
+    unparseable dates are left in the text.
+    """
+    filters = SearchFilters()
+
+    def _take(match: re.Match[str]) -> str:
+        name = _INLINE_KEYS.get(match.group("key").lower())
+        value = match.group("quoted")
+        if value is None:
+            value = match.group("bare")
+        value = value.strip()
+        if name is None or not value:
+            return match.group(0)
+        if name in {"published_after", "published_before"}:
+            epoch = published_epoch(value)
+            if epoch is None:
+                return match.group(0)
+            merged = filters.merged(SearchFilters(**{name: epoch}))
+            setattr(filters, name, getattr(merged, name))
+            return " "
+        getattr(filters, name).append(value)
+        return " "
+
+    text = _INLINE.sub(_take, query)
+    return " ".join(text.split()), filters
+
+
+def _escape_tag(value: str) -> str:
+    return _TAG_SPECIAL.sub(r"\\\1", value.strip())
+
+
+def filter_clause(filters: SearchFilters | None) -> str:
+    """RediSearch query clause for `filters`, or "" when there are none."""
+    if not filters:
+        return ""
+    parts: list[str] = []
+    for name in ("company", "topics", "authors", "lang", "source"):
+        values = [_escape_tag(value) for value in getattr(filters, name)]
+        values = [value for value in dict.fromkeys(values) if value]
+        if values:
+            parts.append(f"@{name}:{{{'|'.join(values)}}}")
+    if filters.published_after is not None or filters.published_before is not None:
+        low = filters.published_after
+        high = filters.published_before
+        parts.append(
+            f"@published_ts:[{low if low is not None else '-inf'} "
+            f"{high if high is not None else '+inf'}]"
+        )
+    return " ".join(parts)
+
+
+def with_filters(text_query: str, clause: str) -> str:
+    """Intersects a text query (or `*`) with a filter clause."""
+    if not clause:
+        return text_query
+    if text_query == "*":
+        return clause
+    return f"{text_query} {clause}"
@@ -0,0 +1,100 @@
+"""Overlapping passage chunks for multi-vector documents."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+PASSAGE_ID_SEP = "#p"
+SNIPPET_MAX_LEN = 200
+
+_WORD = re.compile(r"\S+")
+
+
+@dataclass
+class Passage:
+    index: int
+    start: int
+    text: str
+    snippet: str
+
+
+def passage_snippet(text: str, *, leading: bool, trailing: bool) -> str:
+    """Precomputed result snippet: the head of the passage, marked with `…`."""
+    normalized = " ".join(text.split())
+    snippet = normalized[:SNIPPET_MAX_LEN]
+    if leading and snippet:
+        snippet = f"…{snippet}"
+    if trailing or len(normalized) > SNIPPET_MAX_LEN:
+        snippet = f"{snippet}…"
+    return snippet
+
+
+def chunk_passages(
+    content: str, *, size_words: int, overlap_words: int
+) -> list[Passage]:
+    """
+    Splits `content` into windows of `size_words` words, each overlapping the
+    previous by `overlap_words`. `start` is the passage's character offset in
+    `content`. Empty content yields one empty passage so every doc has one.
+    """
+    spans = [match.span() for match in _WORD.finditer(content)]
+    if not spans:
+        return [Passage(index=0, start=0, text="", snippet="")]
+    size = max(1, size_words)
+    step = max(1, size - max(0, overlap_words))
+    passages: list[Passage] = []
+    for first in range(0, len(spans), step):
+        last = min(first + size, len(spans)) - 1
+        start, end = spans[first][0], spans[last][1]
+        text = content[start:end]
+        passages.append(
+            Passage(
+                index=len(passages),
+                start=start,
+                text=text,
+                snippet=passage_snippet(
+                    text, leading=first > 0, trailing=last < len(spans) - 1
+                ),
+            )
+        )
+        if last == len(spans) - 1:
+            break
+    return passages
+
+
+def passage_id(doc_id: str, index: int) -> str:
+    return f"{doc_id}{PASSAGE_ID_SEP}{index}"
+
+
+def split_passage_id(value: str) -> tuple[str, int | None]:
+    """(doc id, passage index) for `passage_id` output; index None otherwise."""
+    doc_id, sep, index = value.rpartition(PASSAGE_ID_SEP)
+    if not sep or not index.isdigit():
+        return value, None
+    return doc_id, int(index)
+
+
+def passage_prefix(doc_prefix: str) -> str:
+    """Passage hash prefix: `doc:` -> `passage:`, `v3:doc:` -> `v3:passage:`."""
+    if doc_prefix.endswith("doc:"):
+        return f"{doc_prefix[: -len('doc:')]}passage:"
+    return f"{doc_prefix}passage:"
+
+
+def max_by_doc(
+    hits: Iterable[tuple[str, str, float]],
+) -> tuple[list[tuple[str, float]], dict[str, str]]:
+    """
+    Max-sim aggregation of (passage key, doc key, score) hits: each doc scores
+    as its best passage. Returns docs best first plus doc key -> best passage.
+    """
+    scored: dict[str, float] = {}
+    best: dict[str, str] = {}
+    for passage_key, doc_key, score in hits:
+        if doc_key not in scored or score > scored[doc_key]:
+            scored[doc_key] = score
+            best[doc_key] = passage_key
+    ranked = sorted(scored.items(), key=lambda item: item[1], reverse=True)
+    return ranked, best
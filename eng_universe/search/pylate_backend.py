@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Any, Sequence
+from typing import Any, Container, Sequence
 
 from eng_universe.config import Settings
+from eng_universe.monitoring.logging_utils import get_event_logger
+from eng_universe.monitoring.metrics import (
+    record_plaid_flush,
+    record_pylate_query_batch,
+)
+from eng_universe.search.embedding_cache import cached_encode
+
+log_event = get_event_logger("pylate")
 
 
 @dataclass
@@ -65,16 +78,27 @@ def get_colbert_stack() -> ColBERTStack:
     )
 
 
-def encode_documents(documents: Sequence[str]) -> Any:
+def _encode_documents_uncached(documents: list[str]) -> Any:
     model = get_colbert_model()
     return model.encode(
-        list(documents),
+        documents,
         batch_size=Settings.pylate_batch_size,
         is_query=False,
         show_progress_bar=Settings.pylate_show_progress,
     )
 
 
+def encode_documents(documents: Sequence[str]) -> Any:
+    # dim=0: the ColBERT projection size is fixed by the model name.
+    return cached_encode(
+        documents,
+        _encode_documents_uncached,
+        provider="pylate",
+        model=Settings.pylate_model_name,
+        dim=0,
+    )
+
+
 def encode_queries(queries: Sequence[str]) -> Any:
     model = get_colbert_model()
     return model.encode(
@@ -96,12 +120,308 @@ def add_documents(documents_ids: Sequence[str], documents: Sequence[str]) -> Non
     )
 
 
+def _indexed_document_ids(index: Any) -> Container[str] | None:
+    """PLAID's doc id -> PLAID id mapping, when the installed PyLate keeps one."""
+    for backend in (getattr(index, "_index", None), index):
+        load = getattr(backend, "_load_documents_ids_to_plaid_ids", None)
+        if load is not None:
+            return load()
+    return None
+
+
+def remove_documents(documents_ids: Sequence[str]) -> None:
+    """Removes the ids PLAID holds; unknown ids are ignored."""
+    if not documents_ids:
+        return
+    index = get_plaid_index()
+    indexed = _indexed_document_ids(index)
+    if indexed is not None:
+        documents_ids = [doc_id for doc_id in documents_ids if doc_id in indexed]
+        if not documents_ids:
+            return
+    try:
+        index.remove_documents(documents_ids=list(documents_ids))
+    except KeyError:
+        # The Stanford backend rejects the whole call for one unknown id.
+        for document_id in documents_ids:
+            try:
+                index.remove_documents(documents_ids=[document_id])
+            except KeyError:
+                continue
+
+
+class PlaidWriteBuffer:
+    """
+    Collects documents and writes them to PLAID in one encode + add_documents
+    call once `max_docs` are pending or the oldest pending doc is older than
+    `max_age_s`. Re-adding a pending doc id replaces its text. Each flush
+    first removes the ids it re-adds (and any `discard`ed ids) that PLAID
+    already holds, so a changed doc replaces its old PLAID entry instead of
+    duplicating it while new docs cost no removal. A failed flush keeps its
+    docs buffered for the next one.
+    """
+
+    def __init__(self, max_docs: int, max_age_s: float) -> None:
+        self._max_docs = max(1, max_docs)
+        self._max_age_s = max_age_s
+        self._pending: dict[str, str] = {}
+        self._removals: set[str] = set()
+        self._oldest: float | None = None
+        self._inflight: set[str] = set()
+        self._waiting: list[tuple[set[str], object]] = []
+        self._synced: list[object] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, document_id: str, document: str) -> int:
+        """Buffers one document; returns how many docs were flushed (if any)."""
+        with self._lock:
+            self._pending[document_id] = document
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+        return self.flush_if_due()
+
+    def flush_if_due(self) -> int:
+        """Flushes when due; a failure is logged and the docs stay buffered."""
+        if not self._due():
+            return 0
+        try:
+            return self.flush()
+        except Exception as exc:
+            log_event(
+                "flush_fail", docs=len(self), error=f"{type(exc).__name__}: {exc}"
+            )
+            return 0
+
+    def discard(self, document_ids: Sequence[str]) -> None:
+        """Queues ids to remove from PLAID on the next flush."""
+        with self._lock:
+            self._removals.update(document_ids)
+
+    def when_synced(self, document_ids: Sequence[str], token: object) -> None:
+        """
+        Hands `token` to `take_synced` once none of `document_ids` is buffered
+        or being flushed, i.e. once PLAID holds all of them.
+        """
+        ids = set(document_ids)
+        with self._lock:
+            if ids & (self._pending.keys() | self._inflight):
+                self._waiting.append((ids, token))
+            else:
+                self._synced.append(token)
+
+    def take_synced(self) -> list[object]:
+        with self._lock:
+            synced, self._synced = self._synced, []
+        return synced
+
+    def flush(self) -> int:
+        """Writes every buffered doc; on failure they are kept and it re-raises."""
+        with self._flush_lock:
+            with self._lock:
+                pending, oldest = self._pending, self._oldest
+                removals = self._removals
+                self._pending = {}
+                self._removals = set()
+                self._oldest = None
+                self._inflight = set(pending)
+            if not pending and not removals:
+                return 0
+            start = time.perf_counter()
+            try:
+                remove_documents(sorted(removals | pending.keys()))
+                if pending:
+                    add_documents(list(pending), list(pending.values()))
+            except BaseException:
+                with self._lock:
+                    # Docs re-added during the flush are newer than these.
+                    self._pending = {**pending, **self._pending}
+                    self._removals |= removals
+                    self._oldest = oldest
+                    self._inflight = set()
+                raise
+            latency_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._inflight = set()
+                self._release_waiting()
+            record_plaid_flush(len(pending), latency_ms)
+            log_event("flush", docs=len(pending), latency_ms=round(latency_ms, 1))
+            return len(pending)
+
+    def _release_waiting(self) -> None:
+        busy = self._pending.keys() | self._inflight
+        waiting: list[tuple[set[str], object]] = []
+        for ids, token in self._waiting:
+            if ids & busy:
+                waiting.append((ids, token))
+            else:
+                self._synced.append(token)
+        self._waiting = waiting
+
+    def _due(self) -> bool:
+        with self._lock:
+            if not self._pending:
+                return False
+            if len(self._pending) >= self._max_docs:
+                return True
+            return (
+                self._oldest is not None
+                and time.monotonic() - self._oldest >= self._max_age_s
+            )
+
+
+@lru_cache(maxsize=1)
+def get_plaid_write_buffer() -> PlaidWriteBuffer:
+    buffer = PlaidWriteBuffer(
+        max_docs=Settings.pylate_flush_size,
+        max_age_s=Settings.pylate_flush_interval_s,
+    )
+    atexit.register(buffer.flush)
+    return buffer
+
+
+def flush_plaid_buffer() -> int:
+    if get_plaid_write_buffer.cache_info().currsize == 0:
+        return 0
+    return get_plaid_write_buffer().flush()
+
+
 def retrieve(query: str, k: int) -> list[dict[str, float]]:
     if not query:
         return []
-    queries_embeddings = encode_queries([query])
+    return retrieve_batch([query], k)[0]
+
+
+def retrieve_batch(queries: Sequence[str], k: int) -> list[list[dict[str, float]]]:
+    """One `encode_queries` forward pass and one PLAID search for all queries."""
+    if not queries:
+        return []
+    queries_embeddings = encode_queries(queries)
     retriever = get_colbert_retriever()
     results = retriever.retrieve(queries_embeddings=queries_embeddings, k=k)
-    if not results:
+    return [list(hits) for hits in results or [[] for _ in queries]]
+
+
+class QueryBatcher:
+    """
+    Collects concurrent PyLate queries into micro-batches run on one dedicated
+    thread, keeping the event loop free. A batch starts as soon as one query
+    arrives and takes whatever else arrives within `max_wait_ms` (up to
+    `max_batch`); while it runs, new queries queue up for the next batch, so
+    batches grow with load. The bounded queue makes callers wait once it is
+    full instead of piling up unbounded work.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float, queue_size: int) -> None:
+        self._max_batch = max(1, max_batch)
+        self._max_wait_s = max(0.0, max_wait_ms) / 1000
+        self._queue: asyncio.Queue[
+            tuple[str, int, asyncio.Future[list[dict[str, float]]]]
+        ] = asyncio.Queue(maxsize=max(1, queue_size))
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="pylate-query"
+        )
+        self._loop = asyncio.get_running_loop()
+        self._worker = asyncio.create_task(self._run())
+
+    async def retrieve(self, query: str, k: int) -> list[dict[str, float]]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, k, future))
+        return await future
+
+    async def _collect(
+        self,
+    ) -> list[tuple[str, int, asyncio.Future[list[dict[str, float]]]]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self._max_wait_s
+        while len(batch) < self._max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        try:
+            await self._consume()
+        finally:
+            # Also reached when the loop shuts down without `close()`.
+            self._shutdown()
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [item for item in batch if not item[2].done()]
+            if not batch:
+                continue
+            queries = [query for query, _, _ in batch]
+            k = max(k for _, k, _ in batch)
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, retrieve_batch, queries, k
+                )
+            except asyncio.CancelledError:
+                for _, _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as exc:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            record_pylate_query_batch(
+                len(batch), (time.perf_counter() - start) * 1000
+            )
+            for (_, query_k, future), hits in zip(batch, results):
+                if not future.done():
+                    future.set_result(hits[:query_k])
+
+    def close(self) -> None:
+        """Stops the consumer and its thread; queued queries are cancelled."""
+        self._worker.cancel()
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        if _QUERY_BATCHERS.get(self._loop) is self:
+            del _QUERY_BATCHERS[self._loop]
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            future.cancel()
+
+
+# One batcher per event loop; a batcher removes itself once closed.
+_QUERY_BATCHERS: dict[asyncio.AbstractEventLoop, QueryBatcher] = {}
+
+
+def close_query_batchers() -> None:
+    """Closes every query batcher, e.g. from an API shutdown hook."""
+    for batcher in list(_QUERY_BATCHERS.values()):
+        batcher.close()
+
+
+async def retrieve_async(query: str, k: int) -> list[dict[str, float]]:
+    """`retrieve` for async callers, micro-batched with concurrent queries."""
+    if not query:
         return []
-    return results[0]
+    loop = asyncio.get_running_loop()
+    batcher = _QUERY_BATCHERS.get(loop)
+    if batcher is None:
+        batcher = QueryBatcher(
+            Settings.pylate_query_batch_size,
+            Settings.pylate_query_batch_wait_ms,
+            Settings.pylate_query_queue_size,
+        )
+        _QUERY_BATCHERS[loop] = batcher
+    return await batcher.retrieve(query, k)
@@ -0,0 +1,120 @@
+"""In-process caches and request coalescing for the query path."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Hashable
+
+from eng_universe.config import Settings
+from eng_universe.search.embeddings import get_embedding_provider, normalize_embedding
+from eng_universe.monitoring.metrics import record_query_embedding_cache
+
+
+class TTLCache:
+    """Bounded LRU whose entries also expire `ttl_s` seconds after insertion."""
+
+    def __init__(self, max_entries: int, ttl_s: float) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl_s = ttl_s
+        self._items: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._items[key] = (time.monotonic() + self._ttl_s, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self._max_entries:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class SingleFlight:
+    """
+    Runs at most one coroutine per key at a time; callers arriving while it is
+    in flight await the same result. The shared task is shielded so one caller
+    disconnecting does not cancel the work for the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+
+    async def do(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """Returns (result, shared) where `shared` means another call ran it."""
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), shared
+
+
+def normalize_query_text(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+@lru_cache(maxsize=1)
+def _query_embedding_cache() -> TTLCache:
+    return TTLCache(
+        Settings.query_embedding_cache_size, Settings.query_embedding_cache_ttl_s
+    )
+
+
+@lru_cache(maxsize=1)
+def _query_embedding_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=max(1, Settings.embeddings_concurrency),
+        thread_name_prefix="query-embed",
+    )
+
+
+_EMBED_FLIGHTS = SingleFlight()
+
+
+async def embed_query(text: str) -> list[float]:
+    """
+    Embeds a search query off the event loop. Results are cached per
+    (provider, model, normalized text), and concurrent identical queries share
+    one embedding call.
+    """
+    provider = get_embedding_provider()
+    normalized = normalize_query_text(text)
+    key = (provider.name, provider.model, normalized)
+    cache = _query_embedding_cache()
+    vector = cache.get(key)
+    if vector is not None:
+        record_query_embedding_cache("hit")
+        return vector
+
+    async def compute() -> list[float]:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            _query_embedding_executor(), provider.embed, normalized
+        )
+        embedding = normalize_embedding(result.vector, Settings.embeddings_dim)
+        cache.set(key, embedding)
+        return embedding
+
+    vector, shared = await _EMBED_FLIGHTS.do(key, compute)
+    record_query_embedding_cache("coalesced" if shared else "miss")
+    return vector
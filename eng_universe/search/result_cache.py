@@ -0,0 +1,112 @@
+"""Two-tier search result cache invalidated by the index generation counter."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from functools import lru_cache
+from typing import Any
+
+import redis.asyncio as redis
+
+from eng_universe.config import Settings
+from eng_universe.monitoring.metrics import record_search_cache
+from eng_universe.search.query_cache import TTLCache, normalize_query_text
+
+Rows = list[dict[str, Any]]
+
+
+def result_cache_key(query: str, **params: object) -> str:
+    """
+    Stable digest of the normalized query and every parameter that changes
+    the result list (mode, limit, filters, ...).
+    """
+    payload = json.dumps(
+        {"q": normalize_query_text(query), **params}, sort_keys=True, default=str
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SearchResultCache:
+    """
+    In-process LRU in front of an optional shared Redis tier. Keys embed the
+    index generation, so a bump makes every older entry unreachable; stale
+    entries then age out of the LRU and expire from Redis on their TTL.
+    The generation itself is re-read at most every `generation_poll_s`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_s: float,
+        *,
+        use_redis: bool,
+        key_prefix: str,
+        generation_poll_s: float,
+    ) -> None:
+        self._memory = TTLCache(max_entries, ttl_s)
+        self._ttl_s = ttl_s
+        self._use_redis = use_redis
+        self._key_prefix = key_prefix
+        self._generation_poll_s = generation_poll_s
+        self._generation = 0
+        self._generation_checked_at = float("-inf")
+
+    async def generation(self, redis_client: redis.Redis) -> int:
+        now = time.monotonic()
+        if now - self._generation_checked_at < self._generation_poll_s:
+            return self._generation
+        raw = await redis_client.get(Settings.index_generation_key)
+        self._generation_checked_at = now
+        try:
+            generation = int(raw) if raw is not None else 0
+        except ValueError:
+            generation = 0
+        if generation != self._generation:
+            self._memory.clear()
+            self._generation = generation
+        return generation
+
+    def _redis_key(self, generation: int, key: str) -> str:
+        return f"{self._key_prefix}{generation}:{key}"
+
+    async def get(self, redis_client: redis.Redis, key: str) -> Rows | None:
+        generation = await self.generation(redis_client)
+        rows = self._memory.get((generation, key))
+        record_search_cache("memory", rows is not None)
+        if rows is not None or not self._use_redis:
+            return rows
+        raw = await redis_client.get(self._redis_key(generation, key))
+        record_search_cache("redis", raw is not None)
+        if raw is None:
+            return None
+        rows = json.loads(raw)
+        self._memory.set((generation, key), rows)
+        return rows
+
+    async def set(self, redis_client: redis.Redis, key: str, rows: Rows) -> None:
+        generation = await self.generation(redis_client)
+        self._memory.set((generation, key), rows)
+        if self._use_redis:
+            await redis_client.set(
+                self._redis_key(generation, key),
+                json.dumps(rows),
+                ex=max(1, int(self._ttl_s)),
+            )
+
+
+@lru_cache(maxsize=1)
+def get_search_result_cache() -> SearchResultCache | None:
+    backend = Settings.search_cache_backend
+    if backend in {"", "none", "off"} or Settings.search_cache_size <= 0:
+        return None
+    if backend not in {"memory", "redis"}:
+        raise ValueError(f"Unknown search cache backend: {backend}")
+    return SearchResultCache(
+        Settings.search_cache_size,
+        Settings.search_cache_ttl_s,
+        use_redis=backend == "redis",
+        key_prefix=Settings.search_cache_key_prefix,
+        generation_poll_s=Settings.search_cache_generation_poll_s,
+    )
@@ -1,16 +1,63 @@
+import asyncio
+import hashlib
 import logging
-import math
 import re
-import struct
 import time
-from dataclasses import dataclass
+from collections.abc import Mapping, Sequence
+from dataclasses import asdict, dataclass
+from typing import Awaitable, TypeVar
 
+import numpy as np
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError
 
 from eng_universe.config import Settings
-from eng_universe.search.embeddings import get_embedding_provider, normalize_embedding
-from eng_universe.monitoring.metrics import SEARCH_LATENCY_MS
-from eng_universe.search.pylate_backend import retrieve as pylate_retrieve
+from eng_universe.monitoring.metrics import (
+    SEARCH_LATENCY_MS,
+    record_search_early_exit,
+    record_search_leg,
+    record_search_single_flight,
+)
+from eng_universe.search.cursors import (
+    SEARCH_MODES,
+    PageCursor,
+    encode_cursor,
+    get_candidate_cache,
+)
+from eng_universe.search.facets import FacetCount, facet_counts
+from eng_universe.search.filters import (
+    SearchFilters,
+    filter_clause,
+    parse_inline_filters,
+    with_filters,
+)
+from eng_universe.search.passages import (
+    max_by_doc,
+    passage_prefix,
+    split_passage_id,
+)
+from eng_universe.search.pylate_backend import retrieve_async as pylate_retrieve
+from eng_universe.search.query_cache import SingleFlight, embed_query
+from eng_universe.search.snippets import (
+    LUA_BEST_WINDOW_START,
+    best_window_start,
+    query_term_hashes,
+)
+from eng_universe.search.result_cache import get_search_result_cache, result_cache_key
+from eng_universe.search.timings import (
+    add_stage,
+    mark_search,
+    search_timings,
+    timed_stage,
+)
+from eng_universe.search.token_store import (
+    encode_query_tokens,
+    rerank_with_tokens,
+    token_store_enabled,
+)
+from eng_universe.search.vectors import unit_vector, vector_to_bytes
+
+T = TypeVar("T")
 
 LOGGER = logging.getLogger("search")
 if not logging.getLogger().handlers:
@@ -88,9 +135,19 @@ def _split_prefix_query(text: str) -> tuple[str, str | None]:
     return normalized, None
 
 
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _searchable_text(query: str) -> str:
+    """`query` stripped, or "" when it has no word to search for."""
+    query = query.strip()
+    return query if _WORD_CHAR.search(query) else ""
+
+
 def _build_text_query(query: str) -> str:
     """
-    Returns redis full text query from user input.
+    Returns redis full text query from user input; `*` when it has no terms.
+    `*` also matches passage hashes, so it is only sent with a filter clause.
     """
     base, prefix = _split_prefix_query(query)
     if not base and not prefix:
@@ -139,8 +196,29 @@ def _decode_doc_ids(raw: object) -> list[str]:
     return [_decode_value(item) for item in raw[1:]]
 
 
+def _cached_snippet(mapping: Mapping[str, object], query: str) -> str:
+    """
+    Snippet for a doc-cache entry. With a `snippet_index`, only a window that
+    starts at the sentence covering the most query terms is read (snapshot
+    rows expose `content_window` so the rest of the body is never decoded);
+    without one, the whole body is scanned by `_make_snippet`.
+    """
+    index = mapping.get("snippet_index")
+    if not isinstance(index, (bytes, bytearray, memoryview)) or not index:
+        return _make_snippet(str(mapping.get("content", "")), query)
+    start = best_window_start(index, query_term_hashes(query)) or 0
+    length = Settings.snippet_window_bytes
+    content_window = getattr(mapping, "content_window", None)
+    if content_window is not None:
+        window, size = content_window(start, length)
+    else:
+        content = str(mapping.get("content", "")).encode("utf-8")
+        window, size = content[start : start + length], len(content)
+    return _snippet_from_window(window, query, offset=start, size=size)
+
+
 def _result_from_mapping(
-    mapping: dict[str, object],
+    mapping: Mapping[str, object],
     *,
     doc_key: str,
     query: str,
@@ -148,12 +226,14 @@ def _result_from_mapping(
 ) -> SearchResult:
     authors_raw = mapping.get("authors", "")
     authors = [item.strip() for item in str(authors_raw).split(",") if item.strip()]
-    content = str(mapping.get("content", ""))
+    snippet = mapping.get("snippet")
+    if snippet is None:
+        snippet = _cached_snippet(mapping, query)
     return SearchResult(
         doc_id=str(mapping.get("doc_id") or doc_key),
         title=str(mapping.get("title", "")),
         url=str(mapping.get("url", "")),
-        snippet=_make_snippet(content, query),
+        snippet=str(snippet),
         authors=authors,
         company=str(mapping.get("company", "")),
         published_at=str(mapping.get("published_at") or "") or None,
@@ -161,12 +241,143 @@ def _result_from_mapping(
     )
 
 
+# A dict from `load_doc_cache`, a `DocStore` snapshot or a `LiveDocCache`.
+DocCache = Mapping[str, Mapping[str, object]]
+
+_RESULT_FIELDS = ("doc_id", "title", "url", "company", "authors", "published_at")
+# Returns HMGET of the result fields plus a bounded window of `content`, so full
+# doc bodies and embeddings never leave Redis: {fields, window, offset, size}.
+# ARGV: window bytes, term hash count, term hashes, fields.
+# The window starts at the sentence covering the most query terms according to
+# the doc's `snippet_index`, or at the head of docs indexed without one; the
+# script never scans `content` itself.
+_HYDRATE_SCRIPT = (
+    LUA_BEST_WINDOW_START
+    + """
+local term_count = tonumber(ARGV[2])
+local hashes = {}
+for i = 1, term_count do
+  hashes[i] = tonumber(ARGV[2 + i])
+end
+local fields = redis.call('HMGET', KEYS[1], unpack(ARGV, 3 + term_count))
+local content = redis.call('HGET', KEYS[1], 'content')
+if not content then
+  return {fields, '', 0, 0}
+end
+local window = tonumber(ARGV[1])
+local start = 1
+local best = best_window_start(redis.call('HGET', KEYS[1], 'snippet_index'), hashes)
+if best then
+  start = best + 1
+end
+return {fields, string.sub(content, start, start + window - 1), start - 1, #content}
+"""
+)
+# Called with EVALSHA; loaded once per Redis server on the first NOSCRIPT.
+_HYDRATE_SHA = hashlib.sha1(_HYDRATE_SCRIPT.encode()).hexdigest()
+
+
+def _snippet_from_window(
+    window: bytes, query: str, *, offset: int, size: int
+) -> str:
+    snippet = _make_snippet(window.decode("utf-8", errors="ignore"), query)
+    if not snippet:
+        return snippet
+    if offset > 0 and not snippet.startswith("…"):
+        snippet = f"…{snippet}"
+    if offset + len(window) < size and not snippet.endswith("…"):
+        snippet = f"{snippet}…"
+    return snippet
+
+
+async def _hydrate(
+    redis_client: redis.Redis,
+    scored: Sequence[tuple[str, float]],
+    *,
+    query: str,
+    doc_cache: DocCache | None = None,
+    passages: Mapping[str, str] | None = None,
+) -> list[SearchResult]:
+    """
+    Turns ranked (doc_key, score) pairs into results, in order. Docs come from
+    `doc_cache` when present; the rest are read in a single pipeline that
+    returns only the response fields and a snippet window. Docs with a best
+    passage in `passages` (doc key -> passage key) use its precomputed
+    snippet, read in the same pipeline. Missing docs are dropped.
+    """
+    mappings: dict[str, Mapping[str, object]] = {}
+    if doc_cache is not None:
+        for doc_key, _ in scored:
+            mapping = doc_cache.get(doc_key)
+            if mapping is not None:
+                mappings[doc_key] = mapping
+    missing = list(dict.fromkeys(k for k, _ in scored if k not in mappings))
+    snippet_keys = [
+        (doc_key, passages[doc_key])
+        for doc_key in dict.fromkeys(k for k, _ in scored)
+        if passages and doc_key in passages
+    ]
+    if missing or snippet_keys:
+        with timed_stage("hydrate"):
+            hashes = query_term_hashes(query)
+            args = [
+                Settings.snippet_window_bytes,
+                len(hashes),
+                *hashes,
+                *_RESULT_FIELDS,
+            ]
+            for attempt in range(2):
+                pipe = redis_client.pipeline(transaction=False)
+                for doc_key in missing:
+                    pipe.evalsha(_HYDRATE_SHA, 1, doc_key, *args)
+                for _, passage_key in snippet_keys:
+                    pipe.hget(passage_key, "snippet")
+                try:
+                    replies = await pipe.execute()
+                    break
+                except NoScriptError:
+                    if attempt:
+                        raise
+                    await redis_client.script_load(_HYDRATE_SCRIPT)
+        with timed_stage("snippet"):
+            for doc_key, reply in zip(missing, replies):
+                fields, window, offset, size = reply
+                if all(value is None for value in fields) and not size:
+                    continue
+                mapping = {
+                    name: _decode_value(value) if value is not None else ""
+                    for name, value in zip(_RESULT_FIELDS, fields)
+                }
+                mapping["snippet"] = _snippet_from_window(
+                    window or b"", query, offset=int(offset), size=int(size)
+                )
+                mappings[doc_key] = mapping
+            for (doc_key, _), snippet in zip(snippet_keys, replies[len(missing) :]):
+                if snippet and doc_key in mappings:
+                    mappings[doc_key] = {
+                        **mappings[doc_key],
+                        "snippet": _decode_value(snippet),
+                    }
+    # Doc cache entries get their snippets here.
+    with timed_stage("snippet"):
+        return [
+            _result_from_mapping(
+                mappings[doc_key], doc_key=doc_key, query=query, score=score
+            )
+            for doc_key, score in scored
+            if doc_key in mappings
+        ]
+
+
+_BINARY_FIELDS = {"embedding", "embedding_i8", "snippet_index"}
+
+
 async def load_doc_cache(
-    redis_client: redis.Redis, *, batch_size: int = 500
+    redis_client: redis.Redis, *, batch_size: int = 500, doc_prefix: str = "doc:"
 ) -> dict[str, dict[str, object]]:
     cache: dict[str, dict[str, object]] = {}
     batch: list[str] = []
-    async for key in redis_client.scan_iter(match="doc:*", count=batch_size):
+    async for key in redis_client.scan_iter(match=f"{doc_prefix}*", count=batch_size):
         key_str = _decode_value(key)
         batch.append(key_str)
         if len(batch) >= batch_size:
@@ -187,28 +398,389 @@ async def _load_doc_cache_batch(
     for key, raw_doc in zip(keys, raw_docs):
         if not raw_doc:
             continue
-        cache[key] = _decode_hash(raw_doc, keep_bytes={"embedding"})
+        mapping = _decode_hash(raw_doc, keep_bytes=_BINARY_FIELDS)
+        _attach_unit_vector(mapping)
+        cache[key] = mapping
+
+
+def _attach_unit_vector(mapping: dict[str, object]) -> None:
+    """
+    Replaces the raw embedding fields with `_vec` and `_vec_scale` such that
+    `_vec * _vec_scale` is the unit-norm doc vector (see `unit_vector`).
+    """
+    raw = mapping.pop("embedding", None)
+    codes = mapping.pop("embedding_i8", None)
+    mapping.pop("embedding_scale", None)
+    unit = unit_vector(raw, codes, Settings.embeddings_dim)
+    if unit is not None:
+        mapping["_vec"], mapping["_vec_scale"] = unit
 
 
-def _bytes_to_vector(raw: object) -> list[float]:
-    if not isinstance(raw, (bytes, bytearray)) or not raw:
+def _top_k_by_cosine(
+    query_vector: list[float], doc_items: list[tuple[str, dict[str, object]]], k: int
+) -> list[tuple[str, dict[str, object], float]]:
+    """
+    Scores every candidate with one matrix-vector product against the
+    pre-normalized doc vectors and returns the best `k`, highest first.
+    Candidates without a usable vector are dropped.
+    """
+    rows: list[np.ndarray] = []
+    scales: list[float] = []
+    kept: list[tuple[str, dict[str, object]]] = []
+    for doc_key, mapping in doc_items:
+        if "_vec" not in mapping:
+            _attach_unit_vector(mapping)
+        vector = mapping.get("_vec")
+        if vector is None:
+            continue
+        rows.append(vector)  # type: ignore[arg-type]
+        scales.append(float(mapping["_vec_scale"]))  # type: ignore[arg-type]
+        kept.append((doc_key, mapping))
+    if not kept or k <= 0:
         return []
-    if len(raw) % 4 != 0:
+    query = np.asarray(query_vector, dtype=np.float32)
+    query_norm = float(np.linalg.norm(query))
+    if query_norm == 0:
+        scores = np.zeros(len(kept), dtype=np.float32)
+    else:
+        matrix = np.vstack(rows).astype(np.float32, copy=False)
+        scores = (matrix @ (query / query_norm)) * np.asarray(scales, dtype=np.float32)
+    if k < len(kept):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(kept))
+    order = top[np.argsort(-scores[top], kind="stable")]
+    return [(kept[i][0], kept[i][1], float(scores[i])) for i in order]
+
+
+def _knn_clause(
+    limit: int, ef_runtime: int | None, field: str = "embedding"
+) -> str:
+    ef_expr = f" EF_RUNTIME {ef_runtime}" if ef_runtime else ""
+    return f"KNN {limit} @{field} $vec{ef_expr} AS vector_score"
+
+
+def _decode_scored_ids(raw: object) -> list[tuple[str, float]]:
+    """
+    (docID, score) pairs from `WITHSCORES RETURN 0` or `RETURN 1 vector_score`
+    responses; both alternate docIDs with one score-bearing item.
+    """
+    if not isinstance(raw, (list, tuple)) or len(raw) <= 1:
         return []
-    count = len(raw) // 4
-    return list(struct.unpack(f"{count}f", raw))
+    pairs: list[tuple[str, float]] = []
+    for doc_id, value in zip(raw[1::2], raw[2::2]):
+        if isinstance(value, (list, tuple)):
+            value = value[-1] if value else None
+        try:
+            score = float(_decode_value(value))
+        except (TypeError, ValueError):
+            continue
+        pairs.append((_decode_value(doc_id), score))
+    return pairs
 
 
-def _cosine_similarity(left: list[float], right: list[float]) -> float:
-    if not left or not right or len(left) != len(right):
-        return 0.0
-    dot = sum(l * r for l, r in zip(left, right))
-    left_norm = math.sqrt(sum(l * l for l in left))
-    right_norm = math.sqrt(sum(r * r for r in right))
-    denom = left_norm * right_norm
-    if denom == 0:
-        return 0.0
-    return dot / denom
+async def _knn_docs(
+    redis_client: redis.Redis,
+    index_name: str,
+    vector_bytes: bytes,
+    limit: int,
+    *,
+    ef_runtime: int | None,
+    prefilter: str = "",
+) -> tuple[list[tuple[str, float]], dict[str, str]]:
+    """
+    KNN over doc vectors: (doc key, similarity) best first, no passages.
+    A `prefilter` clause restricts the candidates before the vector search.
+    """
+    base = f"({prefilter})" if prefilter else "*"
+    raw = await redis_client.execute_command(
+        "FT.SEARCH",
+        index_name,
+        f"{base}=>[{_knn_clause(limit, ef_runtime)}]",
+        "PARAMS",
+        "2",
+        "vec",
+        vector_bytes,
+        "SORTBY",
+        "vector_score",
+        "LIMIT",
+        "0",
+        str(limit),
+        "RETURN",
+        "1",
+        "vector_score",
+        "DIALECT",
+        "2",
+    )
+    return [(key, 1.0 - distance) for key, distance in _decode_scored_ids(raw)], {}
+
+
+async def _knn_passages(
+    redis_client: redis.Redis,
+    index_name: str,
+    vector_bytes: bytes,
+    limit: int,
+    *,
+    ef_runtime: int | None,
+) -> tuple[list[tuple[str, float]], dict[str, str]]:
+    """
+    KNN over passage vectors, aggregated to docs with max-sim. Fetches
+    `limit * PASSAGE_KNN_FANOUT` passages so that roughly `limit` distinct
+    docs survive; returns (doc key, similarity) best first and each doc's
+    best passage key.
+    """
+    k = limit * max(1, Settings.passage_knn_fanout)
+    raw = await redis_client.execute_command(
+        "FT.SEARCH",
+        index_name,
+        f"*=>[{_knn_clause(k, ef_runtime, 'passage_embedding')}]",
+        "PARAMS",
+        "2",
+        "vec",
+        vector_bytes,
+        "SORTBY",
+        "vector_score",
+        "LIMIT",
+        "0",
+        str(k),
+        "RETURN",
+        "2",
+        "parent",
+        "vector_score",
+        "DIALECT",
+        "2",
+    )
+    hits: list[tuple[str, str, float]] = []
+    if isinstance(raw, (list, tuple)):
+        for passage_key, fields in zip(raw[1::2], raw[2::2]):
+            values = dict(zip(fields[::2], fields[1::2]))
+            parent = values.get(b"parent", values.get("parent"))
+            distance = values.get(b"vector_score", values.get("vector_score"))
+            if parent is None or distance is None:
+                continue
+            hits.append(
+                (
+                    _decode_value(passage_key),
+                    _decode_value(parent),
+                    1.0 - float(_decode_value(distance)),
+                )
+            )
+    ranked, best = max_by_doc(hits)
+    return ranked[:limit], best
+
+
+def _fuse_hybrid(
+    bm25: list[tuple[str, float]], vector: list[tuple[str, float]]
+) -> list[tuple[str, float]]:
+    """
+    Fuses the two legs, best first. `rrf` scores each doc by
+    sum(weight / (k + rank)); `weighted` mixes max-normalized BM25 with the
+    `vector` leg's similarity (higher is better, roughly in [0, 1]).
+    """
+    bm25_weight = Settings.hybrid_bm25_weight
+    vector_weight = Settings.hybrid_vector_weight
+    fused: dict[str, float] = {}
+    if Settings.hybrid_fusion == "weighted":
+        top = max((score for _, score in bm25), default=0.0)
+        for doc_id, score in bm25:
+            normalized = score / top if top > 0 else 0.0
+            fused[doc_id] = fused.get(doc_id, 0.0) + bm25_weight * normalized
+        for doc_id, similarity in vector:
+            fused[doc_id] = fused.get(doc_id, 0.0) + vector_weight * similarity
+    else:
+        rrf_k = Settings.hybrid_rrf_k
+        for weight, leg in ((bm25_weight, bm25), (vector_weight, vector)):
+            for rank, (doc_id, _) in enumerate(leg, start=1):
+                fused[doc_id] = fused.get(doc_id, 0.0) + weight / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+async def _timed_leg(leg: str, coro: Awaitable[T]) -> T:
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        latency_ms = (time.perf_counter() - start) * 1000
+        record_search_leg(leg, latency_ms)
+        add_stage(leg, latency_ms)
+        if Settings.debug_search:
+            LOGGER.info("search leg=%s latency_ms=%.1f", leg, latency_ms)
+
+
+async def _timed_stage(stage: str, coro: Awaitable[T]) -> T:
+    with timed_stage(stage):
+        return await coro
+
+
+async def _bm25_leg(
+    redis_client: redis.Redis, index_name: str, text_query: str, limit: int
+) -> list[tuple[str, float]]:
+    raw = await redis_client.execute_command(
+        "FT.SEARCH",
+        index_name,
+        text_query,
+        "WITHSCORES",
+        "LIMIT",
+        "0",
+        str(limit),
+        "RETURN",
+        "0",
+        "DIALECT",
+        "2",
+    )
+    return _decode_scored_ids(raw)
+
+
+async def _matching_keys(
+    redis_client: redis.Redis, index_name: str, keys: Sequence[str], clause: str
+) -> set[str]:
+    """The subset of `keys` matching `clause`, evaluated by RediSearch."""
+    if not keys:
+        return set()
+    raw = await redis_client.execute_command(
+        "FT.SEARCH",
+        index_name,
+        clause,
+        "INKEYS",
+        str(len(keys)),
+        *keys,
+        "LIMIT",
+        "0",
+        str(len(keys)),
+        "RETURN",
+        "0",
+        "DIALECT",
+        "2",
+    )
+    return set(_decode_doc_ids(raw))
+
+
+@dataclass
+class _Ranking:
+    """Candidates best first, their best passages and the RediSearch time."""
+
+    scored: list[tuple[str, float]]
+    passages: dict[str, str]
+    query_latency_ms: float
+
+
+async def _rank_hybrid(
+    redis_client: redis.Redis,
+    index_name: str,
+    text_query: str,
+    vector_bytes: bytes,
+    depth: int,
+    *,
+    ef_runtime: int | None,
+    clause: str = "",
+) -> _Ranking:
+    """
+    Runs the BM25 and KNN legs concurrently and fuses their Redis-side scores;
+    every fused candidate is kept so later pages need no new query.
+    `text_query` already carries the filter `clause`; the KNN leg uses it as
+    a pre-filter.
+    """
+    start_query = time.perf_counter()
+    if Settings.passage_chunking and not clause:
+        knn = _knn_passages(
+            redis_client, index_name, vector_bytes, depth, ef_runtime=ef_runtime
+        )
+    else:
+        # Passage hashes carry no filter fields, so filtered queries run KNN
+        # over the doc vectors.
+        knn = _knn_docs(
+            redis_client,
+            index_name,
+            vector_bytes,
+            depth,
+            ef_runtime=ef_runtime,
+            prefilter=clause,
+        )
+    bm25, (vector, passages) = await asyncio.gather(
+        _timed_leg("bm25", _bm25_leg(redis_client, index_name, text_query, depth)),
+        _timed_leg("knn", knn),
+    )
+    query_latency_ms = (time.perf_counter() - start_query) * 1000
+    with timed_stage("fuse"):
+        fused = _fuse_hybrid(bm25, vector)
+    if Settings.debug_search:
+        LOGGER.info(
+            "search hybrid candidates bm25=%s vector=%s fusion=%s",
+            len(bm25),
+            len(vector),
+            Settings.hybrid_fusion,
+        )
+    return _Ranking(fused, passages, query_latency_ms)
+
+
+def available_search_modes() -> list[str]:
+    """Modes this deployment can serve; rerank needs the ColBERT token store."""
+    return [
+        mode for mode in SEARCH_MODES if mode != "rerank" or token_store_enabled()
+    ]
+
+
+@dataclass
+class SearchPage:
+    results: list[SearchResult]
+    query_latency_ms: float
+    next_cursor: str | None
+
+
+async def search_page(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str = "",
+    mode: str = "hybrid",
+    limit: int = 10,
+    doc_cache: DocCache | None = None,
+    doc_prefix: str = "doc:",
+    ef_runtime: int | None = None,
+    filters: SearchFilters | None = None,
+    cursor: PageCursor | None = None,
+) -> SearchPage:
+    """
+    One page of results plus the cursor of the next one. A `cursor` replaces
+    every request argument with the ones of the page it was issued for.
+    The first page goes through the result cache; deeper pages slice the
+    ranked candidates kept by the first (keyword mode pages with `LIMIT`).
+    Stage timings are collected for the request (see `search_timings`).
+    """
+    with search_timings(mode):
+        if cursor is None:
+            query, inline = parse_inline_filters(query)
+            filters = (filters or SearchFilters()).merged(inline)
+            offset = 0
+        else:
+            query, mode, limit = cursor.query, cursor.mode, cursor.limit
+            filters = SearchFilters(**cursor.filters)  # type: ignore[arg-type]
+            ef_runtime, offset = cursor.ef_runtime, cursor.offset
+        mark_search(mode=mode)
+        results, query_latency_ms, has_more = await _search_coalesced(
+            redis_client,
+            index_name,
+            query,
+            mode,
+            limit,
+            offset=offset,
+            doc_cache=doc_cache,
+            doc_prefix=doc_prefix,
+            ef_runtime=ef_runtime,
+            filters=filters,
+        )
+        next_cursor = None
+        if has_more and offset + limit < Settings.search_cursor_max_depth:
+            next_cursor = encode_cursor(
+                PageCursor(
+                    query=query,
+                    mode=mode,
+                    limit=limit,
+                    offset=offset + limit,
+                    filters=filters.cache_key(),
+                    ef_runtime=ef_runtime,
+                )
+            )
+    return SearchPage(results, query_latency_ms, next_cursor)
 
 
 async def search(
@@ -217,153 +789,427 @@ async def search(
     query: str,
     mode: str = "hybrid",
     limit: int = 10,
-    doc_cache: dict[str, dict[str, object]] | None = None,
+    doc_cache: DocCache | None = None,
+    doc_prefix: str = "doc:",
+    ef_runtime: int | None = None,
+    filters: SearchFilters | None = None,
 ) -> tuple[list[SearchResult], float]:
-    query_latency_ms = 0.0
-    query = query.strip()
-    if not query:
-        return [], query_latency_ms
-    if Settings.keyword_only and mode != "keyword":
+    """
+    First page of `search_page`. Cached; a hit returns without contacting
+    RediSearch and reports zero query latency. Inline `field:value` terms in
+    `query` are merged into `filters`.
+    """
+    page = await search_page(
+        redis_client,
+        index_name,
+        query,
+        mode,
+        limit,
+        doc_cache=doc_cache,
+        doc_prefix=doc_prefix,
+        ef_runtime=ef_runtime,
+        filters=filters,
+    )
+    return page.results, page.query_latency_ms
+
+
+_SEARCH_FLIGHTS = SingleFlight()
+
+
+async def _search_coalesced(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    mode: str,
+    limit: int,
+    *,
+    offset: int,
+    doc_cache: DocCache | None,
+    doc_prefix: str,
+    ef_runtime: int | None,
+    filters: SearchFilters,
+) -> tuple[list[SearchResult], float, bool]:
+    """
+    `_search_cached`, with concurrent identical requests sharing one in-flight
+    call (`SEARCH_SINGLE_FLIGHT`). Nothing outlives the call, so unlike the
+    result cache this never serves a ranking older than the request.
+    """
+
+    def run() -> Awaitable[tuple[list[SearchResult], float, bool]]:
+        return _search_cached(
+            redis_client,
+            index_name,
+            query,
+            mode,
+            limit,
+            offset=offset,
+            doc_cache=doc_cache,
+            doc_prefix=doc_prefix,
+            ef_runtime=ef_runtime,
+            filters=filters,
+        )
+
+    if not Settings.search_single_flight:
+        return await run()
+    key = result_cache_key(
+        query,
+        index=index_name,
+        mode=mode,
+        limit=limit,
+        offset=offset,
+        doc_prefix=doc_prefix,
+        ef_runtime=ef_runtime,
+        filters=filters.cache_key(),
+    )
+    (results, query_latency_ms, has_more), shared = await _SEARCH_FLIGHTS.do(
+        key, run
+    )
+    record_search_single_flight(shared)
+    if shared:
+        mark_search(cache="coalesced")
+    # Followers get their own list; the SearchResult objects are shared.
+    return list(results), query_latency_ms, has_more
+
+
+async def _search_cached(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    mode: str,
+    limit: int,
+    *,
+    offset: int,
+    doc_cache: DocCache | None,
+    doc_prefix: str,
+    ef_runtime: int | None,
+    filters: SearchFilters,
+) -> tuple[list[SearchResult], float, bool]:
+    cache = get_search_result_cache()
+    if cache is None or offset or not (query or filters):
+        return await _search_uncached(
+            redis_client,
+            index_name,
+            query,
+            mode,
+            limit,
+            offset=offset,
+            doc_cache=doc_cache,
+            doc_prefix=doc_prefix,
+            ef_runtime=ef_runtime,
+            filters=filters,
+        )
+    key = result_cache_key(
+        query,
+        index=index_name,
+        mode=mode,
+        limit=limit,
+        doc_prefix=doc_prefix,
+        ef_runtime=ef_runtime,
+        filters=filters.cache_key(),
+    )
+    rows = await cache.get(redis_client, key)
+    if rows is not None:
+        mark_search(cache="hit")
+        # A full cached page may have a next one; the cursor finds out.
+        return [SearchResult(**row) for row in rows], 0.0, len(rows) == limit
+    results, query_latency_ms, has_more = await _search_uncached(
+        redis_client,
+        index_name,
+        query,
+        mode,
+        limit,
+        doc_cache=doc_cache,
+        doc_prefix=doc_prefix,
+        ef_runtime=ef_runtime,
+        filters=filters,
+    )
+    await cache.set(redis_client, key, [asdict(result) for result in results])
+    return results, query_latency_ms, has_more
+
+
+async def search_facets(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    fields: Sequence[str],
+    limit: int = 10,
+    filters: SearchFilters | None = None,
+) -> dict[str, list[FacetCount]]:
+    """
+    Top `limit` values of each facet field over the docs matching the query
+    text and filters, whatever the search mode. Runs one FT.AGGREGATE per
+    field concurrently; cached like `search` and invalidated by the same
+    index generation.
+    """
+    query, inline = parse_inline_filters(query)
+    query = _searchable_text(query)
+    filters = (filters or SearchFilters()).merged(inline)
+    clause = filter_clause(filters)
+    fields = list(dict.fromkeys(fields))
+    if not fields or not (query or clause):
+        return {}
+    cache = get_search_result_cache()
+    key = result_cache_key(
+        query,
+        index=index_name,
+        facets=sorted(fields),
+        limit=limit,
+        filters=filters.cache_key(),
+    )
+    if cache is not None:
+        rows = await cache.get(redis_client, key)
+        if rows is not None:
+            cached: dict[str, list[FacetCount]] = {field: [] for field in fields}
+            for row in rows:
+                cached[row["field"]].append(
+                    FacetCount(value=row["value"], count=row["count"])
+                )
+            return cached
+    query_expr = with_filters(_build_text_query(query), clause)
+    counts = await _timed_leg(
+        "facets",
+        asyncio.gather(
+            *(
+                facet_counts(redis_client, index_name, query_expr, field, limit)
+                for field in fields
+            )
+        ),
+    )
+    facets = dict(zip(fields, counts))
+    if cache is not None:
+        await cache.set(
+            redis_client,
+            key,
+            [
+                {"field": field, **asdict(item)}
+                for field, items in facets.items()
+                for item in items
+            ],
+        )
+    return facets
+
+
+async def _search_uncached(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    mode: str = "hybrid",
+    limit: int = 10,
+    *,
+    offset: int = 0,
+    doc_cache: DocCache | None = None,
+    doc_prefix: str = "doc:",
+    ef_runtime: int | None = None,
+    filters: SearchFilters | None = None,
+) -> tuple[list[SearchResult], float, bool]:
+    """
+    Hydrates the page at `offset` and says whether another may follow.
+    Keyword pages come straight from `LIMIT offset limit`; the other modes
+    page through `_ranked_candidates`.
+    """
+    # Punctuation-only text has no terms; with no filters it would be `*`.
+    query = _searchable_text(query)
+    clause = filter_clause(filters)
+    if (not query and not clause) or offset >= Settings.search_cursor_max_depth:
+        return [], 0.0, False
+    if (Settings.keyword_only or not query) and mode != "keyword":
+        # Filter-only requests have nothing to embed or rank: list matches.
         mode = "keyword"
-    provider_name = Settings.embeddings_provider.lower()
+        mark_search(mode=mode)
     if Settings.debug_search:
         LOGGER.info(
-            "search request provider=%s mode=%s query=%r limit=%s",
-            provider_name,
+            "search request provider=%s mode=%s query=%r filters=%r limit=%s "
+            "offset=%s",
+            Settings.embeddings_provider.lower(),
             mode,
             query,
+            clause,
+            limit,
+            offset,
+        )
+    if mode == "keyword":
+        ranking = await _rank_keyword(
+            redis_client, index_name, query, limit, offset=offset, clause=clause
+        )
+        page = ranking.scored
+        has_more = len(page) == limit
+    else:
+        ranking, depth = await _ranked_candidates(
+            redis_client,
+            index_name,
+            query,
+            mode,
             limit,
+            offset=offset,
+            doc_cache=doc_cache,
+            doc_prefix=doc_prefix,
+            ef_runtime=ef_runtime,
+            filters=filters or SearchFilters(),
         )
-    if provider_name in {"pylate", "colbert"} and mode != "keyword":
-        results, query_latency_ms = await _search_pylate(
-            redis_client, query, limit, doc_cache=doc_cache
+        page = ranking.scored[offset : offset + limit]
+        # A list as long as the requested depth may have been cut short by
+        # the legs' limits, so the page after it ranks deeper.
+        has_more = len(ranking.scored) > offset + limit or (
+            len(ranking.scored) >= depth and depth < Settings.search_cursor_max_depth
+        )
+    results = await _hydrate(
+        redis_client,
+        page,
+        query=query,
+        doc_cache=doc_cache,
+        passages=ranking.passages,
+    )
+    if ranking.query_latency_ms:
+        SEARCH_LATENCY_MS.labels(mode=mode).observe(ranking.query_latency_ms)
+    return results, ranking.query_latency_ms, has_more
+
+
+async def _ranked_candidates(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    mode: str,
+    limit: int,
+    *,
+    offset: int,
+    doc_cache: DocCache | None,
+    doc_prefix: str,
+    ef_runtime: int | None,
+    filters: SearchFilters,
+) -> tuple[_Ranking, int]:
+    """
+    Ranked candidates covering the page at `offset`, and the depth ranked.
+    Depth grows in steps of `limit * SEARCH_CURSOR_PAGES`, so one ranking
+    serves that many pages; it is kept in the candidate cache for the page
+    cursors (index generation invalidated, `SEARCH_CURSOR_TTL_S`).
+    """
+    step = limit * max(1, Settings.search_cursor_pages)
+    depth = min(
+        -(-(offset + limit) // step) * step,
+        max(Settings.search_cursor_max_depth, limit),
+    )
+    cache = get_candidate_cache()
+    key = result_cache_key(
+        query,
+        index=index_name,
+        mode=mode,
+        depth=depth,
+        doc_prefix=doc_prefix,
+        ef_runtime=ef_runtime,
+        filters=filters.cache_key(),
+    )
+    if cache is not None:
+        rows = await cache.get(redis_client, key)
+        if rows is not None:
+            scored = [(row["doc_key"], row["score"]) for row in rows]
+            passages = {
+                row["doc_key"]: row["passage"] for row in rows if row.get("passage")
+            }
+            mark_search(cache="hit")
+            return _Ranking(scored, passages, 0.0), depth
+    ranking = await _rank(
+        redis_client,
+        index_name,
+        query,
+        mode,
+        limit,
+        depth,
+        doc_cache=doc_cache,
+        doc_prefix=doc_prefix,
+        ef_runtime=ef_runtime,
+        clause=filter_clause(filters),
+    )
+    if cache is not None and len(ranking.scored) > limit:
+        await cache.set(
+            redis_client,
+            key,
+            [
+                {
+                    "doc_key": doc_key,
+                    "score": score,
+                    "passage": ranking.passages.get(doc_key),
+                }
+                for doc_key, score in ranking.scored
+            ],
+        )
+    return ranking, depth
+
+
+async def _rank(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    mode: str,
+    limit: int,
+    depth: int,
+    *,
+    doc_cache: DocCache | None,
+    doc_prefix: str,
+    ef_runtime: int | None,
+    clause: str,
+) -> _Ranking:
+    """Top `depth` candidates of a non-keyword mode."""
+    provider_name = Settings.embeddings_provider.lower()
+    if mode == "rerank":
+        if not token_store_enabled():
+            raise ValueError("rerank mode needs the ColBERT token store")
+        return await _rank_rerank(
+            redis_client, index_name, query, depth, doc_prefix=doc_prefix, clause=clause
+        )
+    if provider_name in {"pylate", "colbert"} and mode == "hybrid":
+        return await _rank_pylate_hybrid(
+            redis_client,
+            index_name,
+            query,
+            limit,
+            depth,
+            doc_prefix=doc_prefix,
+            clause=clause,
+        )
+    if provider_name in {"pylate", "colbert"}:
+        ranking = await _rank_pylate(
+            redis_client, index_name, query, depth, doc_prefix=doc_prefix, clause=clause
         )
         if Settings.debug_search:
-            LOGGER.info("search pylate results=%s", len(results))
-        SEARCH_LATENCY_MS.observe(query_latency_ms)
-        return results, query_latency_ms
-    text_query = _build_text_query(query)
-    needs_vector_score = False
-    embedding: list[float] | None = None
-    if mode == "keyword":
-        args = [
-            "FT.SEARCH",
+            LOGGER.info("search pylate candidates=%s", len(ranking.scored))
+        return ranking
+    text_query = with_filters(_build_text_query(query), clause)
+    if Settings.debug_search:
+        LOGGER.info("search redis mode=%s text_query=%s", mode, text_query)
+    with timed_stage("embed"):
+        embedding = await embed_query(query)
+    vector_bytes = vector_to_bytes(embedding)
+    if mode == "hybrid":
+        return await _rank_hybrid(
+            redis_client,
             index_name,
             text_query,
-            "LIMIT",
-            "0",
-            str(limit),
-            "RETURN",
-            "0",
-            "DIALECT",
-            "2",
-        ]
-        if Settings.debug_search:
-            LOGGER.info("search redis mode=keyword query=%s", text_query)
+            vector_bytes,
+            depth,
+            ef_runtime=ef_runtime,
+            clause=clause,
+        )
+    if mode == "semantic":
+        # Filters act as the KNN pre-filter.
+        text_query = with_filters("*", clause)
+    if text_query == "*" and Settings.passage_chunking:
+        start_query = time.perf_counter()
+        scored, passages = await _timed_leg(
+            "knn",
+            _knn_passages(
+                redis_client, index_name, vector_bytes, depth, ef_runtime=ef_runtime
+            ),
+        )
+        return _Ranking(scored, passages, (time.perf_counter() - start_query) * 1000)
+    if text_query == "*":
+        query_expr = f"*=>[{_knn_clause(depth, ef_runtime)}]"
     else:
-        if Settings.debug_search:
-            LOGGER.info("search redis mode=%s text_query=%s", mode, text_query)
-        provider = get_embedding_provider()
-        embedding = provider.embed(query).vector
-        embedding = normalize_embedding(embedding, Settings.embeddings_dim)
-        vector_bytes = struct.pack(f"{Settings.embeddings_dim}f", *embedding)
-        if mode == "hybrid":
-            bm25_limit = max(limit * 5, limit)
-            vector_limit = max(limit * 5, limit)
-            start_query = time.perf_counter()
-            bm25_raw = await redis_client.execute_command(
-                "FT.SEARCH",
-                index_name,
-                text_query,
-                "LIMIT",
-                "0",
-                str(bm25_limit),
-                "RETURN",
-                "0",
-                "DIALECT",
-                "2",
-            )
-            query_latency_ms += (time.perf_counter() - start_query) * 1000
-            start_query = time.perf_counter()
-            vector_raw = await redis_client.execute_command(
-                "FT.SEARCH",
-                index_name,
-                f"*=>[KNN {vector_limit} @embedding $vec AS vector_score]",
-                "PARAMS",
-                "2",
-                "vec",
-                vector_bytes,
-                "SORTBY",
-                "vector_score",
-                "RETURN",
-                "0",
-                "DIALECT",
-                "2",
-            )
-            query_latency_ms += (time.perf_counter() - start_query) * 1000
-            bm25_ids = _decode_doc_ids(bm25_raw)
-            vector_ids = _decode_doc_ids(vector_raw)
-            doc_keys = list(dict.fromkeys(bm25_ids + vector_ids))
-            if Settings.debug_search:
-                LOGGER.info(
-                    "search hybrid candidates bm25=%s vector=%s union=%s",
-                    len(bm25_ids),
-                    len(vector_ids),
-                    len(doc_keys),
-                )
-            if not doc_keys:
-                SEARCH_LATENCY_MS.observe(query_latency_ms)
-                return [], query_latency_ms
-            results: list[SearchResult] = []
-            doc_items: list[tuple[str, dict[str, object]]] = []
-            if doc_cache is None:
-                pipe = redis_client.pipeline()
-                for doc_key in doc_keys:
-                    pipe.hgetall(doc_key)
-                raw_docs = await pipe.execute()
-                for doc_key, raw_doc in zip(doc_keys, raw_docs):
-                    if not raw_doc:
-                        continue
-                    mapping = _decode_hash(raw_doc, keep_bytes={"embedding"})
-                    doc_items.append((doc_key, mapping))
-            else:
-                for doc_key in doc_keys:
-                    mapping = doc_cache.get(doc_key)
-                    if not mapping:
-                        continue
-                    doc_items.append((doc_key, mapping))
-            for doc_key, mapping in doc_items:
-                embedding_raw = mapping.get("embedding")
-                doc_vector = _bytes_to_vector(embedding_raw)
-                try:
-                    doc_vector = normalize_embedding(
-                        doc_vector, Settings.embeddings_dim
-                    )
-                except ValueError:
-                    continue
-                score = _cosine_similarity(embedding, doc_vector)
-                results.append(
-                    _result_from_mapping(
-                        mapping,
-                        doc_key=doc_key,
-                        query=query,
-                        score=score,
-                    )
-                )
-            results.sort(key=lambda item: item.score, reverse=True)
-            SEARCH_LATENCY_MS.observe(query_latency_ms)
-            return results[:limit], query_latency_ms
-        if mode == "semantic":
-            text_query = "*"
-        if text_query == "*":
-            query_expr = f"*=>[KNN {limit} @embedding $vec AS vector_score]"
-        else:
-            query_expr = (
-                f"({text_query})=>[KNN {limit} @embedding $vec AS vector_score]"
-            )
-        if Settings.debug_search:
-            LOGGER.info("search redis mode=%s query=%s", mode, query_expr)
-        args = [
+        query_expr = f"({text_query})=>[{_knn_clause(depth, ef_runtime)}]"
+    if Settings.debug_search:
+        LOGGER.info("search redis mode=%s query=%s", mode, query_expr)
+    start_query = time.perf_counter()
+    with timed_stage("knn"):
+        raw = await redis_client.execute_command(
             "FT.SEARCH",
             index_name,
             query_expr,
@@ -373,115 +1219,267 @@ async def search(
             vector_bytes,
             "SORTBY",
             "vector_score",
-            "RETURN",
+            "LIMIT",
             "0",
+            str(depth),
+            "RETURN",
+            "1",
+            "vector_score",
             "DIALECT",
             "2",
-        ]
-        needs_vector_score = True
-    start_query = time.perf_counter()
-    raw = await redis_client.execute_command(*args)
-    query_latency_ms += (time.perf_counter() - start_query) * 1000
+        )
+    query_latency_ms = (time.perf_counter() - start_query) * 1000
     if Settings.debug_search:
-        raw_count = 0
-        if raw:
-            try:
-                raw_count = int(raw[0])
-            except (TypeError, ValueError):
-                raw_count = 0
-        LOGGER.info("search redis raw_count=%s", raw_count)
-    doc_keys = _decode_doc_ids(raw)
-    if not doc_keys:
-        SEARCH_LATENCY_MS.observe(query_latency_ms)
-        return [], query_latency_ms
-    results: list[SearchResult] = []
-    doc_items: list[tuple[str, dict[str, object]]] = []
-    if doc_cache is None:
-        pipe = redis_client.pipeline()
-        for doc_key in doc_keys:
-            pipe.hgetall(doc_key)
-        raw_docs = await pipe.execute()
-        keep_bytes = {"embedding"} if needs_vector_score else None
-        for doc_key, raw_doc in zip(doc_keys, raw_docs):
-            if not raw_doc:
-                continue
-            mapping = _decode_hash(raw_doc, keep_bytes=keep_bytes)
-            doc_items.append((doc_key, mapping))
+        LOGGER.info("search redis raw_count=%s", _raw_count(raw))
+    if doc_cache is not None:
+        # Rescore against the cached (possibly int8) copies.
+        doc_items = [
+            (doc_key, doc_cache[doc_key])
+            for doc_key, _ in _decode_scored_ids(raw)
+            if doc_key in doc_cache
+        ]
+        scored = [
+            (doc_key, score)
+            for doc_key, _, score in _top_k_by_cosine(embedding, doc_items, depth)
+        ]
     else:
-        for doc_key in doc_keys:
-            mapping = doc_cache.get(doc_key)
-            if not mapping:
-                continue
-            doc_items.append((doc_key, mapping))
-    for doc_key, mapping in doc_items:
-        score = 0.0
-        if needs_vector_score and embedding is not None:
-            embedding_raw = mapping.get("embedding")
-            doc_vector = _bytes_to_vector(embedding_raw)
-            try:
-                doc_vector = normalize_embedding(doc_vector, Settings.embeddings_dim)
-            except ValueError:
-                continue
-            score = _cosine_similarity(embedding, doc_vector)
-        results.append(
-            _result_from_mapping(
-                mapping,
-                doc_key=doc_key,
-                query=query,
-                score=score,
-            )
-        )
-    if needs_vector_score:
-        results.sort(key=lambda item: item.score, reverse=True)
-        results = results[:limit]
-    SEARCH_LATENCY_MS.observe(query_latency_ms)
-    return results, query_latency_ms
+        scored = [
+            (doc_key, 1.0 - distance) for doc_key, distance in _decode_scored_ids(raw)
+        ]
+    return _Ranking(scored, {}, query_latency_ms)
+
+
+def _raw_count(raw: object) -> int:
+    if not raw:
+        return 0
+    try:
+        return int(raw[0])  # type: ignore[index]
+    except (TypeError, ValueError):
+        return 0
 
 
-async def _search_pylate(
+async def _rank_keyword(
     redis_client: redis.Redis,
+    index_name: str,
     query: str,
     limit: int,
     *,
-    doc_cache: dict[str, dict[str, object]] | None = None,
-) -> tuple[list[SearchResult], float]:
+    offset: int,
+    clause: str,
+) -> _Ranking:
+    """One page of keyword matches; deep pages use `LIMIT offset limit`."""
+    text_query = with_filters(_build_text_query(query), clause)
+    if text_query == "*":
+        # Never list the whole index: it holds passage hashes too.
+        return _Ranking([], {}, 0.0)
+    if Settings.debug_search:
+        LOGGER.info("search redis mode=keyword query=%s", text_query)
+    start_query = time.perf_counter()
+    with timed_stage("bm25"):
+        raw = await redis_client.execute_command(
+            "FT.SEARCH",
+            index_name,
+            text_query,
+            "LIMIT",
+            str(offset),
+            str(limit),
+            "RETURN",
+            "0",
+            "DIALECT",
+            "2",
+        )
+    query_latency_ms = (time.perf_counter() - start_query) * 1000
+    if Settings.debug_search:
+        LOGGER.info("search redis raw_count=%s", _raw_count(raw))
+    scored = [(doc_key, 0.0) for doc_key in _decode_doc_ids(raw)]
+    return _Ranking(scored, {}, query_latency_ms)
+
+
+async def _plaid_leg(
+    query: str, k: int, doc_prefix: str
+) -> tuple[list[tuple[str, float]], dict[str, str]]:
+    """
+    PLAID hits as (doc key, score) best first. With `PASSAGE_CHUNKING`, PLAID
+    holds `{doc_id}#p{n}` passages: more are fetched and max-sim aggregated
+    to docs, and each doc's best passage key is returned for its snippet.
+    """
+    chunked = Settings.passage_chunking
+    fetch = k * max(1, Settings.passage_knn_fanout) if chunked else k
     try:
-        start_query = time.perf_counter()
-        hits = pylate_retrieve(query, k=limit)
-        query_latency_ms = (time.perf_counter() - start_query) * 1000
+        hits = await pylate_retrieve(query, k=fetch)
     except ValueError as exc:
         if "index is empty" in str(exc).lower():
             if Settings.debug_search:
                 LOGGER.info("search pylate index empty")
-            return [], 0.0
+            return [], {}
         raise
-    results: list[SearchResult] = []
-    for hit in hits:
-        doc_id = str(hit.get("id", ""))
-        if not doc_id:
-            continue
-        doc_key = f"doc:{doc_id}"
-        mapping: dict[str, object] | None = None
-        if doc_cache is not None:
-            mapping = doc_cache.get(doc_key)
-        if mapping is None:
-            raw = await redis_client.hgetall(doc_key)
-            if not raw:
-                continue
-            mapping = _decode_hash(raw)
-        authors_raw = mapping.get("authors", "")
-        authors = [item.strip() for item in authors_raw.split(",") if item.strip()]
-        content = mapping.get("content", "")
-        results.append(
-            SearchResult(
-                doc_id=doc_id,
-                title=mapping.get("title", ""),
-                url=mapping.get("url", ""),
-                snippet=_make_snippet(content, query),
-                authors=authors,
-                company=mapping.get("company", ""),
-                published_at=mapping.get("published_at") or None,
-                score=float(hit.get("score", 0.0)),
-            )
+    if not chunked:
+        scored = [
+            (f"{doc_prefix}{hit['id']}", float(hit.get("score", 0.0)))
+            for hit in hits
+            if hit.get("id")
+        ]
+        return scored, {}
+    prefix = passage_prefix(doc_prefix)
+    ranked, best = max_by_doc(
+        (
+            f"{prefix}{hit['id']}",
+            f"{doc_prefix}{split_passage_id(str(hit['id']))[0]}",
+            float(hit.get("score", 0.0)),
+        )
+        for hit in hits
+        if hit.get("id")
+    )
+    return ranked[:k], best
+
+
+async def _filtered_plaid_leg(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    k: int,
+    doc_prefix: str,
+    clause: str,
+) -> tuple[list[tuple[str, float]], dict[str, str]]:
+    """
+    `_plaid_leg` restricted to docs matching `clause`. PLAID cannot filter,
+    so it over-fetches by `PASSAGE_KNN_FANOUT` and RediSearch checks the
+    hits against the clause (`INKEYS`).
+    """
+    if not clause:
+        return await _plaid_leg(query, k, doc_prefix)
+    fetch = k * max(1, Settings.passage_knn_fanout)
+    scored, passages = await _plaid_leg(query, fetch, doc_prefix)
+    allowed = await _matching_keys(
+        redis_client, index_name, [doc_key for doc_key, _ in scored], clause
+    )
+    scored = [item for item in scored if item[0] in allowed][:k]
+    return scored, {key: passages[key] for key, _ in scored if key in passages}
+
+
+async def _rank_pylate(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    depth: int,
+    *,
+    doc_prefix: str = "doc:",
+    clause: str = "",
+) -> _Ranking:
+    start_query = time.perf_counter()
+    scored, passages = await _timed_leg(
+        "plaid",
+        _filtered_plaid_leg(redis_client, index_name, query, depth, doc_prefix, clause),
+    )
+    return _Ranking(scored, passages, (time.perf_counter() - start_query) * 1000)
+
+
+async def _rank_pylate_hybrid(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    limit: int,
+    depth: int,
+    *,
+    doc_prefix: str = "doc:",
+    clause: str = "",
+) -> _Ranking:
+    """
+    Runs RediSearch BM25 and PLAID and fuses them like `_rank_hybrid`. The
+    legs run concurrently unless `PYLATE_HYBRID_EARLY_EXIT_SCORE` > 0: then
+    BM25 runs first and PLAID is skipped when BM25 alone returns `limit` hits
+    at or above it. A started PLAID query runs to completion in the batcher's
+    worker thread even if cancelled, so it only starts once BM25 fell short.
+    """
+    candidates = depth
+    text_query = with_filters(_build_text_query(query), clause)
+    start_query = time.perf_counter()
+    bm25_leg = _timed_leg(
+        "bm25", _bm25_leg(redis_client, index_name, text_query, candidates)
+    )
+
+    def plaid_leg() -> Awaitable[tuple[list[tuple[str, float]], dict[str, str]]]:
+        return _timed_leg(
+            "plaid",
+            _filtered_plaid_leg(
+                redis_client, index_name, query, candidates, doc_prefix, clause
+            ),
+        )
+
+    threshold = Settings.pylate_hybrid_early_exit_score
+    plaid: list[tuple[str, float]] = []
+    passages: dict[str, str] = {}
+    if threshold <= 0:
+        bm25, (plaid, passages) = await asyncio.gather(bm25_leg, plaid_leg())
+    else:
+        bm25 = await bm25_leg
+        if len(bm25) >= limit and bm25[limit - 1][1] >= threshold:
+            record_search_early_exit("plaid")
+        else:
+            plaid, passages = await plaid_leg()
+    query_latency_ms = (time.perf_counter() - start_query) * 1000
+    with timed_stage("fuse"):
+        top = max((score for _, score in plaid), default=0.0)
+        if top > 0:
+            plaid = [(doc_key, score / top) for doc_key, score in plaid]
+        fused = _fuse_hybrid(bm25, plaid)
+    if Settings.debug_search:
+        LOGGER.info(
+            "search pylate hybrid candidates bm25=%s plaid=%s fusion=%s",
+            len(bm25),
+            len(plaid),
+            Settings.hybrid_fusion,
+        )
+    return _Ranking(fused, passages, query_latency_ms)
+
+
+async def _rank_rerank(
+    redis_client: redis.Redis,
+    index_name: str,
+    query: str,
+    depth: int,
+    *,
+    doc_prefix: str = "doc:",
+    clause: str = "",
+) -> _Ranking:
+    """
+    Reranks the BM25 top `RERANK_CANDIDATES` with ColBERT MaxSim against the
+    stored doc token embeddings; the query is encoded while BM25 runs.
+    Candidates without stored tokens keep their BM25 order after the
+    reranked ones.
+    """
+    candidates = max(Settings.rerank_candidates, depth)
+    text_query = with_filters(_build_text_query(query), clause)
+    start_query = time.perf_counter()
+    encode_task = asyncio.create_task(
+        _timed_stage("embed", asyncio.to_thread(encode_query_tokens, query))
+    )
+    try:
+        bm25 = await _timed_leg(
+            "bm25", _bm25_leg(redis_client, index_name, text_query, candidates)
+        )
+        if not bm25:
+            return _Ranking([], {}, (time.perf_counter() - start_query) * 1000)
+        query_tokens = await encode_task
+    finally:
+        encode_task.cancel()
+    doc_ids = [doc_key[len(doc_prefix) :] for doc_key, _ in bm25]
+    reranked = await _timed_leg(
+        "rerank", asyncio.to_thread(rerank_with_tokens, query_tokens, doc_ids)
+    )
+    query_latency_ms = (time.perf_counter() - start_query) * 1000
+    scored = sorted(
+        ((f"{doc_prefix}{doc_id}", score) for doc_id, score in filter(None, reranked)),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    scored.extend(
+        (doc_key, 0.0) for (doc_key, _), hit in zip(bm25, reranked) if hit is None
+    )
+    if Settings.debug_search:
+        LOGGER.info(
+            "search rerank candidates=%s with_tokens=%s",
+            len(bm25),
+            sum(hit is not None for hit in reranked),
         )
-    return results, query_latency_ms
+    return _Ranking(scored, {}, query_latency_ms)
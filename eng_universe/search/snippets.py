@@ -0,0 +1,154 @@
+"""Index-time sentence offsets and term postings for bounded-cost snippets."""
+
+from __future__ import annotations
+
+import re
+import zlib
+from collections.abc import Iterable
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+_SENTENCE_END = re.compile(r"[.!?](?=\s)|\n\s*\n")
+_MAX_SENTENCES = 0xFFFF
+# sentences, tokens, postings
+_HEADER_WORDS = 3
+
+
+def term_hash(token: str) -> int:
+    return zlib.crc32(token.lower().encode("utf-8"))
+
+
+def query_term_hashes(query: str) -> list[int]:
+    """Distinct term hashes of `query`, in query order."""
+    return list(dict.fromkeys(term_hash(token) for token in _TOKEN.findall(query)))
+
+
+def _sentence_spans(content: str) -> Iterable[tuple[int, int]]:
+    start = 0
+    for match in _SENTENCE_END.finditer(content):
+        yield start, match.end()
+        start = match.end()
+    if start < len(content):
+        yield start, len(content)
+
+
+def build_snippet_index(content: str) -> bytes:
+    """
+    Packs, as little-endian arrays: the UTF-8 byte offset of every sentence
+    start (u32), the sorted distinct term hashes (u32), per-term posting
+    offsets (u32) and the sentence ids each term occurs in (u16). Sentences
+    past the first 65535 are not indexed.
+    """
+    starts: list[int] = []
+    postings: dict[int, list[int]] = {}
+    byte_offset = 0
+    char_offset = 0
+    for start, end in _sentence_spans(content):
+        if len(starts) >= _MAX_SENTENCES:
+            break
+        byte_offset += len(content[char_offset:start].encode("utf-8"))
+        char_offset = start
+        sentence = len(starts)
+        starts.append(byte_offset)
+        for token in _TOKEN.findall(content[start:end]):
+            ids = postings.setdefault(term_hash(token), [])
+            if not ids or ids[-1] != sentence:
+                ids.append(sentence)
+    hashes = sorted(postings)
+    offsets = np.zeros(len(hashes) + 1, dtype="<u4")
+    np.cumsum([len(postings[value]) for value in hashes], out=offsets[1:])
+    flat = [sentence for value in hashes for sentence in postings[value]]
+    return b"".join(
+        (
+            np.asarray([len(starts), len(hashes), len(flat)], dtype="<u4").tobytes(),
+            np.asarray(starts, dtype="<u4").tobytes(),
+            np.asarray(hashes, dtype="<u4").tobytes(),
+            offsets.tobytes(),
+            np.asarray(flat, dtype="<u2").tobytes(),
+        )
+    )
+
+
+def best_window_start(index: bytes | memoryview, hashes: Iterable[int]) -> int | None:
+    """
+    Byte offset of the sentence containing the most distinct query terms
+    (earliest on ties), or None when no term occurs. Costs a binary search per
+    term plus its postings, independent of document length.
+    """
+    if len(index) < 4 * _HEADER_WORDS:
+        return None
+    sentences, tokens, total = np.frombuffer(index, dtype="<u4", count=_HEADER_WORDS)
+    offset = 4 * _HEADER_WORDS
+    starts = np.frombuffer(index, dtype="<u4", count=int(sentences), offset=offset)
+    offset += 4 * int(sentences)
+    term_hashes = np.frombuffer(index, dtype="<u4", count=int(tokens), offset=offset)
+    offset += 4 * int(tokens)
+    posting_offsets = np.frombuffer(
+        index, dtype="<u4", count=int(tokens) + 1, offset=offset
+    )
+    offset += 4 * (int(tokens) + 1)
+    postings = np.frombuffer(index, dtype="<u2", count=int(total), offset=offset)
+    matched: list[np.ndarray] = []
+    for value in hashes:
+        position = int(np.searchsorted(term_hashes, value))
+        if position >= len(term_hashes) or term_hashes[position] != value:
+            continue
+        first, last = posting_offsets[position], posting_offsets[position + 1]
+        matched.append(postings[first:last])
+    if not matched:
+        return None
+    # Postings are distinct per term, so counts are distinct-term coverage;
+    # argmax keeps the earliest of equally covered sentences.
+    coverage = np.bincount(np.concatenate(matched))
+    return int(starts[int(np.argmax(coverage))])
+
+
+# Lua counterpart of `best_window_start`: returns the 0-based byte offset of
+# the best sentence, or nil. Inlined into hydration.
+LUA_BEST_WINDOW_START = """
+local function u32(s, pos)
+  local a, b, c, d = string.byte(s, pos, pos + 3)
+  return a + b * 256 + c * 65536 + d * 16777216
+end
+local function best_window_start(index, hashes)
+  if not index or #index < 12 or #hashes == 0 then
+    return nil
+  end
+  local sentences, tokens = u32(index, 1), u32(index, 5)
+  local hash_base = 13 + 4 * sentences
+  local offset_base = hash_base + 4 * tokens
+  local posting_base = offset_base + 4 * (tokens + 1)
+  local coverage, best, best_count = {}, nil, 0
+  for _, h in ipairs(hashes) do
+    local lo, hi = 0, tokens - 1
+    while lo <= hi do
+      local mid = math.floor((lo + hi) / 2)
+      local value = u32(index, hash_base + 4 * mid)
+      if value == h then
+        local first = u32(index, offset_base + 4 * mid)
+        local last = u32(index, offset_base + 4 * mid + 4)
+        for p = first, last - 1 do
+          local pos = posting_base + 2 * p
+          local low, high = string.byte(index, pos, pos + 1)
+          local s = low + high * 256
+          local count = (coverage[s] or 0) + 1
+          coverage[s] = count
+          if count > best_count or (count == best_count and s < best) then
+            best, best_count = s, count
+          end
+        end
+        break
+      elseif value < h then
+        lo = mid + 1
+      else
+        hi = mid - 1
+      end
+    end
+  end
+  if best == nil then
+    return nil
+  end
+  return u32(index, 13 + 4 * best)
+end
+"""
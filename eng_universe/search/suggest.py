@@ -0,0 +1,179 @@
+"""Typeahead suggestions from RediSearch suggestion dictionaries (FT.SUGADD)."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+import redis.asyncio as redis
+
+from eng_universe.config import Settings
+
+# Dictionaries in the order suggestions are returned.
+SUGGEST_KINDS = ("company", "topic", "title")
+
+
+@dataclass
+class Suggestion:
+    text: str
+    kind: str
+    score: float
+    url: str | None = None
+
+
+def suggest_key(kind: str) -> str:
+    return f"{Settings.suggest_key_prefix}{kind}"
+
+
+def _text(value: object) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+def _contributions_key() -> str:
+    return f"{Settings.suggest_key_prefix}docs"
+
+
+def _counts_key(kind: str) -> str:
+    return f"{Settings.suggest_key_prefix}counts:{kind}"
+
+
+def suggestion_terms(mapping: Mapping[str, object]) -> set[tuple[str, str]]:
+    """(kind, text) company and topic entries a doc hash mapping carries."""
+    terms: set[tuple[str, str]] = set()
+    company = _text(mapping.get("company") or "").strip()
+    if company:
+        terms.add(("company", company))
+    for topic in _text(mapping.get("topics") or "").split(","):
+        if topic.strip():
+            terms.add(("topic", topic.strip()))
+    return terms
+
+
+def _decode_terms(raw: object) -> set[tuple[str, str]]:
+    if not raw:
+        return set()
+    return {(kind, text) for kind, text in json.loads(_text(raw))}
+
+
+def queue_suggestions(
+    pipe: redis.client.Pipeline, docs: Iterable[Mapping[str, object]]
+) -> None:
+    """
+    Queues FT.SUGADD of doc titles, with their URL as payload; re-adding one
+    is a no-op. Company and topic weights go through
+    `update_suggestion_weights`.
+    """
+    for mapping in docs:
+        title = _text(mapping.get("title") or "").strip()
+        if title:
+            url = _text(mapping.get("url") or "")
+            pipe.execute_command(
+                "FT.SUGADD", suggest_key("title"), title, 1, "PAYLOAD", url
+            )
+
+
+async def update_suggestion_weights(
+    redis_client: redis.Redis, docs: Mapping[str, Mapping[str, object] | None]
+) -> None:
+    """
+    Keeps each company and topic weighted by the number of docs carrying it.
+    `docs` maps doc ids to their new hash mapping, or `None` once deleted.
+    What each doc contributed is kept by doc id in `suggest:docs`, outside
+    any index version, so rebuilds and rewrites only apply what changed.
+    Counts live in `suggest:counts:{kind}` and are written to the dictionary
+    as absolute scores; an entry no doc carries any more is deleted.
+    """
+    if not docs:
+        return
+    doc_ids = list(docs)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hmget(_contributions_key(), doc_ids)
+    (previous,) = await pipe.execute()
+    deltas: dict[tuple[str, str], int] = {}
+    pipe = redis_client.pipeline(transaction=False)
+    for doc_id, raw in zip(doc_ids, previous):
+        mapping = docs[doc_id]
+        old = _decode_terms(raw)
+        new = suggestion_terms(mapping) if mapping is not None else set()
+        for term in new - old:
+            deltas[term] = deltas.get(term, 0) + 1
+        for term in old - new:
+            deltas[term] = deltas.get(term, 0) - 1
+        if not new:
+            if old:
+                pipe.hdel(_contributions_key(), doc_id)
+        elif new != old:
+            pipe.hset(_contributions_key(), doc_id, json.dumps(sorted(new)))
+    terms = [term for term, delta in deltas.items() if delta]
+    for kind, text in terms:
+        pipe.hincrby(_counts_key(kind), text, deltas[(kind, text)])
+    replies = await pipe.execute()
+    if not terms:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    for (kind, text), count in zip(terms, replies[-len(terms) :]):
+        if int(count) > 0:
+            pipe.execute_command("FT.SUGADD", suggest_key(kind), text, int(count))
+        else:
+            pipe.execute_command("FT.SUGDEL", suggest_key(kind), text)
+            pipe.hdel(_counts_key(kind), text)
+    await pipe.execute()
+
+
+def queue_suggestion_removals(
+    pipe: redis.client.Pipeline, titles: Iterable[object]
+) -> None:
+    """
+    Drops the titles of deleted docs; their company and topic weights are
+    taken back by `update_suggestion_weights`.
+    """
+    for title in titles:
+        if title:
+            pipe.execute_command("FT.SUGDEL", suggest_key("title"), _text(title))
+
+
+def _decode_suggestions(kind: str, raw: object) -> list[Suggestion]:
+    """`FT.SUGGET ... WITHSCORES WITHPAYLOADS` replies are flat triples."""
+    if not isinstance(raw, (list, tuple)):
+        return []
+    suggestions: list[Suggestion] = []
+    for text, score, payload in zip(raw[::3], raw[1::3], raw[2::3]):
+        suggestions.append(
+            Suggestion(
+                text=_text(text),
+                kind=kind,
+                score=float(_text(score)),
+                url=_text(payload) if payload else None,
+            )
+        )
+    return suggestions
+
+
+async def suggest(
+    redis_client: redis.Redis, prefix: str, limit: int = 5, *, fuzzy: bool = False
+) -> list[Suggestion]:
+    """
+    Up to `limit` completions of `prefix` in all, read from every dictionary
+    in one pipelined round trip; companies first, then topics, then titles,
+    each best first.
+    """
+    prefix = " ".join(prefix.split())
+    if not prefix:
+        return []
+    pipe = redis_client.pipeline(transaction=False)
+    for kind in SUGGEST_KINDS:
+        args: list[object] = ["FT.SUGGET", suggest_key(kind), prefix]
+        if fuzzy:
+            args.append("FUZZY")
+        args.extend(["MAX", limit, "WITHSCORES", "WITHPAYLOADS"])
+        pipe.execute_command(*args)
+    replies = await pipe.execute()
+    suggestions = [
+        suggestion
+        for kind, raw in zip(SUGGEST_KINDS, replies)
+        for suggestion in _decode_suggestions(kind, raw)
+    ]
+    return suggestions[:limit]
@@ -0,0 +1,90 @@
+"""Per-request search stage timings, for Server-Timing and stage histograms."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from eng_universe.monitoring.metrics import record_search_stages
+
+
+@dataclass
+class StageTimings:
+    """
+    Milliseconds spent per stage of one request. Concurrent stages (the BM25
+    and KNN legs) overlap, so stages may add up to more than `total_ms`.
+    """
+
+    mode: str
+    cache: str = "miss"
+    stages: dict[str, float] = field(default_factory=dict)
+    total_ms: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    def add(self, stage: str, latency_ms: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + latency_ms
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value, e.g. `bm25;dur=3.1, ..., total;dur=9.8`."""
+        total_ms = self.total_ms or (time.perf_counter() - self.started) * 1000
+        entries = [f"{stage};dur={ms:.1f}" for stage, ms in self.stages.items()]
+        entries.append(f"total;dur={total_ms:.1f}")
+        entries.append(f'cache;desc="{self.cache}"')
+        return ", ".join(entries)
+
+
+_CURRENT: ContextVar[StageTimings | None] = ContextVar(
+    "search_stage_timings", default=None
+)
+
+
+@contextmanager
+def search_timings(mode: str) -> Iterator[StageTimings]:
+    """
+    Collects the stages timed while the block runs, including in tasks it
+    starts. A nested block joins the outer one; the outermost records the
+    stage histograms when it exits.
+    """
+    timings = _CURRENT.get()
+    if timings is not None:
+        yield timings
+        return
+    timings = StageTimings(mode)
+    token = _CURRENT.set(timings)
+    try:
+        yield timings
+    finally:
+        _CURRENT.reset(token)
+        timings.total_ms = (time.perf_counter() - timings.started) * 1000
+        record_search_stages(
+            timings.mode, timings.cache, timings.stages, timings.total_ms
+        )
+
+
+def mark_search(*, mode: str | None = None, cache: str | None = None) -> None:
+    """Updates the effective mode or cache status of the current request."""
+    timings = _CURRENT.get()
+    if timings is None:
+        return
+    if mode is not None:
+        timings.mode = mode
+    if cache is not None:
+        timings.cache = cache
+
+
+def add_stage(stage: str, latency_ms: float) -> None:
+    timings = _CURRENT.get()
+    if timings is not None:
+        timings.add(stage, latency_ms)
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_stage(stage, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,307 @@
+"""Append-only, memory-mapped store of ColBERT document token embeddings."""
+
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+import struct
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+from eng_universe.config import Settings
+from eng_universe.monitoring.logging_utils import get_event_logger
+from eng_universe.search.pylate_backend import encode_documents, encode_queries
+
+log_event = get_event_logger("token_store")
+
+TOKEN_STORE_MAGIC = b"EUTOKS1\n"
+# magic, token dim, reserved
+_HEADER = struct.Struct("<8sII")
+# doc id length in bytes, token rows
+_RECORD = struct.Struct("<II")
+_ALIGN = 8
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _pack_record(doc_id: str, rows: int, body: bytes) -> bytes:
+    encoded = doc_id.encode()
+    head = _RECORD.pack(len(encoded), rows) + encoded
+    return head.ljust(_align(len(head)), b"\0") + body.ljust(_align(len(body)), b"\0")
+
+
+def _inode(path: Path) -> int | None:
+    try:
+        return path.stat().st_ino
+    except FileNotFoundError:
+        return None
+
+
+def _as_tokens(embedding: Any) -> np.ndarray:
+    if hasattr(embedding, "detach"):
+        embedding = embedding.detach().cpu().numpy()
+    return np.asarray(embedding, dtype=np.float16)
+
+
+class TokenStoreWriter:
+    """
+    Appends (doc id, float16 token matrix) records to the store file. Each
+    batch is one `write` under an exclusive `flock`, so concurrent indexer
+    processes never interleave records. A re-indexed doc gets a new record;
+    readers keep the latest one until `compact_token_store` drops the others.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, doc_ids: Sequence[str], embeddings: Sequence[Any]) -> int:
+        if len(doc_ids) != len(embeddings):
+            raise ValueError("doc_ids and embeddings must be the same length")
+        if not doc_ids:
+            return 0
+        matrices = [_as_tokens(embedding) for embedding in embeddings]
+        dim = matrices[0].shape[1]
+        chunks: list[bytes] = []
+        for doc_id, matrix in zip(doc_ids, matrices):
+            if matrix.ndim != 2 or matrix.shape[1] != dim:
+                raise ValueError(f"Unexpected token matrix shape {matrix.shape}")
+            body = np.ascontiguousarray(matrix, dtype="<f2").tobytes()
+            chunks.append(_pack_record(doc_id, matrix.shape[0], body))
+        payload = b"".join(chunks)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            while not self._append_locked(payload, dim):
+                pass
+        return len(doc_ids)
+
+    def _append_locked(self, payload: bytes, dim: int) -> bool:
+        """False when a compaction replaced the file before the lock was held."""
+        with open(self._path, "ab") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                if os.fstat(handle.fileno()).st_ino != _inode(self._path):
+                    return False
+                if handle.seek(0, os.SEEK_END) == 0:
+                    handle.write(_HEADER.pack(TOKEN_STORE_MAGIC, dim, 0))
+                else:
+                    self._check_dim(dim)
+                handle.write(payload)
+                handle.flush()
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+        return True
+
+    def _check_dim(self, dim: int) -> None:
+        with open(self._path, "rb") as handle:
+            magic, stored_dim, _ = _HEADER.unpack(handle.read(_HEADER.size))
+        if magic != TOKEN_STORE_MAGIC or stored_dim != dim:
+            raise ValueError(
+                f"{self._path} holds dim={stored_dim} tokens, got dim={dim}; "
+                "delete it and reindex after changing the ColBERT model"
+            )
+
+
+class TokenStore:
+    """
+    Read side of the store: maps the file and keeps a doc id -> (offset, rows)
+    directory. Records appended after the last scan are picked up on the next
+    lookup that misses, so a running API sees newly indexed docs; a file
+    replaced by compaction is mapped and scanned afresh.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._buffer: mmap.mmap | None = None
+        self._inode: int | None = None
+        self._dim = 0
+        self._scanned = _HEADER.size
+        self._directory: dict[str, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._directory)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer) if self._buffer is not None else 0
+
+    def _remap(self) -> None:
+        try:
+            stat = self._path.stat()
+        except FileNotFoundError:
+            return
+        if self._buffer is not None and stat.st_ino != self._inode:
+            # Compacted: views handed out keep the old mapping alive.
+            self._buffer = None
+            self._scanned = _HEADER.size
+            self._directory = {}
+        if stat.st_size < _HEADER.size or (
+            self._buffer is not None and stat.st_size <= len(self._buffer)
+        ):
+            return
+        with open(self._path, "rb") as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            inode = os.fstat(handle.fileno()).st_ino
+        magic, dim, _ = _HEADER.unpack_from(buffer, 0)
+        if magic != TOKEN_STORE_MAGIC:
+            buffer.close()
+            raise ValueError(f"{self._path} is not a token store")
+        self._buffer, self._dim, self._inode = buffer, dim, inode
+
+    def _scan(self) -> None:
+        """Indexes every complete record past the last scanned offset."""
+        self._remap()
+        buffer = self._buffer
+        if buffer is None:
+            return
+        offset = self._scanned
+        row_bytes = self._dim * 2
+        while offset + _RECORD.size <= len(buffer):
+            id_len, rows = _RECORD.unpack_from(buffer, offset)
+            body = _align(offset + _RECORD.size + id_len)
+            end = _align(body + rows * row_bytes)
+            if end > len(buffer):
+                break
+            doc_id = buffer[offset + _RECORD.size : offset + _RECORD.size + id_len]
+            self._directory[doc_id.decode()] = (body, rows)
+            offset = end
+        self._scanned = offset
+
+    def lookup(self, doc_ids: Sequence[str]) -> list[np.ndarray | None]:
+        """Zero-copy float16 (rows, dim) views, `None` for unknown docs."""
+        with self._lock:
+            if any(doc_id not in self._directory for doc_id in doc_ids):
+                self._scan()
+            buffer = self._buffer
+            found: list[np.ndarray | None] = []
+            for doc_id in doc_ids:
+                entry = self._directory.get(doc_id)
+                if entry is None or buffer is None:
+                    found.append(None)
+                    continue
+                offset, rows = entry
+                found.append(
+                    np.frombuffer(
+                        buffer, dtype="<f2", count=rows * self._dim, offset=offset
+                    ).reshape(rows, self._dim)
+                )
+            return found
+
+
+def compact_token_store(path: str | Path | None = None) -> tuple[int, int]:
+    """
+    Rewrites the store with only the latest record of each doc and swaps it in
+    atomically, holding the writers' lock throughout. Re-indexing appends a
+    new record per doc, so the file otherwise only grows. Returns (records
+    kept, bytes reclaimed).
+    """
+    path = Path(path or Settings.colbert_token_store_path)
+    if not path.exists():
+        return 0, 0
+    with open(path, "rb") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            store = TokenStore(path)
+            store._scan()
+            buffer = store._buffer
+            if buffer is None:
+                return 0, 0
+            row_bytes = store._dim * 2
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as out:
+                out.write(_HEADER.pack(TOKEN_STORE_MAGIC, store._dim, 0))
+                entries = sorted(store._directory.items(), key=lambda item: item[1])
+                for doc_id, (offset, rows) in entries:
+                    body = buffer[offset : offset + rows * row_bytes]
+                    out.write(_pack_record(doc_id, rows, body))
+                size = out.tell()
+            reclaimed = len(buffer) - size
+            os.replace(tmp_path, path)
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+    log_event("compact", docs=len(entries), reclaimed_bytes=reclaimed, path=str(path))
+    return len(entries), reclaimed
+
+
+def maxsim_scores(
+    query_tokens: np.ndarray, doc_tokens: Sequence[np.ndarray]
+) -> np.ndarray:
+    """
+    ColBERT late-interaction score per doc: for every query token, the best
+    dot product against the doc's tokens, summed. All candidates are scored
+    with one matrix product over their concatenated tokens.
+    """
+    scores = np.zeros(len(doc_tokens), dtype=np.float32)
+    kept = [i for i, tokens in enumerate(doc_tokens) if len(tokens)]
+    if not kept or not len(query_tokens):
+        return scores
+    matrix = np.concatenate([doc_tokens[i] for i in kept]).astype(np.float32)
+    similarities = matrix @ np.asarray(query_tokens, dtype=np.float32).T
+    starts = np.cumsum([0] + [len(doc_tokens[i]) for i in kept[:-1]])
+    best = np.maximum.reduceat(similarities, starts, axis=0)
+    scores[kept] = best.sum(axis=1)
+    return scores
+
+
+def token_store_enabled() -> bool:
+    provider_name = Settings.embeddings_provider.lower()
+    return not Settings.keyword_only and (
+        Settings.colbert_token_store or provider_name in {"pylate", "colbert"}
+    )
+
+
+@lru_cache(maxsize=1)
+def get_token_store_writer() -> TokenStoreWriter:
+    return TokenStoreWriter(Settings.colbert_token_store_path)
+
+
+@lru_cache(maxsize=1)
+def get_token_store() -> TokenStore:
+    return TokenStore(Settings.colbert_token_store_path)
+
+
+def store_document_tokens(doc_ids: Sequence[str], documents: Sequence[str]) -> int:
+    """
+    Encodes documents with the ColBERT model and appends their token
+    embeddings. Encodings go through the embedding cache, so a later PLAID
+    flush of the same docs does not run the model again.
+    """
+    if not doc_ids:
+        return 0
+    written = get_token_store_writer().append(doc_ids, encode_documents(documents))
+    log_event("append", docs=written, path=Settings.colbert_token_store_path)
+    return written
+
+
+def encode_query_tokens(query: str) -> np.ndarray:
+    """ColBERT query token embeddings as float32. Blocking: call off the loop."""
+    (query_tokens,) = encode_queries([query])
+    if hasattr(query_tokens, "detach"):
+        query_tokens = query_tokens.detach().cpu().numpy()
+    return np.asarray(query_tokens, dtype=np.float32)
+
+
+def rerank_with_tokens(
+    query_tokens: np.ndarray, doc_ids: Sequence[str]
+) -> list[tuple[str, float] | None]:
+    """
+    MaxSim scores for `doc_ids`, aligned with the input; `None` marks docs
+    with no stored tokens.
+    """
+    stored = get_token_store().lookup(doc_ids)
+    present = [i for i, tokens in enumerate(stored) if tokens is not None]
+    scored: list[tuple[str, float] | None] = [None] * len(doc_ids)
+    if not present:
+        return scored
+    scores = maxsim_scores(query_tokens, [stored[i] for i in present])  # type: ignore
+    for i, score in zip(present, scores):
+        scored[i] = (doc_ids[i], float(score))
+    return scored
@@ -0,0 +1,90 @@
+"""Vector (de)serialization for RediSearch blobs and int8 rescoring copies."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from eng_universe.config import Settings
+
+VECTOR_TYPES = {"FLOAT32", "FLOAT16", "BFLOAT16"}
+_ITEM_SIZE = {"FLOAT32": 4, "FLOAT16": 2, "BFLOAT16": 2}
+
+
+def vector_type() -> str:
+    value = Settings.embeddings_vector_type.upper()
+    if value not in VECTOR_TYPES:
+        raise ValueError(f"Unsupported EMBEDDINGS_VECTOR_TYPE: {value}")
+    return value
+
+
+def _to_bfloat16_bits(array: np.ndarray) -> np.ndarray:
+    bits = array.astype("<f4").view("<u4")
+    # Round to nearest even on the 16 bits that are dropped.
+    rounding = ((bits >> 16) & 1) + 0x7FFF
+    return ((bits + rounding) >> 16).astype("<u2")
+
+
+def vector_to_bytes(
+    vector: Sequence[float] | np.ndarray, dtype: str | None = None
+) -> bytes:
+    dtype = dtype or vector_type()
+    array = np.asarray(vector, dtype=np.float32)
+    if dtype == "FLOAT32":
+        return array.astype("<f4").tobytes()
+    if dtype == "FLOAT16":
+        return array.astype("<f2").tobytes()
+    return _to_bfloat16_bits(array).tobytes()
+
+
+def bytes_to_array(raw: object, dtype: str | None = None) -> np.ndarray:
+    """Decodes a vector blob to float32; returns an empty array when malformed."""
+    if not isinstance(raw, (bytes, bytearray, memoryview)) or not raw:
+        return np.zeros(0, dtype=np.float32)
+    dtype = dtype or vector_type()
+    if len(raw) % _ITEM_SIZE[dtype] != 0:
+        return np.zeros(0, dtype=np.float32)
+    if dtype == "FLOAT32":
+        return np.frombuffer(raw, dtype="<f4")
+    if dtype == "FLOAT16":
+        return np.frombuffer(raw, dtype="<f2").astype(np.float32)
+    bits = np.frombuffer(raw, dtype="<u2").astype("<u4") << 16
+    return bits.view("<f4")
+
+
+def quantize_int8(vector: Sequence[float] | np.ndarray) -> tuple[bytes, float]:
+    """Symmetric per-vector int8 quantization; returns (codes, scale)."""
+    array = np.asarray(vector, dtype=np.float32)
+    peak = float(np.abs(array).max()) if array.size else 0.0
+    scale = peak / 127.0 if peak else 1.0
+    codes = np.clip(np.rint(array / scale), -127, 127).astype(np.int8)
+    return codes.tobytes(), scale
+
+
+def unit_vector(
+    raw: object, codes: object, dim: int
+) -> tuple[np.ndarray, float] | None:
+    """
+    Returns (vector, scale) with `vector * scale` unit-norm, preferring the int8
+    `codes` copy (kept as int8; the quantization scale cancels under cosine)
+    over the `raw` blob. None when neither holds a usable `dim`-vector.
+    """
+    if isinstance(codes, (bytes, bytearray)) and codes:
+        vector = np.frombuffer(codes, dtype=np.int8)[:dim]
+    else:
+        vector = bytes_to_array(raw)[:dim]
+    if vector.size < dim:
+        return None
+    norm = float(np.linalg.norm(vector.astype(np.float32)))
+    if norm == 0:
+        return None
+    if vector.dtype == np.int8:
+        return vector, 1.0 / norm
+    return (vector / norm).astype(np.float32), 1.0
+
+
+def dequantize_int8(raw: object, scale: float) -> np.ndarray:
+    if not isinstance(raw, (bytes, bytearray, memoryview)) or not raw:
+        return np.zeros(0, dtype=np.float32)
+    return np.frombuffer(raw, dtype=np.int8).astype(np.float32) * scale
@@ -6,7 +6,18 @@ from eng_universe.ingest.crawler import run_crawlers, seed_queue
 from eng_universe.index.indexer import create_search_index
 from eng_universe.monitoring.logging_utils import get_event_logger
 from eng_universe.monitoring.metrics_server import run_metrics_server
-from eng_universe.index.pipeline import index_worker
+from eng_universe.index.pipeline import (
+    build_index_version,
+    delete_orphan_documents,
+    index_worker,
+    requeue_crawl_docs,
+)
+from eng_universe.index.versions import (
+    drop_version,
+    live_index_target,
+    promote_version,
+    rollback_version,
+)
 
 
 log_event = get_event_logger("main")
@@ -32,7 +43,40 @@ def main() -> None:
     )
     sub.add_parser("index", help="Run indexer workers")
     sub.add_parser("init-index", help="Initialize search index")
-    sub.add_parser("reindex", help="Initialize search index and run indexer")
+    reindex_parser = sub.add_parser(
+        "reindex", help="Initialize search index and run indexer"
+    )
+    reindex_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Requeue every crawl doc, skip docs whose content and index version "
+            "are unchanged, keep the PLAID index, and delete orphaned docs"
+        ),
+    )
+    build_parser = sub.add_parser(
+        "index-build",
+        help="Build a new index version in the background and switch the alias",
+    )
+    build_parser.add_argument(
+        "--no-promote",
+        action="store_true",
+        help="Build the new version without switching the alias to it",
+    )
+    promote_parser = sub.add_parser(
+        "index-promote", help="Point the search alias at an index version"
+    )
+    promote_parser.add_argument("version", type=int)
+    sub.add_parser(
+        "index-rollback", help="Point the search alias back at the previous version"
+    )
+    drop_parser = sub.add_parser("index-drop", help="Drop an unused index version")
+    drop_parser.add_argument("version", type=int)
+    drop_parser.add_argument(
+        "--delete-docs",
+        action="store_true",
+        help="Also delete the version's doc hashes (FT.DROPINDEX ... DD)",
+    )
     sub.add_parser("metrics", help="Run Prometheus metrics server")
 
     args = parser.parse_args()
@@ -55,19 +99,60 @@ def main() -> None:
     if args.command == "init-index":
         import redis.asyncio as redis
 
-        redis_client = redis.from_url(Settings.redis_url)
-        asyncio.run(create_search_index(redis_client, "idx:blogs"))
+        async def _init_index() -> None:
+            redis_client = redis.from_url(Settings.redis_url)
+            index_name, doc_prefix = await live_index_target(redis_client)
+            await create_search_index(redis_client, index_name, doc_prefix=doc_prefix)
+
+        asyncio.run(_init_index())
         return
     if args.command == "reindex":
         import redis.asyncio as redis
 
         async def _reindex() -> None:
             redis_client = redis.from_url(Settings.redis_url)
-            await create_search_index(redis_client, "idx:blogs")
-            await index_worker()
+            index_name, doc_prefix = await live_index_target(redis_client)
+            if not args.incremental:
+                await create_search_index(
+                    redis_client, index_name, doc_prefix=doc_prefix
+                )
+                await index_worker()
+                return
+            await create_search_index(
+                redis_client,
+                index_name,
+                override_plaid=False,
+                doc_prefix=doc_prefix,
+            )
+            requeued = await requeue_crawl_docs(redis_client)
+            log_event("cmd:reindex", mode="incremental", requeued=requeued)
+            await index_worker(incremental=True)
+            await delete_orphan_documents(redis_client)
 
         asyncio.run(_reindex())
         return
+    if args.command in {"index-build", "index-promote", "index-rollback", "index-drop"}:
+        import redis.asyncio as redis
+
+        async def _versions() -> None:
+            redis_client = redis.from_url(Settings.redis_url)
+            if args.command == "index-build":
+                version = await build_index_version(
+                    redis_client, promote=not args.no_promote
+                )
+                log_event("cmd:index-build", version=version)
+            elif args.command == "index-promote":
+                await promote_version(redis_client, args.version)
+            elif args.command == "index-rollback":
+                version = await rollback_version(redis_client)
+                log_event("cmd:index-rollback", version=version)
+            else:
+                await drop_version(
+                    redis_client, args.version, delete_docs=args.delete_docs
+                )
+
+        asyncio.run(_versions())
+        return
     if args.command == "metrics":
         run_metrics_server()
         return
@@ -0,0 +1,83 @@
+import argparse
+import math
+from pathlib import Path
+import struct
+import sys
+import time
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from eng_universe.config import Settings
+from eng_universe.search.search import _attach_unit_vector, _top_k_by_cosine
+from eng_universe.search.vectors import vector_to_bytes
+
+
+def _baseline_top_k(
+    query: list[float], doc_items: list[tuple[str, dict[str, object]]], k: int
+) -> list[tuple[str, float]]:
+    """The per-request loop search() used before rescoring moved to NumPy."""
+    scored: list[tuple[str, float]] = []
+    for doc_key, mapping in doc_items:
+        raw = mapping["embedding"]
+        vector = list(struct.unpack(f"{len(raw) // 4}f", raw))  # type: ignore
+        vector = vector[: len(query)]
+        dot = sum(a * b for a, b in zip(query, vector))
+        left = math.sqrt(sum(a * a for a in query))
+        right = math.sqrt(sum(b * b for b in vector))
+        scored.append((doc_key, dot / (left * right) if left * right else 0.0))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:k]
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return p50, p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare pure-Python and NumPy hybrid rescoring latency."
+    )
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    dim = Settings.embeddings_dim
+    rng = np.random.default_rng(0)
+    docs = rng.standard_normal((args.candidates, dim)).astype(np.float32)
+    raw_items = [
+        (f"doc:{i}", {"embedding": vector_to_bytes(row, "FLOAT32")})
+        for i, row in enumerate(docs)
+    ]
+    cached_items = [(key, dict(mapping)) for key, mapping in raw_items]
+    for _, mapping in cached_items:
+        _attach_unit_vector(mapping)
+
+    timings: dict[str, list[float]] = {"python": [], "numpy": []}
+    for _ in range(args.iterations):
+        query = rng.standard_normal(dim).astype(np.float32).tolist()
+        start = time.perf_counter()
+        expected = _baseline_top_k(query, raw_items, args.k)
+        timings["python"].append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        actual = _top_k_by_cosine(query, cached_items, args.k)
+        timings["numpy"].append((time.perf_counter() - start) * 1000)
+        assert [key for key, _ in expected] == [key for key, _, _ in actual]
+
+    print(f"candidates={args.candidates} dim={dim} k={args.k}")
+    print(f"{'rescoring':<10} {'p50_ms':>8} {'p99_ms':>8}")
+    for name, samples in timings.items():
+        p50, p99 = _percentiles(samples)
+        print(f"{name:<10} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+from pathlib import Path
+import sys
+import time
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from eng_universe.search.search import _make_snippet, _snippet_from_window
+from eng_universe.search.snippets import (
+    best_window_start,
+    build_snippet_index,
+    query_term_hashes,
+)
+
+WORDS = (
+    "redis stream consumer group latency index shard replica cache eviction "
+    "vector search ranking query planner storage engine compaction write path "
+    "read path kafka partition offset commit schema migration rollout canary"
+).split()
+
+
+def _long_post(rng: np.random.Generator, words: int) -> str:
+    sentences: list[str] = []
+    written = 0
+    while written < words:
+        length = int(rng.integers(8, 30))
+        picked = rng.choice(WORDS, size=length)
+        sentences.append(" ".join(picked).capitalize() + ".")
+        written += length
+    return " ".join(sentences)
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return p50, p99
+
+
+def _indexed_snippet(content: bytes, index: bytes, query: str, window: int) -> str:
+    start = best_window_start(index, query_term_hashes(query)) or 0
+    return _snippet_from_window(
+        content[start : start + window], query, offset=start, size=len(content)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare full-scan and indexed snippet generation latency."
+    )
+    parser.add_argument("--words", type=int, default=10000)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--window", type=int, default=600)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    posts = [_long_post(rng, args.words) for _ in range(args.docs)]
+    encoded = [post.encode("utf-8") for post in posts]
+    start = time.perf_counter()
+    indexes = [build_snippet_index(post) for post in posts]
+    build_ms = (time.perf_counter() - start) * 1000 / len(posts)
+
+    timings: dict[str, list[float]] = {"full_scan": [], "indexed": []}
+    for i in range(args.iterations):
+        doc = i % len(posts)
+        query = " ".join(rng.choice(WORDS, size=int(rng.integers(1, 4))))
+        start = time.perf_counter()
+        _make_snippet(posts[doc], query)
+        timings["full_scan"].append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        _indexed_snippet(encoded[doc], indexes[doc], query, args.window)
+        timings["indexed"].append((time.perf_counter() - start) * 1000)
+
+    index_kb = sum(len(index) for index in indexes) / len(indexes) / 1024
+    post_kb = sum(len(post) for post in encoded) / len(encoded) / 1024
+    print(
+        f"words={args.words} post_kb={post_kb:.1f} index_kb={index_kb:.1f} "
+        f"build_ms={build_ms:.2f}"
+    )
+    print(f"{'snippets':<10} {'p50_ms':>8} {'p99_ms':>8}")
+    for name, samples in timings.items():
+        p50, p99 = _percentiles(samples)
+        print(f"{name:<10} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
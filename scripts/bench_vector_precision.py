@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import redis.asyncio as redis
+
+from eng_universe.config import Settings
+from eng_universe.index.versions import get_live_doc_prefix
+from eng_universe.search.vectors import (
+    bytes_to_array,
+    dequantize_int8,
+    quantize_int8,
+    vector_to_bytes,
+)
+
+
+async def _load_embeddings(limit: int) -> np.ndarray:
+    redis_client = redis.from_url(Settings.redis_url)
+    prefix = await get_live_doc_prefix(redis_client)
+    rows: list[np.ndarray] = []
+    async for key in redis_client.scan_iter(match=f"{prefix}*", count=1000):
+        raw = await redis_client.hget(key, "embedding")
+        vector = bytes_to_array(raw)
+        if vector.size:
+            rows.append(vector[: Settings.embeddings_dim])
+        if len(rows) >= limit:
+            break
+    await redis_client.close()
+    return np.vstack(rows) if rows else np.zeros((0, Settings.embeddings_dim))
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(docs: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ docs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def _recall(expected: np.ndarray, actual: np.ndarray) -> float:
+    hits = sum(len(set(a) & set(b)) for a, b in zip(expected, actual))
+    return hits / expected.size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure recall@k of compact vector encodings against FLOAT32 "
+            "brute force, using indexed embeddings or synthetic data."
+        )
+    )
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument(
+        "--synthetic", action="store_true", help="Use random vectors, not Redis."
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.synthetic:
+        docs = rng.standard_normal((args.docs, Settings.embeddings_dim))
+    else:
+        docs = asyncio.run(_load_embeddings(args.docs))
+    if len(docs) <= args.k:
+        print("Not enough embeddings; index docs first or pass --synthetic.")
+        return
+    docs = _normalize(docs.astype(np.float32))
+    picks = rng.choice(len(docs), size=min(args.queries, len(docs)), replace=False)
+    noise = 0.05 * rng.standard_normal((len(picks), docs.shape[1]))
+    queries = _normalize((docs[picks] + noise).astype(np.float32))
+    expected = _top_k(docs, queries, args.k)
+
+    print(f"docs={len(docs)} queries={len(queries)} dim={docs.shape[1]} k={args.k}")
+    print(f"{'encoding':<10} {'bytes/vec':>9} {'recall@k':>9}")
+    for dtype in ("FLOAT32", "FLOAT16", "BFLOAT16"):
+        decoded = np.vstack(
+            [bytes_to_array(vector_to_bytes(row, dtype), dtype) for row in docs]
+        )
+        recall = _recall(expected, _top_k(decoded, queries, args.k))
+        size = len(vector_to_bytes(docs[0], dtype))
+        print(f"{dtype:<10} {size:>9} {recall:>9.4f}")
+    quantized = [quantize_int8(row) for row in docs]
+    decoded = np.vstack([dequantize_int8(codes, scale) for codes, scale in quantized])
+    recall = _recall(expected, _top_k(decoded, queries, args.k))
+    print(f"{'INT8':<10} {len(quantized[0][0]) + 4:>9} {recall:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ if str(ROOT) not in sys.path:
 import redis.asyncio as redis
 
 from eng_universe.config import Settings
+from eng_universe.index.versions import doc_prefix, get_live_version
 
 
 def _decode(value: object) -> str:
@@ -34,7 +35,9 @@ async def _count_keys(redis_client: redis.Redis, pattern: str) -> int:
 
 async def main() -> None:
     redis_client = redis.from_url(Settings.redis_url)
-    index_name = "idx:blogs"
+    index_name = Settings.search_index_name
+    live_version = await get_live_version(redis_client)
+    live_prefix = doc_prefix(live_version)
     index_exists = False
     index_docs: str | None = None
 
@@ -47,14 +50,16 @@ async def main() -> None:
         if "Unknown Index name" not in str(exc):
             raise
 
-    doc_keys = await _count_keys(redis_client, "doc:*")
+    doc_keys = await _count_keys(redis_client, f"{live_prefix}*")
     crawl_keys = await _count_keys(redis_client, f"{Settings.crawl_doc_key_prefix}*")
     raw_queue_len = await redis_client.llen(Settings.raw_queue_key)
 
     print(f"index: {'present' if index_exists else 'missing'} ({index_name})")
     if index_docs is not None:
         print(f"index docs: {index_docs}")
-    print(f"doc:* keys: {doc_keys}")
+    if live_version is not None:
+        print(f"live version: v{live_version}")
+    print(f"{live_prefix}* keys: {doc_keys}")
     print(f"crawl docs: {crawl_keys}")
     print(f"raw queue: {raw_queue_len}")
 
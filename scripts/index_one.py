@@ -13,6 +13,8 @@ if str(ROOT) not in sys.path:
 from eng_universe.config import Settings
 from eng_universe.ingest.etl import parse_html
 from eng_universe.index.indexer import index_document
+from eng_universe.index.versions import get_live_doc_prefix
+from eng_universe.search.pylate_backend import flush_plaid_buffer
 from eng_universe.storage.r2 import download_text, r2_enabled
 
 
@@ -61,8 +63,10 @@ async def main() -> None:
         cleaned_parsed = parse_html(url, cleaned_html)
         parsed = replace(parsed, content=cleaned_parsed.content)
 
-    await index_document(redis_client, parsed, source=source)
-    print(f"Indexed {args.doc_id} -> doc:{parsed.url}")
+    live_prefix = await get_live_doc_prefix(redis_client)
+    await index_document(redis_client, parsed, source=source, doc_prefix=live_prefix)
+    flush_plaid_buffer()
+    print(f"Indexed {args.doc_id} -> {live_prefix}{parsed.url}")
 
 
 if __name__ == "__main__":
@@ -11,6 +11,7 @@ if str(ROOT) not in sys.path:
 import redis.asyncio as redis
 
 from eng_universe.config import Settings
+from eng_universe.index.pipeline import requeue_crawl_docs
 
 
 async def main() -> None:
@@ -34,29 +35,8 @@ async def main() -> None:
     if args.clear:
         await redis_client.delete(Settings.raw_queue_key)
 
-    prefix = Settings.crawl_doc_key_prefix
-    queue_key = Settings.raw_queue_key
-    batch: list[str] = []
-    total = 0
-
-    async for key in redis_client.scan_iter(match=f"{prefix}*", count=1000):
-        key_str = key.decode() if isinstance(key, (bytes, bytearray)) else str(key)
-        if not key_str.startswith(prefix):
-            continue
-        doc_id = key_str[len(prefix) :]
-        if not doc_id:
-            continue
-        batch.append(doc_id)
-        if len(batch) >= args.batch:
-            await redis_client.rpush(queue_key, *batch)
-            total += len(batch)
-            batch.clear()
-
-    if batch:
-        await redis_client.rpush(queue_key, *batch)
-        total += len(batch)
-
-    print(f"Requeued {total} docs into {queue_key}.")
+    total = await requeue_crawl_docs(redis_client, batch_size=args.batch)
+    print(f"Requeued {total} docs into {Settings.raw_queue_key}.")
 
 
 if __name__ == "__main__":
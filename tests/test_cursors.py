@@ -0,0 +1,63 @@
+import base64
+import json
+
+import pytest
+
+from eng_universe.search.cursors import PageCursor, decode_cursor, encode_cursor
+
+
+def _token(**fields) -> str:
+    payload = {"query": "kafka", "mode": "hybrid", "limit": 10, "offset": 10}
+    payload.update(fields)
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_round_trip():
+    cursor = PageCursor(
+        query="kafka",
+        mode="semantic",
+        limit=10,
+        offset=20,
+        filters={"company": ["Stripe"], "published_after": 1672531200},
+        ef_runtime=64,
+    )
+    token = encode_cursor(cursor)
+    assert "=" not in token
+    assert decode_cursor(token) == cursor
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"ef_runtime": "10] @title:(secret"},
+        {"ef_runtime": 0},
+        {"ef_runtime": 4097},
+        {"ef_runtime": True},
+        {"mode": "hybrid) | @x:(y"},
+        {"mode": "KEYWORD"},
+        {"limit": 0},
+        {"limit": "10"},
+        {"offset": -10},
+        {"query": ["kafka"]},
+        {"filters": {"company": "Stripe"}},
+        {"filters": {"company": [1]}},
+        {"filters": {"published_after": "0] @x:[0"}},
+        {"filters": {"unknown": ["x"]}},
+        {"filters": []},
+        {"extra": 1},
+    ],
+)
+def test_rejects_tampered_fields(fields):
+    with pytest.raises(ValueError):
+        decode_cursor(_token(**fields))
+
+
+@pytest.mark.parametrize("token", ["", "not base64!", "bnVsbA", "W10"])
+def test_rejects_garbage(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_accepts_bounds():
+    assert decode_cursor(_token(ef_runtime=4096)).ef_runtime == 4096
+    assert decode_cursor(_token(ef_runtime=None, mode="rerank")).mode == "rerank"
@@ -0,0 +1,228 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from eng_universe.config import Settings
+from eng_universe.search import doc_store
+from eng_universe.search.doc_store import (
+    DocStore,
+    adopt_doc_snapshot,
+    compact_doc_cache,
+    load_live_doc_cache,
+    write_doc_store_snapshot,
+)
+from eng_universe.search.vectors import vector_to_bytes
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.keys: list[tuple[str, list[str]]] = []
+
+    def hmget(self, key, fields):
+        self.keys.append((key, list(fields)))
+
+    async def execute(self):
+        return [
+            [self.client.hashes.get(key, {}).get(field) for field in fields]
+            for key, fields in self.keys
+        ]
+
+
+class FakeRedis:
+    """Doc hashes plus the `index:changes` stream, as the doc cache reads them."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, object]] = {}
+        self.stream: list[tuple[bytes, dict[bytes, bytes]]] = []
+        self.max_deleted = b"0-0"
+        self.last_seq = 0
+
+    def write(self, key, **fields):
+        self.hashes[key] = fields
+        self.last_seq += 1
+        entry = {b"key": key.encode(), b"op": b"set"}
+        self.stream.append((f"{self.last_seq}-0".encode(), entry))
+
+    def trim(self, count):
+        self.max_deleted = self.stream[count - 1][0]
+        self.stream = self.stream[count:]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return None
+
+    async def scan_iter(self, match, count):
+        for key in list(self.hashes):
+            if key.startswith(match.rstrip("*")):
+                yield key.encode()
+
+    async def xrevrange(self, key, count):
+        return list(reversed(self.stream))[:count]
+
+    async def xinfo_stream(self, key):
+        return {
+            "max-deleted-entry-id": self.max_deleted,
+            "first-entry": self.stream[0] if self.stream else None,
+        }
+
+    async def xread(self, streams, count, block):
+        (last_id,) = streams.values()
+        after = doc_store._stream_id(last_id)
+        entries = [
+            entry for entry in self.stream if doc_store._stream_id(entry[0]) > after
+        ][:count]
+        return [(Settings.doc_change_stream_key, entries)] if entries else []
+
+
+@pytest.fixture(autouse=True)
+def small_vectors(monkeypatch, tmp_path):
+    monkeypatch.setattr(Settings, "embeddings_dim", 4)
+    monkeypatch.setattr(Settings, "embeddings_int8", False)
+    monkeypatch.setattr(Settings, "doc_store_path", str(tmp_path / "docs.bin"))
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    write_doc_store_snapshot(
+        path,
+        [
+            (
+                "doc:b",
+                {
+                    "title": b"Bravo",
+                    "content": "café body".encode(),
+                    "company": b"Acme",
+                    "authors": b"Ann, Bob",
+                    "snippet_index": b"\x01\x02",
+                    "embedding": vector_to_bytes([3.0, 0.0, 4.0, 0.0]),
+                },
+            ),
+            ("doc:a", {"title": "Alpha", "company": "Acme"}),
+        ],
+        generation=7,
+        doc_prefix="doc:",
+        stream_id="42-0",
+    )
+    store = DocStore(path)
+    assert list(store) == ["doc:a", "doc:b"]
+    assert (store.generation, store.stream_id, store.doc_prefix) == (7, "42-0", "doc:")
+    doc = store["doc:b"]
+    assert doc["title"] == "Bravo"
+    assert doc["content"] == "café body"
+    assert doc["company"] == "Acme"
+    assert doc["authors"] == "Ann,Bob"
+    assert bytes(doc["snippet_index"]) == b"\x01\x02"
+    assert doc.content_window(0, 4) == ("café".encode()[:4], 10)
+    np.testing.assert_allclose(
+        np.asarray(doc["_vec"]) * doc["_vec_scale"], [0.6, 0.0, 0.8, 0.0], rtol=1e-6
+    )
+    assert store["doc:a"]["_vec"] is None
+    assert store["doc:a"]["authors"] == ""
+    assert "doc:c" not in store
+    with pytest.raises(KeyError):
+        store["doc:c"]
+
+
+def _count_rebuilds(monkeypatch) -> list[str]:
+    rebuilds: list[str] = []
+    fetch = doc_store._fetch_docs
+
+    async def counting_fetch(redis_client, doc_prefix, batch_size):
+        rebuilds.append(doc_prefix)
+        return await fetch(redis_client, doc_prefix, batch_size)
+
+    monkeypatch.setattr(doc_store, "_fetch_docs", counting_fetch)
+    return rebuilds
+
+
+def test_stale_snapshot_replays_the_change_feed(monkeypatch):
+    rebuilds = _count_rebuilds(monkeypatch)
+    client = FakeRedis()
+    client.write("doc:a", title=b"Old a")
+    cache = asyncio.run(load_live_doc_cache(client))
+    assert rebuilds == ["doc:"]
+    assert cache.store.stream_id == "1-0"
+
+    client.write("doc:a", title=b"New a")
+    client.write("doc:b", title=b"B")
+    cache = asyncio.run(load_live_doc_cache(client))
+    assert rebuilds == ["doc:"]
+    assert cache.last_id == "3-0"
+    assert cache["doc:a"]["title"] == "New a"
+    assert cache["doc:b"]["title"] == "B"
+    assert len(cache) == 2
+
+
+def test_snapshot_is_rebuilt_after_a_feed_gap(monkeypatch):
+    rebuilds = _count_rebuilds(monkeypatch)
+    client = FakeRedis()
+    client.write("doc:a", title=b"A")
+    asyncio.run(load_live_doc_cache(client))
+    client.write("doc:b", title=b"B")
+    client.write("doc:c", title=b"C")
+    client.trim(2)
+    cache = asyncio.run(load_live_doc_cache(client))
+    assert rebuilds == ["doc:", "doc:"]
+    assert cache.store.stream_id == "3-0"
+    assert sorted(cache) == ["doc:a", "doc:b", "doc:c"]
+
+
+def test_compaction_folds_the_overlay_into_a_new_snapshot(monkeypatch):
+    rebuilds = _count_rebuilds(monkeypatch)
+    monkeypatch.setattr(Settings, "doc_cache_overlay_max_docs", 2)
+    client = FakeRedis()
+    client.write("doc:a", title=b"A", embedding=vector_to_bytes([0, 2, 0, 0]))
+    client.write("doc:gone", title=b"Gone")
+    cache = asyncio.run(load_live_doc_cache(client))
+    client.write("doc:b", title=b"B")
+    del client.hashes["doc:gone"]
+    client.stream.append((b"4-0", {b"key": b"doc:gone", b"op": b"del"}))
+    client.last_seq = 4
+    asyncio.run(doc_store.refresh_doc_cache(client, cache, block_ms=1))
+    assert cache.compaction_due()
+
+    compacted = asyncio.run(compact_doc_cache(cache))
+    assert compacted.overlay_size == 0 and not compacted.compaction_due()
+    assert compacted.store.stream_id == "4-0" == compacted.last_id
+    assert sorted(compacted.store) == ["doc:a", "doc:b"]
+    np.testing.assert_allclose(compacted["doc:a"]["_vec"], [0, 1, 0, 0])
+    assert asyncio.run(load_live_doc_cache(client)).overlay_size == 0
+    assert rebuilds == ["doc:"]
+
+
+def test_one_worker_compacts_and_the_others_adopt_its_snapshot(monkeypatch):
+    monkeypatch.setattr(Settings, "doc_cache_overlay_max_docs", 1)
+    client = FakeRedis()
+    client.write("doc:a", title=b"A")
+    workers = [asyncio.run(load_live_doc_cache(client)) for _ in range(2)]
+    client.write("doc:b", title=b"B")
+    for cache in workers:
+        asyncio.run(doc_store.refresh_doc_cache(client, cache, block_ms=1))
+    first, second = workers
+
+    assert asyncio.run(adopt_doc_snapshot(client, first)) is None
+    compacted = asyncio.run(compact_doc_cache(first))
+    assert compacted is not None
+    # The snapshot moved on, so the second worker must not write it again.
+    assert asyncio.run(compact_doc_cache(second)) is None
+    client.write("doc:c", title=b"C")
+    adopted = asyncio.run(adopt_doc_snapshot(client, second))
+    assert adopted is not None
+    assert adopted.store.stream_id == compacted.store.stream_id == "2-0"
+    assert adopted.last_id == "3-0" and adopted.overlay_size == 1
+    assert sorted(adopted) == ["doc:a", "doc:b", "doc:c"]
+
+
+def test_compaction_is_skipped_while_another_worker_holds_the_lock():
+    client = FakeRedis()
+    client.write("doc:a", title=b"A")
+    cache = asyncio.run(load_live_doc_cache(client))
+    path = doc_store.Path(Settings.doc_store_path)
+    with open(path.with_name(f"{path.name}.lock"), "a") as lock:
+        doc_store.fcntl.flock(lock, doc_store.fcntl.LOCK_EX)
+        assert asyncio.run(compact_doc_cache(cache)) is None
+    assert asyncio.run(compact_doc_cache(cache)) is not None
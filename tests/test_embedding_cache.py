@@ -0,0 +1,132 @@
+import numpy as np
+
+from eng_universe.search import embedding_cache
+from eng_universe.search.embedding_cache import (
+    DiskEmbeddingCache,
+    cached_encode,
+    pack_array,
+    unpack_array,
+)
+
+
+def test_pack_array_round_trip():
+    matrix = np.arange(12, dtype=np.float32).reshape(3, 4)
+    assert np.array_equal(unpack_array(pack_array(matrix)), matrix)
+
+
+def test_disk_cache_evicts_least_recently_used_bytes(tmp_path, monkeypatch):
+    cache = DiskEmbeddingCache(str(tmp_path / "cache.sqlite"), max_bytes=250)
+    clock = iter(range(100))
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: next(clock))
+    cache.set_many({"a": b"x" * 100})
+    cache.set_many({"b": b"y" * 100})
+    cache.get_many(["a"])  # "b" is now the least recently used
+    cache.set_many({"c": b"z" * 100})
+    assert cache.get_many(["a", "b", "c"]) == [b"x" * 100, None, b"z" * 100]
+    assert cache.size_bytes == 200
+
+
+def test_disk_cache_tracks_replaced_values_and_reopens(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = DiskEmbeddingCache(path, max_bytes=1000)
+    cache.set_many({"a": b"x" * 100})
+    cache.set_many({"a": b"x" * 40, "b": b"y" * 10})
+    assert cache.size_bytes == 50
+    assert DiskEmbeddingCache(path, max_bytes=1000).size_bytes == 50
+
+
+def test_cached_encode_encodes_each_miss_once(tmp_path, monkeypatch):
+    cache = DiskEmbeddingCache(str(tmp_path / "cache.sqlite"), max_bytes=10**6)
+    monkeypatch.setattr(embedding_cache, "get_embedding_cache", lambda: cache)
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] * 2 for text in texts]
+
+    kwargs = {"provider": "p", "model": "m", "dim": 2}
+    first = cached_encode(["a", "bb", "a"], encode, **kwargs)
+    second = cached_encode(["bb", "ccc"], encode, **kwargs)
+    assert calls == [["a", "bb"], ["ccc"]]
+    assert [row.tolist() for row in first] == [[1.0, 1.0], [2.0, 2.0], [1.0, 1.0]]
+    assert [row.tolist() for row in second] == [[2.0, 2.0], [3.0, 3.0]]
+
+
+class FakeSyncPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+        return queue
+
+    def execute(self):
+        return [
+            getattr(self.client, name)(*args, **kwargs)
+            for name, args, kwargs in self.calls
+        ]
+
+
+class FakeSyncRedis:
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.lru: dict[bytes, float] = {}
+        self.counter = 0
+
+    def pipeline(self):
+        return FakeSyncPipeline(self)
+
+    def mget(self, names):
+        return [self.values.get(name) for name in names]
+
+    def set(self, name, value, nx=False):
+        if nx and name in self.values:
+            return None
+        self.values[name] = value
+        return True
+
+    def strlen(self, name):
+        return len(self.values.get(name, b""))
+
+    def delete(self, *names):
+        for name in names:
+            self.values.pop(name, None)
+
+    def zadd(self, key, mapping):
+        self.lru.update({member.encode(): score for member, score in mapping.items()})
+
+    def zrange(self, key, start, stop):
+        return sorted(self.lru, key=self.lru.get)[start : stop + 1]
+
+    def zrem(self, key, member):
+        return int(self.lru.pop(member, None) is not None)
+
+    def incrby(self, key, amount):
+        self.counter += amount
+        return self.counter
+
+    def decrby(self, key, amount):
+        return self.incrby(key, -amount)
+
+
+def test_redis_cache_evicts_only_down_to_the_byte_budget(monkeypatch):
+    import redis
+
+    client = FakeSyncRedis()
+    monkeypatch.setattr(redis, "from_url", lambda url: client)
+    clock = iter(range(100))
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: next(clock))
+    cache = embedding_cache.RedisEmbeddingCache("redis://", "emb:", max_bytes=250)
+    for key in "abc":
+        cache.set_many({key: key.encode() * 100})
+    assert cache.get_many(["a", "b", "c"]) == [None, b"b" * 100, b"c" * 100]
+    assert client.counter == 200
+
+    cache.get_many(["b"])  # "c" is now the least recently used
+    cache.set_many({"d": b"d" * 30, "e": b"e" * 30})
+    assert cache.get_many(["b", "d", "e"]) == [b"b" * 100, b"d" * 30, b"e" * 30]
+    assert cache.get_many(["c"]) == [None]
+    assert client.counter == 160
@@ -0,0 +1,56 @@
+from eng_universe.search.filters import (
+    SearchFilters,
+    filter_clause,
+    parse_inline_filters,
+    published_epoch,
+    with_filters,
+)
+
+JAN_1_2023 = 1672531200
+
+
+def test_published_epoch_reads_years_dates_and_epochs():
+    assert published_epoch("2023") == JAN_1_2023
+    assert published_epoch("2023-01-01") == JAN_1_2023
+    assert published_epoch("2023-01-01T02:00:00+02:00") == JAN_1_2023
+    assert published_epoch("Jan 1, 2023") == JAN_1_2023
+    assert published_epoch(str(JAN_1_2023)) == JAN_1_2023
+    assert published_epoch("123") is None
+    assert published_epoch("0000") is None
+    assert published_epoch("soon") is None
+    assert published_epoch("") is None
+
+
+def test_parse_inline_filters_splits_text_from_filters():
+    text, filters = parse_inline_filters(
+        'company:stripe topic:"machine learning" after:2023 kafka before:soon'
+    )
+    assert text == "kafka before:soon"
+    assert filters == SearchFilters(
+        company=["stripe"], topics=["machine learning"], published_after=JAN_1_2023
+    )
+
+
+def test_merged_bounds_keep_the_narrowest_range():
+    merged = SearchFilters(published_after=10, published_before=50).merged(
+        SearchFilters(published_after=20, published_before=90, lang=["en"])
+    )
+    assert (merged.published_after, merged.published_before) == (20, 50)
+    assert merged.lang == ["en"]
+
+
+def test_filter_clause_escapes_and_dedupes_tags():
+    clause = filter_clause(
+        SearchFilters(
+            company=["Acme Corp", "Acme Corp"],
+            topics=["c++"],
+            published_before=JAN_1_2023,
+        )
+    )
+    assert clause == (
+        "@company:{Acme\\ Corp} @topics:{c\\+\\+} "
+        f"@published_ts:[-inf {JAN_1_2023}]"
+    )
+    assert filter_clause(SearchFilters()) == ""
+    assert with_filters("*", clause) == clause
+    assert with_filters("@title:(kafka)", "") == "@title:(kafka)"
@@ -0,0 +1,79 @@
+import asyncio
+import importlib
+
+import pytest
+
+from eng_universe.config import Settings
+
+search_module = importlib.import_module("eng_universe.search.search")
+
+
+@pytest.fixture
+def weights(monkeypatch):
+    monkeypatch.setattr(Settings, "hybrid_bm25_weight", 1.0)
+    monkeypatch.setattr(Settings, "hybrid_vector_weight", 1.0)
+    monkeypatch.setattr(Settings, "hybrid_rrf_k", 60)
+
+
+def test_rrf_rewards_docs_ranked_by_both_legs(weights, monkeypatch):
+    monkeypatch.setattr(Settings, "hybrid_fusion", "rrf")
+    fused = search_module._fuse_hybrid(
+        [("a", 9.0), ("b", 5.0)], [("b", 0.9), ("c", 0.8)]
+    )
+    assert [doc for doc, _ in fused] == ["b", "a", "c"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[1][1] == pytest.approx(1 / 61)
+
+
+def test_weighted_mixes_normalized_bm25_with_similarity(weights, monkeypatch):
+    monkeypatch.setattr(Settings, "hybrid_fusion", "weighted")
+    monkeypatch.setattr(Settings, "hybrid_vector_weight", 0.5)
+    fused = dict(
+        search_module._fuse_hybrid([("a", 10.0), ("b", 5.0)], [("b", 0.8)])
+    )
+    assert fused == pytest.approx({"a": 1.0, "b": 0.5 + 0.4})
+    assert search_module._fuse_hybrid([("a", 0.0)], []) == [("a", 0.0)]
+
+
+@pytest.fixture
+def legs(monkeypatch):
+    calls: list[str] = []
+
+    async def bm25_leg(redis_client, index_name, text_query, k):
+        calls.append("bm25")
+        return [("doc:a", 12.0), ("doc:b", 11.0)]
+
+    async def plaid_leg(redis_client, index_name, query, k, doc_prefix, clause):
+        calls.append("plaid")
+        return [("doc:c", 0.5)], {}
+
+    monkeypatch.setattr(search_module, "_bm25_leg", bm25_leg)
+    monkeypatch.setattr(search_module, "_filtered_plaid_leg", plaid_leg)
+    monkeypatch.setattr(Settings, "hybrid_fusion", "rrf")
+    return calls
+
+
+def _rank(limit):
+    return asyncio.run(
+        search_module._rank_pylate_hybrid(None, "idx", "redis", limit, 10)
+    )
+
+
+def test_confident_bm25_never_starts_plaid(legs, monkeypatch):
+    monkeypatch.setattr(Settings, "pylate_hybrid_early_exit_score", 10.0)
+    ranking = _rank(limit=2)
+    assert legs == ["bm25"]
+    assert [doc for doc, _ in ranking.scored] == ["doc:a", "doc:b"]
+
+
+def test_plaid_runs_when_bm25_falls_short(legs, monkeypatch):
+    monkeypatch.setattr(Settings, "pylate_hybrid_early_exit_score", 10.0)
+    ranking = _rank(limit=3)
+    assert legs == ["bm25", "plaid"]
+    assert "doc:c" in dict(ranking.scored)
+
+
+def test_legs_run_concurrently_without_early_exit(legs, monkeypatch):
+    monkeypatch.setattr(Settings, "pylate_hybrid_early_exit_score", 0.0)
+    _rank(limit=2)
+    assert sorted(legs) == ["bm25", "plaid"]
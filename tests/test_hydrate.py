@@ -0,0 +1,73 @@
+import asyncio
+import importlib
+
+from redis.exceptions import NoScriptError
+
+search_module = importlib.import_module("eng_universe.search.search")
+
+
+class ScriptPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls: list[tuple] = []
+
+    def evalsha(self, sha, numkeys, *keys_and_args):
+        self.calls.append(("evalsha", sha, keys_and_args[0]))
+
+    def hget(self, key, field):
+        self.calls.append(("hget", key, field))
+
+    async def execute(self):
+        self.client.executed.append([call[0] for call in self.calls])
+        if not self.client.loaded and any(c[0] == "evalsha" for c in self.calls):
+            raise NoScriptError("NOSCRIPT No matching script.")
+        return [
+            [
+                [b"id", b"Title", b"https://x", b"Acme", b"Ann", None],
+                b"Redis streams scale.",
+                0,
+                20,
+            ]
+            if call[0] == "evalsha"
+            else b"passage snippet"
+            for call in self.calls
+        ]
+
+
+class ScriptRedis:
+    def __init__(self, loaded):
+        self.loaded = loaded
+        self.executed: list[list[str]] = []
+        self.loads: list[str] = []
+
+    def pipeline(self, transaction=True):
+        return ScriptPipeline(self)
+
+    async def script_load(self, script):
+        self.loads.append(script)
+        self.loaded = True
+        return search_module._HYDRATE_SHA
+
+
+def _hydrate(client, **kwargs):
+    return asyncio.run(
+        search_module._hydrate(client, [("doc:a", 1.0)], query="streams", **kwargs)
+    )
+
+
+def test_hydrate_loads_the_script_once_on_noscript():
+    client = ScriptRedis(loaded=False)
+    (result,) = _hydrate(client, passages={"doc:a": "passage:doc:a#p0"})
+    assert client.loads == [search_module._HYDRATE_SCRIPT]
+    assert client.executed == [["evalsha", "hget"], ["evalsha", "hget"]]
+    assert (result.title, result.company, result.authors) == ("Title", "Acme", ["Ann"])
+    assert result.snippet == "passage snippet"
+
+    _hydrate(client)
+    assert len(client.loads) == 1
+    assert client.executed[-1] == ["evalsha"]
+
+
+def test_hydrate_script_never_scans_content():
+    assert "string.find" not in search_module._HYDRATE_SCRIPT
+    assert "string.lower" not in search_module._HYDRATE_SCRIPT
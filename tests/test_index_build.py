@@ -0,0 +1,150 @@
+import asyncio
+
+from eng_universe.config import Settings
+from eng_universe.index import indexer, pipeline, versions
+from eng_universe.index.indexer import embed_for_index, index_version
+from eng_universe.index.pipeline import IndexJob, requeue_crawl_docs
+from eng_universe.ingest.etl import ParsedDocument
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        return [
+            getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.calls
+        ]
+
+
+class FakeRedis:
+    def __init__(self, hashes=None):
+        self.hashes = hashes or {}
+        self.lists: dict[str, list[str]] = {}
+        self.strings: dict[str, str] = {}
+        self.commands: list[tuple] = []
+        self.indexes: dict[str, str] = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def set(self, key, value):
+        self.strings[key] = str(value)
+
+    def incr(self, key):
+        self.strings[key] = str(int(self.strings.get(key, 0)) + 1)
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+
+    async def scan_iter(self, match, count):
+        for key in list(self.hashes):
+            if key.startswith(match.rstrip("*")):
+                yield key.encode()
+
+    async def execute_command(self, *args):
+        self.commands.append(args)
+        if args[0] == "FT.INFO":
+            if args[1] not in self.indexes:
+                raise versions.redis.ResponseError("Unknown index name")
+            name = self.indexes[args[1]]
+            return ["index_name", name, "indexing", 0, "num_docs", 3]
+        if args[0] == "FT.DROPINDEX":
+            del self.indexes[args[1]]
+        if args[0] == "FT.ALIASUPDATE":
+            self.indexes.setdefault(args[1], args[2])
+
+
+def test_promotion_points_the_alias_before_dropping_the_legacy_index():
+    alias = Settings.search_index_name
+    client = FakeRedis()
+    client.indexes = {alias: alias, f"{alias}:v2": f"{alias}:v2"}
+    asyncio.run(versions.promote_version(client, 2))
+    names = [args[0] for args in client.commands if args[0] != "FT.INFO"]
+    assert names == ["FT.ALIASUPDATE", "FT.DROPINDEX"]
+    assert client.strings[Settings.index_live_version_key] == "2"
+
+
+def test_requeue_only_docs_fetched_since():
+    prefix = Settings.crawl_doc_key_prefix
+    client = FakeRedis(
+        {
+            f"{prefix}1": {"fetched_at": b"100"},
+            f"{prefix}2": {"fetched_at": b"250"},
+            f"{prefix}3": {},
+        }
+    )
+    total = asyncio.run(
+        requeue_crawl_docs(client, queue_key="q", fetched_since=200, batch_size=2)
+    )
+    assert total == 1
+    assert client.lists["q"] == ["2"]
+    assert asyncio.run(requeue_crawl_docs(client, queue_key="all")) == 3
+
+
+def _job(tmp_path, **fields) -> IndexJob:
+    cleaned = tmp_path / "clean.html"
+    cleaned.write_text("<p>body</p>", encoding="utf-8")
+    return IndexJob(
+        raw_doc_id="1",
+        url="https://example.com/a",
+        source="example",
+        raw_path="",
+        cleaned_path=str(cleaned),
+        raw_key="",
+        clean_key="",
+        domain="example.com",
+        depth=0,
+        fetched_at=0,
+        status=200,
+        **fields,
+    )
+
+
+def test_full_build_marks_docs_unchanged_since_live_as_in_plaid(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(pipeline, "r2_enabled", lambda: False)
+    digest = pipeline._content_hash("", "<p>body</p>")
+    job = _job(tmp_path, indexed_hash=digest, indexed_version=index_version())
+    loaded = asyncio.run(pipeline._load_job(job, incremental=False))
+    assert loaded is not None and loaded.in_plaid
+
+    stale = _job(tmp_path, indexed_hash=digest, indexed_version="v0:old")
+    loaded = asyncio.run(pipeline._load_job(stale, incremental=False))
+    assert loaded is not None and not loaded.in_plaid
+
+
+def test_docs_in_plaid_are_not_buffered_again(monkeypatch):
+    added: list[str] = []
+
+    class Buffer:
+        def add(self, document_id, text):
+            added.append(document_id)
+
+    monkeypatch.setattr(Settings, "keyword_only", False)
+    monkeypatch.setattr(Settings, "embeddings_provider", "pylate")
+    monkeypatch.setattr(Settings, "passage_chunking", False)
+    monkeypatch.setattr(indexer, "token_store_enabled", lambda: False)
+    monkeypatch.setattr(indexer, "get_plaid_write_buffer", Buffer)
+    docs = [
+        ParsedDocument(url, url, "text", [], "", None, None, None)
+        for url in ("kept", "changed")
+    ]
+    embeddings, passages = embed_for_index(docs, in_plaid=[True, False])
+    assert added == ["changed"]
+    assert embeddings == [None, None] and passages is None
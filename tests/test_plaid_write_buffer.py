@@ -0,0 +1,132 @@
+import pytest
+
+from eng_universe.search import pylate_backend
+from eng_universe.search.pylate_backend import PlaidWriteBuffer
+
+
+class FlakyPlaid:
+    def __init__(self):
+        self.fail = True
+        self.added: list[tuple[list[str], list[str]]] = []
+        self.removed: list[list[str]] = []
+
+    def __call__(self, documents_ids, documents):
+        if self.fail:
+            raise OSError("disk full")
+        self.added.append((list(documents_ids), list(documents)))
+
+
+@pytest.fixture
+def plaid(monkeypatch):
+    flaky = FlakyPlaid()
+    monkeypatch.setattr(pylate_backend, "add_documents", flaky)
+    monkeypatch.setattr(pylate_backend, "remove_documents", flaky.removed.append)
+    return flaky
+
+
+def test_failed_flush_keeps_the_batch(plaid):
+    buffer = PlaidWriteBuffer(max_docs=10, max_age_s=60)
+    buffer.add("a", "old a")
+    buffer.add("b", "b")
+    buffer.when_synced(["a", "b"], "doc:a+b")
+    with pytest.raises(OSError):
+        buffer.flush()
+    assert len(buffer) == 2
+    assert buffer.take_synced() == []
+
+    plaid.fail = False
+    buffer.add("a", "new a")
+    assert buffer.flush() == 2
+    assert plaid.added == [(["a", "b"], ["new a", "b"])]
+    assert buffer.take_synced() == ["doc:a+b"]
+    assert buffer.take_synced() == []
+
+
+def test_due_flush_failure_is_not_raised(plaid):
+    buffer = PlaidWriteBuffer(max_docs=2, max_age_s=60)
+    buffer.add("a", "a")
+    assert buffer.add("b", "b") == 0
+    assert len(buffer) == 2
+    plaid.fail = False
+    assert buffer.flush_if_due() == 2
+    assert len(buffer) == 0
+
+
+def test_when_synced_waits_for_every_id(plaid):
+    plaid.fail = False
+    buffer = PlaidWriteBuffer(max_docs=10, max_age_s=60)
+    buffer.when_synced(["never-buffered"], "now")
+    buffer.add("a#p0", "x")
+    buffer.when_synced(["a#p0", "a#p1"], "later")
+    assert buffer.take_synced() == ["now"]
+    buffer.flush()
+    assert buffer.take_synced() == ["later"]
+
+
+def test_flush_replaces_old_entries_before_adding(plaid):
+    plaid.fail = False
+    buffer = PlaidWriteBuffer(max_docs=10, max_age_s=60)
+    buffer.discard(["a#p2", "a#p3"])
+    buffer.add("a#p0", "x")
+    buffer.add("a#p1", "y")
+    assert buffer.flush() == 2
+    assert plaid.removed == [["a#p0", "a#p1", "a#p2", "a#p3"]]
+    assert plaid.added == [(["a#p0", "a#p1"], ["x", "y"])]
+
+
+def test_remove_documents_skips_ids_plaid_does_not_hold(monkeypatch):
+    class StanfordLikeIndex:
+        held = {"a", "c"}
+
+        def remove_documents(self, documents_ids):
+            if set(documents_ids) - self.held:
+                raise KeyError(documents_ids)
+            self.held -= set(documents_ids)
+
+    index = StanfordLikeIndex()
+    monkeypatch.setattr(pylate_backend, "get_plaid_index", lambda: index)
+    pylate_backend.remove_documents(["a", "b", "c"])
+    assert index.held == set()
+
+
+class StanfordIndex:
+    """Rejects a whole removal for one unknown id, like the Stanford backend."""
+
+    def __init__(self, indexed):
+        self.indexed = dict.fromkeys(indexed, 0)
+        self.removals: list[list[str]] = []
+
+    def _load_documents_ids_to_plaid_ids(self):
+        return dict(self.indexed)
+
+    def remove_documents(self, documents_ids):
+        self.removals.append(list(documents_ids))
+        if any(doc_id not in self.indexed for doc_id in documents_ids):
+            raise KeyError(documents_ids[0])
+        for doc_id in documents_ids:
+            del self.indexed[doc_id]
+
+
+@pytest.fixture
+def stanford(monkeypatch):
+    index = StanfordIndex(["old"])
+    monkeypatch.setattr(pylate_backend, "get_plaid_index", lambda: index)
+    monkeypatch.setattr(pylate_backend, "add_documents", lambda ids, docs: None)
+    return index
+
+
+def test_flushing_new_docs_removes_nothing(stanford):
+    buffer = PlaidWriteBuffer(max_docs=10, max_age_s=60)
+    for doc_id in ("new-1", "new-2", "new-3"):
+        buffer.add(doc_id, "text")
+    assert buffer.flush() == 3
+    assert stanford.removals == []
+
+
+def test_flush_removes_only_the_ids_plaid_holds(stanford):
+    buffer = PlaidWriteBuffer(max_docs=10, max_age_s=60)
+    buffer.add("old", "changed")
+    buffer.add("new", "text")
+    buffer.discard(["gone"])
+    buffer.flush()
+    assert stanford.removals == [["old"]]
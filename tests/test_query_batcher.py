@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+import pytest
+
+from eng_universe.search import pylate_backend
+from eng_universe.search.pylate_backend import close_query_batchers, retrieve_async
+
+
+@pytest.fixture
+def fake_retrieve(monkeypatch):
+    def retrieve_batch(queries, k):
+        return [[{"id": query, "score": 1.0}] for query in queries]
+
+    monkeypatch.setattr(pylate_backend, "retrieve_batch", retrieve_batch)
+
+
+def _query_threads() -> list[threading.Thread]:
+    return [
+        thread
+        for thread in threading.enumerate()
+        if thread.name.startswith("pylate-query")
+    ]
+
+
+def test_batchers_do_not_outlive_their_event_loop(fake_retrieve):
+    for _ in range(3):
+        hits = asyncio.run(retrieve_async("redis", 5))
+        assert hits == [{"id": "redis", "score": 1.0}]
+    assert pylate_backend._QUERY_BATCHERS == {}
+    for thread in _query_threads():
+        thread.join(timeout=1)
+    assert _query_threads() == []
+
+
+def test_close_query_batchers_stops_the_consumer(fake_retrieve):
+    async def run():
+        await retrieve_async("redis", 5)
+        (batcher,) = pylate_backend._QUERY_BATCHERS.values()
+        close_query_batchers()
+        await asyncio.sleep(0)
+        assert batcher._worker.cancelled()
+        assert pylate_backend._QUERY_BATCHERS == {}
+
+    asyncio.run(run())
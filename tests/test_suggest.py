@@ -0,0 +1,110 @@
+import asyncio
+
+from eng_universe.search.suggest import (
+    suggest,
+    suggest_key,
+    update_suggestion_weights,
+)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.calls.append((name, args))
+
+        return queue
+
+    async def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+class FakeRedis:
+    """Hashes plus suggestion dictionaries as {key: {text: score}}."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, object]] = {}
+        self.dictionaries: dict[str, dict[str, float]] = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+    def hincrby(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field] = int(values.get(field, 0)) + amount
+        return values[field]
+
+    def execute_command(self, command, key, text, *args):
+        entries = self.dictionaries.setdefault(key, {})
+        if command == "FT.SUGDEL":
+            entries.pop(text, None)
+        else:
+            assert "INCR" not in args
+            entries[text] = float(args[0])
+
+    def weights(self, kind):
+        return self.dictionaries.get(suggest_key(kind), {})
+
+
+def _update(client, docs):
+    asyncio.run(update_suggestion_weights(client, docs))
+
+
+def test_rewrites_and_rebuilds_count_each_doc_once():
+    client = FakeRedis()
+    doc = {"company": "Acme", "topics": "redis,search"}
+    _update(client, {"a": doc, "b": {"company": "Acme", "topics": "redis"}})
+    # A build into a new version prefix writes the same docs again.
+    _update(client, {"a": doc, "b": {"company": "Acme", "topics": "redis"}})
+    assert client.weights("company") == {"Acme": 2.0}
+    assert client.weights("topic") == {"redis": 2.0, "search": 1.0}
+
+
+def test_changed_and_deleted_docs_take_their_weight_back():
+    client = FakeRedis()
+    _update(client, {"a": {"company": "Acme", "topics": "redis,search"}})
+    _update(client, {"b": {"company": "Acme", "topics": "redis"}})
+    _update(client, {"a": {"company": "Acme", "topics": "kafka"}})
+    assert client.weights("topic") == {"redis": 1.0, "kafka": 1.0}
+
+    _update(client, {"a": None, "b": None})
+    assert client.weights("company") == {}
+    assert client.weights("topic") == {}
+    assert not any(client.hashes.values())
+
+
+def test_limit_caps_the_merged_suggestions():
+    stored = {"company": 2, "topic": 1, "title": 20}
+
+    class SuggestRedis(FakeRedis):
+        def execute_command(self, command, key, prefix, *args):
+            kind = key.rsplit(":", 1)[-1]
+            count = min(stored[kind], args[args.index("MAX") + 1])
+            return [
+                value
+                for rank in range(count)
+                for value in (f"{prefix} {kind} {rank}", str(10 - rank), None)
+            ]
+
+    suggestions = asyncio.run(suggest(SuggestRedis(), "red", limit=5))
+    assert len(suggestions) == 5
+    assert [item.kind for item in suggestions] == [
+        "company",
+        "company",
+        "topic",
+        "title",
+        "title",
+    ]
+    assert [item.score for item in suggestions[-2:]] == [10.0, 9.0]
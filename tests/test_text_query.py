@@ -0,0 +1,51 @@
+import asyncio
+import importlib
+
+from eng_universe.search.filters import SearchFilters
+
+search_module = importlib.import_module("eng_universe.search.search")
+
+
+class RecordingRedis:
+    def __init__(self):
+        self.commands: list[tuple] = []
+
+    async def execute_command(self, *args):
+        self.commands.append(args)
+        return [0]
+
+
+def _search(client, query, **kwargs):
+    return asyncio.run(
+        search_module._search_uncached(client, "idx", query, "hybrid", 10, **kwargs)
+    )
+
+
+def test_build_text_query_escapes_and_expands_the_last_prefix():
+    text_query = search_module._build_text_query("redis str")
+    assert text_query.startswith("@title|")
+    assert text_query.endswith("|content:(redis (str|str*))")
+    assert search_module._build_text_query(" — ") == "*"
+
+
+def test_punctuation_only_query_returns_nothing():
+    client = RecordingRedis()
+    assert search_module._searchable_text(" ?! — ") == ""
+    assert _search(client, " ?! — ") == ([], 0.0, False)
+    assert client.commands == []
+
+
+def test_punctuation_with_filters_lists_filter_matches_only():
+    client = RecordingRedis()
+    _search(client, "—", filters=SearchFilters(company=["Stripe"]))
+    ((command, _, text_query, *_),) = client.commands
+    assert command == "FT.SEARCH"
+    assert text_query == "@company:{Stripe}"
+
+
+def test_keyword_ranking_never_sends_match_all():
+    client = RecordingRedis()
+    ranking = asyncio.run(
+        search_module._rank_keyword(client, "idx", "", 10, offset=0, clause="")
+    )
+    assert ranking.scored == [] and client.commands == []
@@ -0,0 +1,79 @@
+import asyncio
+import importlib
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from eng_universe.config import Settings
+from eng_universe.search.token_store import (
+    TokenStore,
+    TokenStoreWriter,
+    compact_token_store,
+)
+
+search_module = importlib.import_module("eng_universe.search.search")
+
+
+def _tokens(value, rows=2):
+    return np.full((rows, 4), value, dtype=np.float32)
+
+
+def test_compaction_keeps_the_latest_record_of_each_doc(tmp_path):
+    path = tmp_path / "tokens.bin"
+    writer = TokenStoreWriter(path)
+    writer.append(["a", "b"], [_tokens(1.0), _tokens(2.0, rows=3)])
+    reader = TokenStore(path)
+    assert reader.lookup(["a"])[0][0, 0] == 1.0
+    writer.append(["a"], [_tokens(5.0)])
+    size = path.stat().st_size
+
+    kept, reclaimed = compact_token_store(path)
+    assert kept == 2
+    assert reclaimed > 0 and path.stat().st_size == size - reclaimed
+    fresh_a, fresh_b = TokenStore(path).lookup(["a", "b"])
+    assert fresh_a[0, 0] == 5.0 and fresh_b.shape == (3, 4)
+
+    # Appends after the swap land in the new file, and a reader opened
+    # before it rescans that file instead of reading stale offsets.
+    writer.append(["c"], [_tokens(7.0)])
+    hit_a, hit_c = reader.lookup(["a", "c"])
+    assert hit_a[0, 0] == 5.0 and hit_c[0, 0] == 7.0
+    assert compact_token_store(tmp_path / "missing.bin") == (0, 0)
+
+
+@pytest.fixture
+def no_token_store(monkeypatch):
+    monkeypatch.setattr(Settings, "keyword_only", False)
+    monkeypatch.setattr(Settings, "embeddings_provider", "openai")
+    monkeypatch.setattr(Settings, "colbert_token_store", False)
+
+
+def test_rerank_is_unavailable_without_a_token_store(no_token_store, monkeypatch):
+    assert "rerank" not in search_module.available_search_modes()
+    with pytest.raises(ValueError):
+        asyncio.run(
+            search_module._rank(
+                None,
+                "idx",
+                "redis",
+                "rerank",
+                10,
+                10,
+                doc_cache=None,
+                doc_prefix="doc:",
+                ef_runtime=None,
+                clause="",
+            )
+        )
+    monkeypatch.setattr(Settings, "colbert_token_store", True)
+    assert "rerank" in search_module.available_search_modes()
+
+
+def test_api_rejects_rerank_without_a_token_store(no_token_store):
+    from api.search import app
+
+    client = TestClient(app)
+    assert "rerank" not in client.get("/health").json()["modes"]
+    response = client.get("/search", params={"q": "redis", "mode": "rerank"})
+    assert response.status_code == 422
@@ -0,0 +1,59 @@
+import asyncio
+
+from eng_universe.config import Settings
+from eng_universe.index.indexer import write_documents
+from eng_universe.ingest.etl import ParsedDocument
+
+
+class RecordingPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls: list[tuple[str, tuple]] = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args))
+
+        return queue
+
+    async def execute(self):
+        calls, self.calls = self.calls, []
+        self.client.calls.extend(calls)
+        return [[None] * len(args[1]) if name == "hmget" else 1 for name, args in calls]
+
+
+class RecordingRedis:
+    def __init__(self):
+        self.calls: list[tuple[str, tuple]] = []
+
+    def pipeline(self, transaction=True):
+        return RecordingPipeline(self)
+
+    def called(self, name):
+        return [args for call, args in self.calls if call == name]
+
+
+def _doc(url: str) -> ParsedDocument:
+    return ParsedDocument(url, "Title", "content", [], "Acme", None, None, "en")
+
+
+def test_live_writes_bump_the_generation():
+    client = RecordingRedis()
+    asyncio.run(write_documents(client, [(_doc("a"), "blog", None)]))
+    assert client.called("incr") == [(Settings.index_generation_key,)]
+    assert client.called("hset")[0][0] == "doc:a"
+    assert [args[1] for args in client.called("xadd")] == [
+        {"key": "doc:a", "op": "set"}
+    ]
+
+
+def test_build_writes_leave_the_generation_and_change_feed_alone():
+    client = RecordingRedis()
+    asyncio.run(
+        write_documents(
+            client, [(_doc("a"), "blog", None)], doc_prefix="v2:doc:", live=False
+        )
+    )
+    assert client.called("incr") == []
+    assert client.called("xadd") == []
+    assert client.called("hset")[0][0] == "v2:doc:a"
@@ -3,9 +3,13 @@ const resultsList = document.getElementById("results");
 const status = document.getElementById("status");
 const queryInput = document.getElementById("query");
 const modeSelect = document.getElementById("mode");
+const suggestionList = document.getElementById("suggestions");
 const apiBase = window.location.protocol === "file:" ? "http://localhost:8080" : "";
 let debounceTimer = null;
 let lastRequestId = 0;
+let suggestTimer = null;
+let lastSuggestId = 0;
+let suggestionValues = new Set();
 
 const formatAuthors = (authors) => {
   if (Array.isArray(authors)) {
@@ -157,6 +161,70 @@ const runSearch = async () => {
   });
 };
 
+const suggestionValue = (item) => {
+  if (item.kind === "company") {
+    return `company:"${item.text}"`;
+  }
+  if (item.kind === "topic") {
+    return `topic:"${item.text}"`;
+  }
+  return item.text;
+};
+
+const runSuggest = async () => {
+  const prefix = queryInput.value.trim();
+  const requestId = ++lastSuggestId;
+  if (!prefix) {
+    suggestionValues = new Set();
+    suggestionList.replaceChildren();
+    return;
+  }
+  let payload;
+  try {
+    const response = await fetch(
+      `${apiBase}/suggest?q=${encodeURIComponent(prefix)}`
+    );
+    if (!response.ok) {
+      throw new Error(`suggest failed with ${response.status}`);
+    }
+    payload = await response.json();
+  } catch (error) {
+    // Stale suggestions for an older prefix would be worse than none.
+    if (requestId === lastSuggestId) {
+      suggestionValues = new Set();
+      suggestionList.replaceChildren();
+    }
+    return;
+  }
+  if (requestId !== lastSuggestId) {
+    return;
+  }
+  const options = payload.suggestions.map((item) => {
+    const option = document.createElement("option");
+    option.value = suggestionValue(item);
+    option.label = item.kind;
+    return option;
+  });
+  suggestionValues = new Set(options.map((option) => option.value));
+  suggestionList.replaceChildren(...options);
+};
+
+const scheduleSuggest = () => {
+  if (suggestTimer) {
+    clearTimeout(suggestTimer);
+  }
+  suggestTimer = setTimeout(runSuggest, 50);
+};
+
+// Typing only fetches suggestions; picking one or submitting runs the search.
+const onQueryInput = () => {
+  if (suggestionValues.has(queryInput.value)) {
+    scheduleSearch();
+    return;
+  }
+  scheduleSuggest();
+};
+
 const scheduleSearch = () => {
   if (debounceTimer) {
     clearTimeout(debounceTimer);
@@ -169,5 +237,28 @@ form.addEventListener("submit", (event) => {
   scheduleSearch();
 });
 
-queryInput.addEventListener("input", scheduleSearch);
+queryInput.addEventListener("input", onQueryInput);
 modeSelect.addEventListener("change", scheduleSearch);
+
+// Drop modes the server cannot serve (rerank needs the ColBERT token store).
+const loadModes = async () => {
+  try {
+    const response = await fetch(`${apiBase}/health`);
+    if (!response.ok) {
+      return;
+    }
+    const { modes } = await response.json();
+    if (!Array.isArray(modes)) {
+      return;
+    }
+    for (const option of [...modeSelect.options]) {
+      if (!modes.includes(option.value)) {
+        option.remove();
+      }
+    }
+  } catch (error) {
+    // Keep every option; the API answers an unavailable mode with a 422.
+  }
+};
+
+loadModes();